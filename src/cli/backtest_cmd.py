@@ -2,24 +2,153 @@ from __future__ import annotations
 
 import asyncio
 import json
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple, cast
 
+import numpy as np
 from rich.console import Console
 
-from src.cli.detect_cmd import _fetch_candles
+from src.cli.detect_cmd import _result_cache
+from src.lib.candle_frame import CandleFrame
+from src.lib.ohlcv_store import OHLCVStore
+from src.lib.rate_limiter import TokenBucket
+from src.lib.result_cache import describe
+from src.lib.timeframe import next_update_schedule
 from src.services.backtester import Backtester
 from src.services.breakout_detector import BreakoutDetector
+from src.services.parameter_sweep import ParameterSweep
+from src.services.portfolio_backtest import PortfolioBacktest
+from src.services.price_fetcher import PriceFetcher
 from src.services.supply_demand_detector import SupplyDemandDetector
 from src.services.trade_ranker import TradeRanker
 from src.services.trendline_detector import TrendlineDetector
+from src.services.walk_forward import WalkForward
 
 console = Console()
+progress_console = Console(stderr=True)
+
+# Config entries that change where or how fast results are produced, not the results.
+_UNCACHED_KEYS = {"result_cache_dir", "result_cache_max_mb", "sweep_processes"}
+
+
+async def _load_history(
+    config: Dict[str, Any],
+    rate_limiter: Optional[TokenBucket] = None,
+) -> CandleFrame:
+    store = OHLCVStore(config["store_dir"]) if config.get("store_dir") else None
+    start = _parse_date(config.get("start_date"))
+    end = _parse_date(config.get("end_date"))
+    symbol, timeframe = config["pair_symbol"], config["timeframe"]
+    if store is not None and end is not None and store.exists(symbol, timeframe):
+        stored = store.open(symbol, timeframe)
+        if _covers(stored, timeframe, start, end):
+            return stored.between(_epoch_ms(start), _epoch_ms(end))
+
+    candles, online = await _fetch_history(config, start, end, rate_limiter)
+    # Synthetic offline candles are served but never written over real history.
+    if store is None or not online:
+        return candles
+    store.append(symbol, timeframe, candles)
+    return store.open(symbol, timeframe).between(_epoch_ms(start), _epoch_ms(end))
+
+
+def _covers(
+    stored: CandleFrame,
+    timeframe: str,
+    start: Optional[datetime],
+    end: datetime,
+) -> bool:
+    if not len(stored):
+        return False
+    timestamps = stored.timestamp
+    interval_ms = int(next_update_schedule(timeframe).total_seconds() * 1000)
+    starts_early = start is None or int(timestamps[0]) <= int(start.timestamp() * 1000)
+    if not (starts_early and int(timestamps[-1]) >= int(end.timestamp() * 1000) - interval_ms):
+        return False
+    # A missing bar inside the range means the store cannot serve it as-is.
+    window = stored.between(_epoch_ms(start), _epoch_ms(end)).timestamp
+    return bool(np.all(np.diff(window) == interval_ms))
+
+
+def _epoch_ms(value: Optional[datetime]) -> Optional[int]:
+    return None if value is None else int(value.timestamp() * 1000)
+
+
+async def _fetch_history(
+    config: Dict[str, Any],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    rate_limiter: Optional[TokenBucket] = None,
+) -> Tuple[CandleFrame, bool]:
+    fetcher = PriceFetcher(
+        cache_dir=config.get("cache_dir"),
+        universe_size=config.get("universe_size", 50),
+        rate_limiter=rate_limiter,
+    )
+
+    def _report(done: int, total: int) -> None:
+        progress_console.log(f"Backfilled {done}/{total} windows for {config['pair_symbol']}")
+
+    try:
+        if start is None:
+            candles = await fetcher.fetch_ohlcv(
+                config["pair_symbol"], config["timeframe"], limit=200
+            )
+        else:
+            candles = await fetcher.backfill(
+                config["pair_symbol"],
+                config["timeframe"],
+                start=start,
+                end=end,
+                progress=_report,
+            )
+        return candles, fetcher.online
+    finally:
+        await fetcher.close()
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
 
 
 def run_backtest(config_path: Path) -> Dict[str, Any]:
     config = json.loads(Path(config_path).read_text(encoding="utf-8"))
-    candles = asyncio.run(_fetch_candles(config))
+    if config.get("pairs"):
+        return _run_portfolio(config)
+    candles = asyncio.run(_load_history(config))
+    cache = _result_cache(config)
+    if cache is None:
+        return _run_on_candles(config, candles)
+    parameters = {
+        "config": {name: value for name, value in config.items() if name not in _UNCACHED_KEYS},
+        "components": [
+            describe(component)
+            for component in (
+                TrendlineDetector(),
+                BreakoutDetector(),
+                SupplyDemandDetector(),
+                TradeRanker(),
+            )
+        ],
+    }
+    key = cache.key("backtest", candles, parameters)
+    cached = cache.load(key)
+    if cached is not None:
+        return cast(Dict[str, Any], cached)
+    result = _run_on_candles(config, candles)
+    cache.store(key, result)
+    return result
+
+
+def _run_on_candles(config: Dict[str, Any], candles: CandleFrame) -> Dict[str, Any]:
+    if config.get("walk_forward"):
+        return _run_walk_forward(config, candles)
+    if config.get("parameter_grid"):
+        return _run_sweep(config, candles)
     backtester = Backtester(
         trendline_detector=TrendlineDetector(),
         breakout_detector=BreakoutDetector(),
@@ -39,6 +168,98 @@ def run_backtest(config_path: Path) -> Dict[str, Any]:
     }
 
 
+def _run_portfolio(config: Dict[str, Any]) -> Dict[str, Any]:
+    timeframes = config.get("timeframes") or [config["timeframe"]]
+    # Every source loads on one event loop through one token bucket, so the whole
+    # portfolio stays within a single exchange rate budget.
+    loop = asyncio.new_event_loop()
+    rate_limiter = TokenBucket()
+
+    def load_candles(pair_symbol: str, timeframe: str) -> CandleFrame:
+        source = {**config, "pair_symbol": pair_symbol, "timeframe": timeframe}
+        return loop.run_until_complete(_load_history(source, rate_limiter))
+
+    portfolio = PortfolioBacktest(
+        load_candles=load_candles,
+        parameters=config.get("parameters", {}),
+        position_fraction=float(config.get("position_fraction", 0.1)),
+        processes=config.get("sweep_processes"),
+    )
+    try:
+        report = portfolio.run(
+            [(pair, timeframe) for pair in config["pairs"] for timeframe in timeframes],
+            initial_balance=float(config.get("initial_balance", 10_000.0)),
+        )
+    finally:
+        loop.close()
+    return {"pairs": report.pairs, "metrics": report.metrics, "summary": report.summary}
+
+
+def _run_sweep(config: Dict[str, Any], candles: CandleFrame) -> Dict[str, Any]:
+    sweep = ParameterSweep(
+        processes=config.get("sweep_processes"),
+        rank_by=config.get("rank_by", "sortino_ratio"),
+    )
+    results = sweep.run(
+        pair_symbol=config["pair_symbol"],
+        timeframe=config["timeframe"],
+        candles=candles,
+        grid=config["parameter_grid"],
+        initial_balance=float(config.get("initial_balance", 10_000.0)),
+    )
+    return {
+        "results": [
+            {
+                "rank": rank,
+                "parameters": result.parameters,
+                "metrics": result.metrics,
+                "summary": result.summary,
+            }
+            for rank, result in enumerate(results, start=1)
+        ]
+    }
+
+
+def _run_walk_forward(config: Dict[str, Any], candles: CandleFrame) -> Dict[str, Any]:
+    options = config["walk_forward"]
+    walk_forward = WalkForward(
+        train_bars=int(options["train_bars"]),
+        test_bars=int(options["test_bars"]),
+        anchored=bool(options.get("anchored", False)),
+        processes=config.get("sweep_processes"),
+        rank_by=config.get("rank_by", "sortino_ratio"),
+    )
+    report = walk_forward.run(
+        pair_symbol=config["pair_symbol"],
+        timeframe=config["timeframe"],
+        candles=candles,
+        grid=config.get("parameter_grid") or {},
+        initial_balance=float(config.get("initial_balance", 10_000.0)),
+    )
+    return {
+        "folds": [
+            {
+                "fold": result.fold.index,
+                "train": [
+                    candles.isoformat(result.fold.train_start),
+                    candles.isoformat(result.fold.test_start - 1),
+                ],
+                "test": [
+                    candles.isoformat(result.fold.test_start),
+                    candles.isoformat(result.fold.test_end - 1),
+                ],
+                "parameters": result.parameters,
+                "train_metrics": result.train_metrics,
+                "test_metrics": result.test_metrics,
+                "test_trades": len(result.test_trades),
+            }
+            for result in report.folds
+        ],
+        "metrics": report.metrics,
+        "summary": {"total_trades": float(len(report.trades)), "folds": float(len(report.folds))},
+    }
+
+
 def backtest_command(config: Path) -> None:
     result = run_backtest(config)
     console.print_json(data=result)
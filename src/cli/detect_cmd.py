@@ -3,45 +3,111 @@ from __future__ import annotations
 import asyncio
 import json
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, cast
 
 from rich.console import Console
 
+from src.lib.candle_frame import CandleFrame
+from src.lib.result_cache import DEFAULT_MAX_BYTES, ResultCache, candle_digest, describe
+from src.lib.timeframe import Timeframe
 from src.services.price_fetcher import PriceFetcher
 from src.services.trendline_detector import TrendlineDetector
 from src.services.breakout_detector import BreakoutDetector
+from src.services.htf_trend_cache import HIGHER_TIMEFRAMES, HTFTrendCache
 from src.services.supply_demand_detector import SupplyDemandDetector
 from src.services.trade_ranker import TradeRanker
 
 console = Console()
 
 
-async def _fetch_candles(config: Dict[str, Any]) -> List[dict]:
-    fetcher = PriceFetcher(cache_dir=None, universe_size=config.get("universe_size", 50))
-    candles = await fetcher.fetch_ohlcv(config["pair_symbol"], config["timeframe"], limit=200)
-    await fetcher.close()
-    return candles
+async def _fetch_candles(
+    fetcher: PriceFetcher, config: Dict[str, Any], timeframe: str
+) -> CandleFrame:
+    return await fetcher.fetch_ohlcv(config["pair_symbol"], timeframe, limit=200)
 
 
-def run_detection(config_path: Path) -> List[dict]:
+async def _fetch_timeframes(config: Dict[str, Any]) -> Dict[str, CandleFrame]:
+    """Candles for the configured timeframe and the daily/weekly trend above it, via one fetcher."""
+
+    fetcher = PriceFetcher(
+        cache_dir=config.get("cache_dir"), universe_size=config.get("universe_size", 50)
+    )
+    timeframes = [
+        config["timeframe"],
+        *(htf.value for htf in HIGHER_TIMEFRAMES[Timeframe.from_str(config["timeframe"])]),
+    ]
+    try:
+        frames = await asyncio.gather(*(_fetch_candles(fetcher, config, tf) for tf in timeframes))
+    finally:
+        await fetcher.close()
+    return dict(zip(timeframes, frames, strict=True))
+
+
+def _result_cache(config: Dict[str, Any]) -> Optional[ResultCache]:
+    if not config.get("result_cache_dir"):
+        return None
+    max_bytes = int(config.get("result_cache_max_mb", DEFAULT_MAX_BYTES // 2**20)) * 2**20
+    return ResultCache(config["result_cache_dir"], max_bytes=max_bytes)
+
+
+def _htf_trend(config: Dict[str, Any], frames: Dict[str, CandleFrame]) -> HTFTrendCache:
+    """Daily and weekly trend above the configured timeframe, derived once for this cycle."""
+
+    cache = HTFTrendCache()
+    for timeframe, candles in frames.items():
+        if timeframe != config["timeframe"]:
+            cache.refresh(config["pair_symbol"], timeframe, candles)
+    return cache
+
+
+def run_detection(config_path: Path) -> List[Dict[str, Any]]:
     config = json.loads(Path(config_path).read_text(encoding="utf-8"))
-    candles = asyncio.run(_fetch_candles(config))
-    trendlines = TrendlineDetector().detect(config["pair_symbol"], config["timeframe"], candles)
+    frames = asyncio.run(_fetch_timeframes(config))
+    candles = frames[config["timeframe"]]
+    trendline_detector = TrendlineDetector()
     breakout_detector = BreakoutDetector()
-    breakouts = []
-    for trendline in trendlines:
-        breakouts.extend(breakout_detector.detect(trendline, candles))
-    sd_levels = SupplyDemandDetector().detect(config["pair_symbol"], config["timeframe"], candles)
-    setups = TradeRanker().rank(trendlines, breakouts, sd_levels)
+    sd_detector = SupplyDemandDetector()
+    ranker = TradeRanker()
+
+    # Unchanged candles under unchanged parameters and code skip the whole pipeline. The
+    # higher-timeframe candles decide the "HTF aligned" factor, so they are part of the key.
+    cache = _result_cache(config)
+    key = None
+    if cache is not None:
+        parameters = {
+            "pair_symbol": config["pair_symbol"],
+            "timeframe": config["timeframe"],
+            "components": [
+                describe(c) for c in (trendline_detector, breakout_detector, sd_detector, ranker)
+            ],
+            "htf_candles": {
+                timeframe: candle_digest(frame)
+                for timeframe, frame in frames.items()
+                if timeframe != config["timeframe"]
+            },
+        }
+        key = cache.key("detect", candles, parameters)
+        cached = cache.load(key)
+        if cached is not None:
+            return cast(List[Dict[str, Any]], cached)
+
+    ranker.htf_cache = _htf_trend(config, frames)
+    trendlines = trendline_detector.detect(config["pair_symbol"], config["timeframe"], candles)
+    breakouts = breakout_detector.detect_batch(trendlines, candles)
+    sd_levels = sd_detector.detect(config["pair_symbol"], config["timeframe"], candles)
+    setups = ranker.rank(trendlines, breakouts, sd_levels, candles)
     results = [
         {
             "trendline_id": setup.trendline_id,
             "breakout_id": setup.breakout_id,
             "confidence_score": setup.confidence_score,
             "a_plus": setup.a_plus,
+            "confirmation_factors": setup.confirmation_factors,
         }
         for setup in setups
     ]
+    if cache is not None and key is not None:
+        cache.store(key, results)
     return results
 
 
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class BreakoutScan:
+    """Bar indices of every line break; ``-1`` marks a stage that was not reached.
+
+    ``line_index`` names the row of the line matrix each break belongs to.
+    """
+
+    line_index: np.ndarray
+    break_index: np.ndarray
+    retest_index: np.ndarray
+    rejection_index: np.ndarray
+
+
+def next_true(mask: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Return, for each ``(row, col)`` query, the first ``u >= col`` where ``mask[row, u]``
+    holds, or ``mask.shape[1]`` when there is none.
+
+    Only the hits of the boolean mask are materialised and the queries are answered by
+    binary search, so no full-size index matrix is built.
+    """
+
+    count = mask.shape[1]
+    hits = np.flatnonzero(mask)
+    if not len(hits):
+        return np.full(len(rows), count, dtype=np.int64)
+    position = np.searchsorted(hits, rows * count + np.minimum(cols, count))
+    found = hits[np.minimum(position, len(hits) - 1)]
+    same_row = (position < len(hits)) & (found // count == rows) & (cols < count)
+    first: np.ndarray = np.where(same_row, found % count, count).astype(np.int64)
+    return first
+
+
+def scan_breakouts(
+    close: np.ndarray,
+    near: np.ndarray,
+    line: np.ndarray,
+    start: int | np.ndarray,
+    sign: float | np.ndarray,
+    retest_window: int,
+    retest_tolerance_pct: float = 0.5,
+    rejection_pct: float = 1.0,
+) -> BreakoutScan:
+    """Find every close through each line from its ``start`` bar onwards in one pass.
+
+    ``line`` holds one row of line values per trendline (a 1-D array is a single line);
+    ``near``, ``start`` and ``sign`` broadcast against it. ``sign`` is ``1`` for upward
+    breaks of resistance and ``-1`` for downward breaks of support; ``near`` is the wick
+    that comes back to the line on a retest (lows for upward breaks, highs for downward
+    ones). A break reaches the retest stage when the wick returns within
+    ``retest_tolerance_pct`` of the line inside ``retest_window`` bars, and the rejection
+    stage when a close then sits ``rejection_pct`` beyond the line inside another
+    ``retest_window`` bars. A close back through the line by more than the retest
+    tolerance ends the break at its current stage.
+    """
+
+    line = np.atleast_2d(line)
+    rows, count = line.shape
+    empty = np.empty(0, dtype=np.int64)
+    if count < 2 or not rows:
+        return BreakoutScan(empty, empty, empty, empty)
+    sign = np.broadcast_to(np.asarray(sign, dtype=np.float64), (rows,))[:, None]
+    start = np.maximum(np.broadcast_to(np.asarray(start, dtype=np.int64), (rows,)), 1)[:, None]
+    c = sign * np.asarray(close, dtype=np.float64)
+    wick = sign * np.broadcast_to(near, line.shape)
+    level = sign * line
+    band = np.abs(line) / 100
+    beyond = c > level
+    crossing = np.zeros(line.shape, dtype=bool)
+    crossing[:, 1:] = beyond[:, 1:] & ~beyond[:, :-1]
+    crossing &= np.arange(count)[None, :] >= start
+    line_index, breaks = np.nonzero(crossing)
+    if not len(breaks):
+        return BreakoutScan(empty, empty, empty, empty)
+
+    retest_mask = wick <= level + band * retest_tolerance_pct
+    rejection_mask = c >= level + band * rejection_pct
+    failure_mask = c < level - band * retest_tolerance_pct
+
+    after = breaks + 1
+    failure = next_true(failure_mask, line_index, after)
+    retest = next_true(retest_mask, line_index, after)
+    has_retest = (retest < count) & (retest - breaks <= retest_window) & (failure > retest)
+    rejection = next_true(rejection_mask, line_index, np.where(has_retest, retest, count))
+    has_rejection = (
+        has_retest
+        & (rejection < count)
+        & (rejection - retest <= retest_window)
+        & (failure > rejection)
+    )
+    return BreakoutScan(
+        line_index=line_index.astype(np.int64),
+        break_index=breaks.astype(np.int64),
+        retest_index=np.where(has_retest, retest, -1).astype(np.int64),
+        rejection_index=np.where(has_rejection, rejection, -1).astype(np.int64),
+    )
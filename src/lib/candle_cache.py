@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.lib.candle_frame import CANDLE_FIELDS, CandleFrame
+from src.lib.timeframe import next_update_schedule
+
+
+class CandleCache:
+    """Columnar on-disk OHLCV cache, one array per candle field."""
+
+    def __init__(self, cache_dir: Path | str) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, symbol: str, timeframe: str) -> Path:
+        return self.cache_dir / f"{symbol}_{timeframe}.npz"
+
+    def load(self, symbol: str, timeframe: str) -> Optional[CandleFrame]:
+        path = self.path_for(symbol, timeframe)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as archive:
+                return CandleFrame.from_columns({name: archive[name] for name in CANDLE_FIELDS})
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def store(self, symbol: str, timeframe: str, frame: CandleFrame) -> None:
+        path = self.path_for(symbol, timeframe)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{path.stem}-", suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                columns: Dict[str, Any] = frame.columns()
+                np.savez(handle, **columns)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def is_fresh(frame: CandleFrame, timeframe: str, now: Optional[datetime] = None) -> bool:
+        if not len(frame):
+            return False
+        try:
+            interval = next_update_schedule(timeframe)
+        except ValueError:
+            return False
+        now = now or datetime.now(tz=timezone.utc)
+        last_open = datetime.fromtimestamp(int(frame.timestamp[-1]) / 1000, tz=timezone.utc)
+        return now < last_open + interval
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, List, Optional, TypeVar, cast, overload
+
+import numpy as np
+
+from src.lib.timeframe import candle_open_ms
+from src.lib.validators import _normalize_timestamp
+
+CANDLE_FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+PRICE_FIELDS = CANDLE_FIELDS[1:]
+
+T = TypeVar("T")
+
+
+def to_epoch_ms(timestamp: str) -> int:
+    return int(_normalize_timestamp(timestamp).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def format_epoch_ms(timestamp: int) -> str:
+    return datetime.fromtimestamp(int(timestamp) / 1000, tz=timezone.utc).isoformat()
+
+
+@dataclass(eq=False)
+class CandleFrame(Sequence[Dict[str, Any]]):
+    """Columnar OHLCV series: int64 epoch-millisecond timestamps and float64 prices.
+
+    Integer indexing yields a candle dict for callers still written against the
+    list-of-dicts format; slicing returns a frame of views without copying.
+    """
+
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    _derived: Dict[Hashable, Any] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.timestamp = _as_column(self.timestamp, np.int64)
+        for name in PRICE_FIELDS:
+            setattr(self, name, _as_column(getattr(self, name), np.float64))
+        if any(len(getattr(self, name)) != len(self.timestamp) for name in PRICE_FIELDS):
+            raise ValueError("Candle columns must have equal length")
+
+    @classmethod
+    def from_candles(cls, candles: Sequence[Dict[str, Any]]) -> "CandleFrame":
+        if isinstance(candles, CandleFrame):
+            return candles
+        return cls(
+            timestamp=np.asarray([to_epoch_ms(c["timestamp"]) for c in candles], dtype=np.int64),
+            **{
+                name: np.asarray([c[name] for c in candles], dtype=np.float64)
+                for name in PRICE_FIELDS
+            },
+        )
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray]) -> "CandleFrame":
+        return cls(**{name: columns[name] for name in CANDLE_FIELDS})
+
+    @classmethod
+    def empty(cls) -> "CandleFrame":
+        return cls.from_columns({name: np.empty(0) for name in CANDLE_FIELDS})
+
+    def derived(self, key: Hashable, compute: Callable[[], T]) -> T:
+        """Memoise a value computed from this frame's columns; frames are never mutated."""
+
+        if key not in self._derived:
+            self._derived[key] = compute()
+        return cast(T, self._derived[key])
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: getattr(self, name) for name in CANDLE_FIELDS}
+
+    def to_candles(self) -> List[Dict[str, Any]]:
+        prices = [getattr(self, name).tolist() for name in PRICE_FIELDS]
+        return [
+            {"timestamp": format_epoch_ms(ts), **dict(zip(PRICE_FIELDS, row, strict=True))}
+            for ts, *row in zip(self.timestamp.tolist(), *prices, strict=True)
+        ]
+
+    def isoformat(self, index: int) -> str:
+        return format_epoch_ms(self.timestamp[index])
+
+    def between(
+        self, start_ms: Optional[int] = None, end_ms: Optional[int] = None
+    ) -> "CandleFrame":
+        lo = 0 if start_ms is None else int(np.searchsorted(self.timestamp, start_ms, side="left"))
+        hi = (
+            len(self)
+            if end_ms is None
+            else int(np.searchsorted(self.timestamp, end_ms, side="left"))
+        )
+        return self[lo:hi]
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @overload
+    def __getitem__(self, index: int) -> Dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "CandleFrame": ...
+
+    def __getitem__(self, index: int | slice) -> Dict[str, Any] | "CandleFrame":
+        if isinstance(index, slice):
+            return CandleFrame.from_columns(
+                {name: values[index] for name, values in self.columns().items()}
+            )
+        candle: Dict[str, Any] = {"timestamp": self.isoformat(index)}
+        for name in PRICE_FIELDS:
+            candle[name] = float(getattr(self, name)[index])
+        return candle
+
+
+def _as_column(values: Any, dtype: type) -> np.ndarray:
+    # Memory-mapped and already-typed columns are kept as-is so slices stay views.
+    if isinstance(values, np.ndarray) and values.dtype == dtype and values.ndim == 1:
+        return values
+    return np.ascontiguousarray(values, dtype=dtype).reshape(-1)
+
+
+def merge_frames(existing: CandleFrame, incoming: CandleFrame) -> CandleFrame:
+    """Union two frames by timestamp, letting ``incoming`` win on overlapping candles."""
+
+    combined = {
+        name: np.concatenate([getattr(existing, name), getattr(incoming, name)])
+        for name in CANDLE_FIELDS
+    }
+    order = np.argsort(combined["timestamp"], kind="stable")
+    timestamps = combined["timestamp"][order]
+    keep = np.ones(len(timestamps), dtype=bool)
+    keep[:-1] = timestamps[:-1] != timestamps[1:]
+    selected = order[keep]
+    return CandleFrame.from_columns({name: values[selected] for name, values in combined.items()})
+
+
+def resample(frame: CandleFrame, timeframe: str) -> CandleFrame:
+    """Aggregate ``frame`` into ``timeframe`` candles, starting at the first complete period.
+
+    The last candle may still be forming; callers keep only candles that have closed.
+    """
+
+    opens = candle_open_ms(timeframe, frame.timestamp)
+    if len(frame) and opens[0] != frame.timestamp[0]:
+        # The first period began before the frame, so its open, high and low are unknown.
+        first = int(np.searchsorted(opens, opens[0], side="right"))
+        frame, opens = frame[first:], opens[first:]
+    if not len(frame):
+        return CandleFrame.empty()
+    starts = np.flatnonzero(np.r_[True, opens[1:] != opens[:-1]])
+    ends = np.r_[starts[1:], len(frame)] - 1
+    return CandleFrame.from_columns(
+        {
+            "timestamp": opens[starts],
+            "open": frame.open[starts],
+            "high": np.maximum.reduceat(frame.high, starts),
+            "low": np.minimum.reduceat(frame.low, starts),
+            "close": frame.close[ends],
+            "volume": np.add.reduceat(frame.volume, starts),
+        }
+    )
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+PERIOD_MS = 86_400_000
+PERIODS_PER_YEAR = 365
+
+# Summary metrics by name. Sortino and profit factor are None when nothing lost: the ratio is
+# undefined (not 0.0, which means nothing won), and None stays valid JSON where inf does not.
+Metrics = Dict[str, Optional[float]]
+
+
+@dataclass(frozen=True)
+class EquityCurve:
+    """Account equity after each closed trade, starting from the initial balance.
+
+    Trades compound on the whole balance, so ``equity[i + 1] = equity[i] * (1 + r_i)``.
+    """
+
+    timestamps: np.ndarray
+    equity: np.ndarray
+
+    @property
+    def pnl(self) -> np.ndarray:
+        return np.diff(self.equity)
+
+    @property
+    def drawdowns(self) -> np.ndarray:
+        return self.equity / np.maximum.accumulate(self.equity) - 1
+
+    def period_returns(self, period_ms: int = PERIOD_MS) -> np.ndarray:
+        """Return of every period from the first exit to the last; idle periods return 0."""
+
+        if len(self.timestamps) == 0:
+            return np.empty(0, dtype=np.float64)
+        buckets = self.timestamps // period_ms
+        buckets = buckets - buckets[0]
+        last = np.ones(len(buckets), dtype=bool)
+        last[:-1] = buckets[1:] != buckets[:-1]
+        closing = np.full(int(buckets[-1]) + 1, np.nan)
+        closing[buckets[last]] = self.equity[1:][last]
+        filled = np.where(np.isnan(closing), 0, np.arange(len(closing)))
+        closing = closing[np.maximum.accumulate(filled)]
+        opening = np.concatenate([self.equity[:1], closing[:-1]])
+        returns: np.ndarray = closing / opening - 1
+        return returns
+
+
+def equity_curve(trades: Sequence[Dict[str, float]], initial_balance: float) -> EquityCurve:
+    exits = np.array([trade["exit_timestamp"] for trade in trades], dtype=np.int64)
+    returns = np.array([trade["return_pct"] for trade in trades], dtype=np.float64) / 100
+    order = np.argsort(exits, kind="stable")
+    growth = np.cumprod(1 + returns[order])
+    return EquityCurve(
+        timestamps=exits[order],
+        equity=initial_balance * np.concatenate([[1.0], growth]),
+    )
+
+
+def sortino_ratio(returns: np.ndarray, periods_per_year: int = PERIODS_PER_YEAR) -> Optional[float]:
+    """Annualised mean return over downside deviation, with a 0% target (research.md)."""
+
+    returns = np.asarray(returns, dtype=np.float64)
+    if not len(returns):
+        return 0.0
+    downside = np.minimum(returns, 0.0)
+    return _sortino(
+        float(returns.sum()), float(downside @ downside), len(returns), periods_per_year
+    )
+
+
+def profit_factor(pnl: np.ndarray) -> Optional[float]:
+    pnl = np.asarray(pnl, dtype=np.float64)
+    return _profit_factor(float(pnl[pnl > 0].sum()), float(-pnl[pnl < 0].sum()))
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    """Largest peak-to-trough decline as a fraction of the peak; always <= 0."""
+
+    equity = np.asarray(equity, dtype=np.float64)
+    if not len(equity):
+        return 0.0
+    return float(min((equity / np.maximum.accumulate(equity) - 1).min(), 0.0))
+
+
+def summarize(trades: Sequence[Dict[str, float]], initial_balance: float) -> Metrics:
+    if not trades:
+        return {"sortino_ratio": 0.0, "profit_factor": 0.0, "max_drawdown": 0.0}
+    curve = equity_curve(trades, initial_balance)
+    return {
+        "sortino_ratio": _round(sortino_ratio(curve.period_returns())),
+        "profit_factor": _round(profit_factor(curve.pnl)),
+        "max_drawdown": _round(max_drawdown(curve.equity)),
+    }
+
+
+class StreamingMetrics:
+    """The ``summarize`` metrics kept up to date in O(1) per closed trade.
+
+    Trades must arrive in exit order. Periods without exits count as zero returns, as
+    in ``EquityCurve.period_returns``.
+    """
+
+    def __init__(self, initial_balance: float, period_ms: int = PERIOD_MS) -> None:
+        self.period_ms = period_ms
+        self.equity = float(initial_balance)
+        self.peak = self.equity
+        self.max_drawdown = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.trade_count = 0
+        self._period: Optional[int] = None
+        self._period_open = self.equity
+        self._periods = 0
+        self._return_sum = 0.0
+        self._downside_sq = 0.0
+
+    def add(self, trade: Dict[str, float]) -> None:
+        period = int(trade["exit_timestamp"]) // self.period_ms
+        if self._period is None:
+            self._period = period
+        elif period != self._period:
+            if period < self._period:
+                raise ValueError("Trades must be added in exit order")
+            self._close_period()
+            # Idle periods in between add zero returns: they only count towards the mean.
+            self._periods += period - self._period - 1
+            self._period = period
+            self._period_open = self.equity
+        pnl = self.equity * trade["return_pct"] / 100
+        if pnl > 0:
+            self.gross_profit += pnl
+        else:
+            self.gross_loss -= pnl
+        self.equity += pnl
+        self.peak = max(self.peak, self.equity)
+        self.max_drawdown = min(self.max_drawdown, self.equity / self.peak - 1)
+        self.trade_count += 1
+
+    @property
+    def sortino_ratio(self) -> Optional[float]:
+        if self._period is None:
+            return 0.0
+        current = self.equity / self._period_open - 1
+        downside = min(current, 0.0)
+        return _sortino(
+            self._return_sum + current,
+            self._downside_sq + downside * downside,
+            self._periods + 1,
+            PERIODS_PER_YEAR,
+        )
+
+    @property
+    def profit_factor(self) -> Optional[float]:
+        return _profit_factor(self.gross_profit, self.gross_loss)
+
+    def summary(self) -> Metrics:
+        if not self.trade_count:
+            return {"sortino_ratio": 0.0, "profit_factor": 0.0, "max_drawdown": 0.0}
+        return {
+            "sortino_ratio": _round(self.sortino_ratio),
+            "profit_factor": _round(self.profit_factor),
+            "max_drawdown": _round(self.max_drawdown),
+        }
+
+    def _close_period(self) -> None:
+        closed = self.equity / self._period_open - 1
+        self._return_sum += closed
+        self._downside_sq += min(closed, 0.0) ** 2
+        self._periods += 1
+
+
+def _sortino(
+    return_sum: float, downside_sq: float, count: int, periods_per_year: int
+) -> Optional[float]:
+    mean = return_sum / count
+    downside_deviation = math.sqrt(downside_sq / count)
+    if downside_deviation == 0:
+        # No losing period: undefined for a positive mean, flat otherwise.
+        return None if mean > 0 else 0.0
+    return mean / downside_deviation * math.sqrt(periods_per_year)
+
+
+def _profit_factor(gross_profit: float, gross_loss: float) -> Optional[float]:
+    if gross_loss == 0:
+        return None if gross_profit > 0 else 0.0
+    return gross_profit / gross_loss
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 4)
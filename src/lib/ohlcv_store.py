@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+from src.lib.candle_frame import CANDLE_FIELDS, PRICE_FIELDS, CandleFrame, merge_frames
+
+FIELD_DTYPES: Dict[str, np.dtype[Any]] = {name: np.dtype("<f8") for name in PRICE_FIELDS}
+FIELD_DTYPES["timestamp"] = np.dtype("<i8")
+
+
+class OHLCVStore:
+    """Append-only fixed-dtype OHLCV columns opened with ``numpy.memmap``."""
+
+    def __init__(self, root: Path | str) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def series_dir(self, symbol: str, timeframe: str) -> Path:
+        return self.root / f"{symbol}_{timeframe}"
+
+    def exists(self, symbol: str, timeframe: str) -> bool:
+        return (self.series_dir(symbol, timeframe) / "timestamp.bin").exists()
+
+    def append(self, symbol: str, timeframe: str, frame: CandleFrame) -> int:
+        """Add ``frame`` to the stored series and return how many new bars it brought.
+
+        Bars after the stored tail are appended in place. Bars at or before it that the
+        series does not hold yet (an earlier start, or a filled gap) rewrite the series.
+        """
+
+        directory = self.series_dir(symbol, timeframe)
+        directory.mkdir(parents=True, exist_ok=True)
+        mask = np.ones(len(frame), dtype=bool)
+        if self.exists(symbol, timeframe):
+            stored = self.open(symbol, timeframe)
+            self._truncate(directory, len(stored))
+            if len(stored):
+                older = frame.timestamp <= stored.timestamp[-1]
+                if not np.isin(frame.timestamp[older], stored.timestamp).all():
+                    return self._rewrite(directory, stored, frame)
+                mask = ~older
+        if not mask.any():
+            return 0
+        # Timestamp is written last so a crash mid-append leaves it as the shortest column.
+        for name in (*PRICE_FIELDS, "timestamp"):
+            values = np.ascontiguousarray(getattr(frame, name)[mask], dtype=FIELD_DTYPES[name])
+            with (directory / f"{name}.bin").open("ab") as handle:
+                handle.write(values.tobytes())
+        return int(mask.sum())
+
+    def open(self, symbol: str, timeframe: str) -> CandleFrame:
+        directory = self.series_dir(symbol, timeframe)
+        if not self.exists(symbol, timeframe):
+            raise FileNotFoundError(f"No stored series for {symbol} {timeframe} in {self.root}")
+        lengths = {
+            name: (directory / f"{name}.bin").stat().st_size // FIELD_DTYPES[name].itemsize
+            if (directory / f"{name}.bin").exists()
+            else 0
+            for name in CANDLE_FIELDS
+        }
+        rows = min(lengths.values())
+        columns: Dict[str, np.ndarray] = {}
+        for name in CANDLE_FIELDS:
+            if rows == 0:
+                columns[name] = np.empty(0, dtype=FIELD_DTYPES[name])
+            else:
+                columns[name] = np.memmap(
+                    directory / f"{name}.bin", dtype=FIELD_DTYPES[name], mode="r", shape=(rows,)
+                )
+        return CandleFrame.from_columns(columns)
+
+    @staticmethod
+    def _truncate(directory: Path, rows: int) -> None:
+        for name in CANDLE_FIELDS:
+            path = directory / f"{name}.bin"
+            size = rows * FIELD_DTYPES[name].itemsize
+            if path.exists() and path.stat().st_size != size:
+                with path.open("r+b") as handle:
+                    handle.truncate(size)
+
+    @staticmethod
+    def _rewrite(directory: Path, stored: CandleFrame, frame: CandleFrame) -> int:
+        merged = merge_frames(stored, frame)
+        # The merged columns are written beside the series and swapped in as a whole.
+        staging = Path(tempfile.mkdtemp(dir=directory.parent, prefix=f".{directory.name}-"))
+        try:
+            for name in CANDLE_FIELDS:
+                values = np.ascontiguousarray(getattr(merged, name), dtype=FIELD_DTYPES[name])
+                (staging / f"{name}.bin").write_bytes(values.tobytes())
+            retired = directory.with_name(f".{directory.name}.old")
+            shutil.rmtree(retired, ignore_errors=True)
+            directory.rename(retired)
+            staging.rename(directory)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        shutil.rmtree(retired, ignore_errors=True)
+        return len(merged) - len(stored)
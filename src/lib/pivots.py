@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+
+def find_pivots(
+    values: np.ndarray,
+    width: int = 2,
+    kind: str = "low",
+    min_spacing: int = 1,
+) -> np.ndarray:
+    """Return indices of fractal swing lows (``kind="low"``) or highs (``kind="high"``).
+
+    A bar is a pivot when it equals the extreme of the ``2 * width + 1`` bars centred
+    on it. Pivots closer than ``min_spacing`` bars to the previously kept pivot are
+    dropped, matching the detector's original left-to-right scan.
+    """
+
+    if kind not in {"low", "high"}:
+        raise ValueError(f"Unsupported pivot kind: {kind}")
+    if width < 1:
+        raise ValueError("Pivot width must be at least 1")
+    values = np.asarray(values, dtype=np.float64)
+    span = 2 * width + 1
+    if len(values) < span:
+        return np.empty(0, dtype=np.int64)
+    reduce = np.minimum if kind == "low" else np.maximum
+    count = len(values) - span + 1
+    # Folding the window's shifted slices keeps every pass contiguous: O(n * width) in C.
+    extremes = values[:count].copy()
+    for offset in range(1, span):
+        reduce(extremes, values[offset : offset + count], out=extremes)
+    candidates = np.flatnonzero(values[width : width + count] == extremes) + width
+    return enforce_spacing(candidates, min_spacing)
+
+
+def find_swing_pivots(
+    lows: np.ndarray,
+    highs: np.ndarray,
+    width: int = 2,
+    min_spacing: int = 1,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(low_pivots, high_pivots)`` from one fused fold over both columns."""
+
+    if width < 1:
+        raise ValueError("Pivot width must be at least 1")
+    lows = np.asarray(lows, dtype=np.float64)
+    highs = np.asarray(highs, dtype=np.float64)
+    span = 2 * width + 1
+    if len(lows) < span:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    count = len(lows) - span + 1
+    minima = lows[:count].copy()
+    maxima = highs[:count].copy()
+    for offset in range(1, span):
+        np.minimum(minima, lows[offset : offset + count], out=minima)
+        np.maximum(maxima, highs[offset : offset + count], out=maxima)
+    low_candidates = np.flatnonzero(lows[width : width + count] == minima) + width
+    high_candidates = np.flatnonzero(highs[width : width + count] == maxima) + width
+    return enforce_spacing(low_candidates, min_spacing), enforce_spacing(
+        high_candidates, min_spacing
+    )
+
+
+def enforce_spacing(indices: np.ndarray, min_spacing: int) -> np.ndarray:
+    if min_spacing <= 1 or len(indices) < 2:
+        return indices.astype(np.int64, copy=False)
+    # jump[i] is the first candidate far enough from candidate i, so the walk below
+    # only visits pivots that are kept.
+    jump = np.searchsorted(indices, indices + min_spacing, side="left")
+    kept = []
+    position = 0
+    while position < len(indices):
+        kept.append(position)
+        position = int(jump[position])
+    return indices[kept].astype(np.int64, copy=False)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+BINANCE_WEIGHT_PER_MINUTE = 1200
+
+
+class TokenBucket:
+    """Async token bucket used to keep request weight under an exchange budget."""
+
+    def __init__(
+        self,
+        capacity: float = BINANCE_WEIGHT_PER_MINUTE,
+        refill_per_second: float = BINANCE_WEIGHT_PER_MINUTE / 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        if capacity <= 0 or refill_per_second <= 0:
+            raise ValueError("Token bucket capacity and refill rate must be positive")
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+        self._lock = asyncio.Lock()
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, weight: float = 1.0) -> None:
+        if weight > self.capacity:
+            raise ValueError(f"Request weight {weight} exceeds bucket capacity {self.capacity}")
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return
+                await self._sleep((weight - self._tokens) / self.refill_per_second)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(now - self._updated_at, 0.0)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+        self._updated_at = now
+
+
+def klines_request_weight(limit: int) -> int:
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
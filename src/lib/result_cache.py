@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.lib.candle_frame import CANDLE_FIELDS, CandleFrame
+
+SOURCE_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def code_version() -> str:
+    """Digest of every source file, so results cached by older code are never served."""
+
+    digest = hashlib.sha256()
+    for path in sorted(SOURCE_ROOT.rglob("*.py")):
+        digest.update(str(path.relative_to(SOURCE_ROOT)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def candle_digest(frame: CandleFrame) -> str:
+    def compute() -> str:
+        digest = hashlib.sha256()
+        for name in CANDLE_FIELDS:
+            digest.update(memoryview(getattr(frame, name)).cast("B"))
+        return digest.hexdigest()
+
+    return frame.derived("sha256", compute)
+
+
+def describe(component: Any) -> Dict[str, Any]:
+    """Parameters of a detector or ranker, as stored on the instance."""
+
+    return {"type": type(component).__qualname__, **vars(component)}
+
+
+class ResultCache:
+    """Content-addressed on-disk store for pipeline results, evicting least recently used entries.
+
+    A key hashes the candle columns, the parameters and ``code_version()``; reading an
+    entry refreshes its mtime, and writes trim the directory back under ``max_bytes``
+    by deleting the entries with the oldest mtimes.
+    """
+
+    def __init__(self, cache_dir: Path | str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(kind: str, frame: CandleFrame, parameters: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            {
+                "kind": kind,
+                "candles": candle_digest(frame),
+                "parameters": parameters,
+                "code": code_version(),
+            },
+            sort_keys=True,
+            default=repr,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Any]:
+        path = self.path_for(key)
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                result = json.load(handle)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return result
+
+    def store(self, key: str, result: Any) -> None:
+        path = self.path_for(key)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key[:16]}-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(result, handle)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.lib.candle_frame import CandleFrame
+
+VOLUME_AVERAGE_PERIOD = 20
+VOLUME_SPIKE_RATIO = 1.2
+
+
+@dataclass(frozen=True)
+class RollingStats:
+    """Mean and standard deviation of the ``period`` values preceding each bar.
+
+    Both are derived from cumulative sums, so building them is O(n) and every lookup
+    is O(1). The first bar has no history and uses its own value as the baseline.
+    """
+
+    values: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+    period: int
+
+    @classmethod
+    def compute(cls, values: np.ndarray, period: int = VOLUME_AVERAGE_PERIOD) -> "RollingStats":
+        if period < 1:
+            raise ValueError("Rolling period must be at least 1")
+        values = np.asarray(values, dtype=np.float64)
+        count = len(values)
+        # Centring first keeps the sum of squares well conditioned over long histories.
+        offset = values.mean() if count else 0.0
+        centred = values - offset
+        sums = np.concatenate([[0.0], np.cumsum(centred)])
+        squares = np.concatenate([[0.0], np.cumsum(centred * centred)])
+        end = np.arange(count)
+        start = np.maximum(end - period, 0)
+        size = end - start
+        window = np.maximum(size, 1)
+        mean = (sums[end] - sums[start]) / window
+        variance = np.maximum((squares[end] - squares[start]) / window - mean * mean, 0.0)
+        empty = size == 0
+        mean = np.where(empty, centred, mean) + offset
+        std = np.where(empty, 0.0, np.sqrt(variance))
+        return cls(values=values, mean=mean, std=std, period=period)
+
+    def window(self, start: int, stop: int) -> "RollingStats":
+        """Stats of bars ``start:stop``; each bar keeps the baseline of its full history."""
+
+        return RollingStats(
+            values=self.values[start:stop],
+            mean=self.mean[start:stop],
+            std=self.std[start:stop],
+            period=self.period,
+        )
+
+    def ratio(self) -> np.ndarray:
+        ratio: np.ndarray = np.divide(
+            self.values, self.mean, out=np.zeros_like(self.values), where=self.mean > 0
+        )
+        return ratio
+
+    def zscore(self) -> np.ndarray:
+        zscore: np.ndarray = np.divide(
+            self.values - self.mean, self.std, out=np.zeros_like(self.values), where=self.std > 0
+        )
+        return zscore
+
+    def spikes(self, threshold: float = VOLUME_SPIKE_RATIO) -> np.ndarray:
+        """Bar indices whose value is at least ``threshold`` times the trailing mean."""
+
+        return np.flatnonzero(self.ratio() >= threshold)
+
+
+def volume_stats(frame: CandleFrame, period: int = VOLUME_AVERAGE_PERIOD) -> RollingStats:
+    return frame.derived(
+        ("volume_stats", period), lambda: RollingStats.compute(frame.volume, period)
+    )
@@ -3,7 +3,12 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import timedelta
 from enum import Enum
-from typing import Union
+from typing import TypeVar, Union
+
+import numpy as np
+
+
+T = TypeVar("T", int, np.ndarray)
 
 
 class Timeframe(Enum):
@@ -57,3 +62,25 @@ def next_update_schedule(timeframe: Union[str, Timeframe]) -> timedelta:
         Timeframe.WEEKLY: timedelta(days=7),
     }
     return mapping[tf]
+
+
+def horizon_bars(timeframe: Union[str, Timeframe]) -> int:
+    """``adaptive_horizon`` expressed in candles of ``timeframe``."""
+
+    return int(timedelta(days=adaptive_horizon(timeframe)) / next_update_schedule(timeframe))
+
+
+# Weekly candles open on Mondays; 1970-01-05 is the first Monday after the epoch.
+_WEEK_ANCHOR_MS = 4 * 86_400_000
+
+
+def interval_ms(timeframe: Union[str, Timeframe]) -> int:
+    return int(next_update_schedule(timeframe).total_seconds() * 1000)
+
+
+def candle_open_ms(timeframe: Union[str, Timeframe], epoch_ms: T) -> T:
+    """Open time of the ``timeframe`` candle containing ``epoch_ms`` (an int or int64 array)."""
+
+    anchor = _WEEK_ANCHOR_MS if Timeframe.from_str(timeframe) is Timeframe.WEEKLY else 0
+    step = interval_ms(timeframe)
+    return (epoch_ms - anchor) // step * step + anchor
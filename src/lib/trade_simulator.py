@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from src.lib.candle_frame import CandleFrame
+
+EXIT_STOP, EXIT_TARGET, EXIT_HORIZON = 0, 1, 2
+EXIT_REASONS = ("stop", "target", "horizon")
+
+
+@dataclass(frozen=True)
+class RangeTable:
+    """Sparse tables of the lowest low and highest high over power-of-two spans.
+
+    ``minima[k][i]`` is ``low[i : i + 2**k].min()``; building all levels is O(n log n).
+    """
+
+    minima: List[np.ndarray]
+    maxima: List[np.ndarray]
+
+    @classmethod
+    def build(cls, low: np.ndarray, high: np.ndarray) -> "RangeTable":
+        minima = [np.asarray(low, dtype=np.float64)]
+        maxima = [np.asarray(high, dtype=np.float64)]
+        span = 1
+        while 2 * span <= len(minima[0]):
+            minima.append(np.minimum(minima[-1][:-span], minima[-1][span:]))
+            maxima.append(np.maximum(maxima[-1][:-span], maxima[-1][span:]))
+            span *= 2
+        return cls(minima=minima, maxima=maxima)
+
+    def first_reach(
+        self, start: np.ndarray, end: np.ndarray, level: np.ndarray, below: np.ndarray
+    ) -> np.ndarray:
+        """First bar in ``[start, end)`` whose low reaches down to ``level`` (where ``below``)
+        or whose high reaches up to it; ``end`` when there is none.
+
+        Every query advances by the longest power-of-two run that stays clear of its
+        level, largest span first, so all queries resolve in O(log n) array steps.
+        """
+
+        position = np.asarray(start, dtype=np.int64).copy()
+        for k in reversed(range(len(self.minima))):
+            span = 1 << k
+            fits = position + span <= end
+            at = np.where(fits, position, 0)
+            reached = np.where(below, self.minima[k][at] <= level, self.maxima[k][at] >= level)
+            position = np.where(fits & ~reached, position + span, position)
+        return position
+
+
+@dataclass(frozen=True)
+class SimulatedExits:
+    exit_index: np.ndarray
+    exit_price: np.ndarray
+    reason: np.ndarray
+
+
+def range_table(frame: CandleFrame) -> RangeTable:
+    return frame.derived("range_table", lambda: RangeTable.build(frame.low, frame.high))
+
+
+def simulate_exits(
+    frame: CandleFrame,
+    entry_index: np.ndarray,
+    side: np.ndarray,
+    stop: np.ndarray,
+    target: np.ndarray,
+    horizon: int,
+) -> SimulatedExits:
+    """Resolve every trade's exit at once from the bars after its entry.
+
+    A trade exits on the first bar whose range reaches its stop or target, filling at the
+    open when the bar gaps through the level. A bar that reaches both counts as a stop,
+    since the path inside a bar is unknown. Trades that reach neither close at the bar
+    ``horizon`` candles after entry, or at the last bar of the frame.
+    """
+
+    entry_index = np.asarray(entry_index, dtype=np.int64)
+    side = np.asarray(side, dtype=np.float64)
+    stop = np.asarray(stop, dtype=np.float64)
+    target = np.asarray(target, dtype=np.float64)
+    start = entry_index + 1
+    end = np.minimum(entry_index + horizon, len(frame) - 1) + 1
+    table = range_table(frame)
+    longs = side > 0
+    stop_at = table.first_reach(start, end, stop, below=longs)
+    target_at = table.first_reach(start, end, target, below=~longs)
+
+    stopped = stop_at < end
+    targeted = (target_at < end) & (~stopped | (target_at < stop_at))
+    stopped &= ~targeted
+    exit_index = np.where(stopped, stop_at, np.where(targeted, target_at, end - 1))
+    opens = frame.open[exit_index]
+    stop_fill = np.where(side * (opens - stop) <= 0, opens, stop)
+    target_fill = np.where(side * (opens - target) >= 0, opens, target)
+    return SimulatedExits(
+        exit_index=exit_index,
+        exit_price=np.where(
+            stopped, stop_fill, np.where(targeted, target_fill, frame.close[exit_index])
+        ),
+        reason=np.where(stopped, EXIT_STOP, np.where(targeted, EXIT_TARGET, EXIT_HORIZON)).astype(
+            np.int8
+        ),
+    )
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+LINE_KINDS = ("low", "high")
+
+
+@dataclass(frozen=True)
+class LineCandidate:
+    touch_indices: np.ndarray
+    slope: float
+    intercept: float
+    r_squared: float
+    kind: str = "low"
+
+    @property
+    def touch_count(self) -> int:
+        return len(self.touch_indices)
+
+
+def fit_line_candidates(
+    pivot_indices: np.ndarray,
+    pivot_prices: np.ndarray,
+    kind: str = "low",
+    tolerance_pct: float = 0.5,
+    max_pivot_span: int = 30,
+    min_touches: int = 3,
+    max_lines: int = 25,
+) -> List[LineCandidate]:
+    """Enumerate, score and fit trendline candidates from pivot pairs in one batch.
+
+    Every pivot is paired with the next ``max_pivot_span`` pivots. A pair survives the
+    lower-envelope filter only when no pivot between the two lies beyond the line
+    joining them (below it for lows, above it for highs), so each anchor keeps only
+    its hull partners instead of all O(n^2) pairs. Survivors count touches within
+    ``tolerance_pct`` until a pivot breaks the line, and are refit by least squares
+    over their touches using masked matrix sums. ``slope`` is price per bar and
+    ``intercept`` is the fitted price at the first touch.
+    """
+
+    return fit_candidate_sets(
+        {kind: (pivot_indices, pivot_prices)},
+        tolerance_pct=tolerance_pct,
+        max_pivot_span=max_pivot_span,
+        min_touches=min_touches,
+        max_lines=max_lines,
+    )[kind]
+
+
+def fit_candidate_sets(
+    pivots: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    tolerance_pct: float = 0.5,
+    max_pivot_span: int = 30,
+    min_touches: int = 3,
+    max_lines: int = 25,
+) -> Dict[str, List[LineCandidate]]:
+    """Fit several pivot series (e.g. lows and highs) through one shared least-squares batch.
+
+    ``max_lines`` applies per kind; candidates never pair pivots across kinds.
+    """
+
+    results: Dict[str, List[LineCandidate]] = {kind: [] for kind in pivots}
+    blocks = []
+    for kind, (indices, prices) in pivots.items():
+        if kind not in LINE_KINDS:
+            raise ValueError(f"Unsupported line kind: {kind}")
+        block = _touch_block(
+            np.asarray(indices, dtype=np.int64),
+            np.asarray(prices, dtype=np.float64),
+            1.0 if kind == "low" else -1.0,
+            tolerance_pct,
+            max_pivot_span,
+            min_touches,
+        )
+        if block is not None:
+            blocks.append((kind, indices, block))
+    if not blocks:
+        return results
+
+    width = max(block[0].shape[1] for _, _, block in blocks)
+    touches = np.concatenate([_pad(block[0], width, False) for _, _, block in blocks])
+    px = np.concatenate([_pad(block[1], width, 0.0) for _, _, block in blocks])
+    py = np.concatenate([_pad(block[2], width, 0.0) for _, _, block in blocks])
+    weights = touches.astype(np.float64)
+    n = weights.sum(axis=1)
+    sx = (weights * px).sum(axis=1)
+    sy = (weights * py).sum(axis=1)
+    sxx = (weights * px * px).sum(axis=1)
+    sxy = (weights * px * py).sum(axis=1)
+    syy = (weights * py * py).sum(axis=1)
+    var_x = n * sxx - sx * sx
+    var_y = n * syy - sy * sy
+    cov = n * sxy - sx * sy
+    fit_slope = np.divide(cov, var_x, out=np.zeros_like(cov), where=var_x > 0)
+    fit_intercept = (sy - fit_slope * sx) / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_squared = np.where(
+            var_y > 1e-12 * np.maximum(sy * sy, 1.0), cov * cov / (var_x * var_y), 1.0
+        )
+    r_squared = np.clip(np.nan_to_num(r_squared, nan=0.0), 0.0, 1.0)
+
+    offset = 0
+    for kind, indices, (block_touches, _, _, block_window) in blocks:
+        rows = slice(offset, offset + len(block_touches))
+        offset += len(block_touches)
+        results[kind] = _select(
+            np.asarray(indices, dtype=np.int64),
+            block_touches,
+            block_window,
+            fit_slope[rows],
+            fit_intercept[rows],
+            r_squared[rows],
+            kind,
+            max_lines,
+        )
+    return results
+
+
+def _touch_block(
+    x: np.ndarray,
+    prices: np.ndarray,
+    sign: float,
+    tolerance_pct: float,
+    max_pivot_span: int,
+    min_touches: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray] | None:
+    count = len(x)
+    if count < max(min_touches, 2):
+        return None
+    # Highs are handled as lows of the mirrored series so both share one code path.
+    y = prices * sign
+    span = min(max_pivot_span, count - 1)
+    anchors = np.arange(count)
+    offsets = np.arange(span + 1)
+    window = anchors[:, None] + offsets[None, :]
+    in_range = window < count
+    window = np.minimum(window, count - 1)
+
+    dx = (x[window] - x[anchors][:, None]).astype(np.float64)
+    dy = y[window] - y[anchors][:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = np.where(offsets[None, :] > 0, dy / np.where(dx == 0, 1.0, dx), np.inf)
+    slopes = np.where(in_range, slopes, np.inf)
+    previous_min = np.minimum.accumulate(slopes, axis=1)
+    previous_min = np.concatenate([np.full((count, 1), np.inf), previous_min[:, :-1]], axis=1)
+    hull_pairs = (offsets[None, :] > 0) & in_range & (slopes <= previous_min + 1e-12)
+    pair_anchor, pair_offset = np.nonzero(hull_pairs)
+    if not len(pair_anchor):
+        return None
+
+    cand_slopes = slopes[pair_anchor, pair_offset]
+    cand_window = window[pair_anchor]
+    cand_valid = in_range[pair_anchor]
+    cand_dx = dx[pair_anchor]
+    line = y[pair_anchor][:, None] + cand_slopes[:, None] * cand_dx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distance = (y[cand_window] - line) / np.abs(line) * 100
+    distance = np.where(cand_valid, distance, np.inf)
+    broken = np.cumsum(distance < -tolerance_pct, axis=1) > 0
+    touches = cand_valid & ~broken & (np.abs(distance) <= tolerance_pct)
+    keep = touches.sum(axis=1) >= min_touches
+    if not keep.any():
+        return None
+    return touches[keep], cand_dx[keep], prices[cand_window[keep]], cand_window[keep]
+
+
+def _pad(block: np.ndarray, width: int, fill: float | bool) -> np.ndarray:
+    if block.shape[1] == width:
+        return block
+    padding = np.full((block.shape[0], width - block.shape[1]), fill, dtype=block.dtype)
+    return np.concatenate([block, padding], axis=1)
+
+
+def _select(
+    x: np.ndarray,
+    touches: np.ndarray,
+    window: np.ndarray,
+    slopes: np.ndarray,
+    intercepts: np.ndarray,
+    r_squared: np.ndarray,
+    kind: str,
+    max_lines: int,
+) -> List[LineCandidate]:
+    counts = touches.sum(axis=1)
+    order = np.lexsort((-r_squared, -counts))
+    selected: List[LineCandidate] = []
+    accepted_touch_sets: List[Set[int]] = []
+    for idx in order.tolist():
+        touch_positions = window[idx][touches[idx]]
+        touch_set = set(touch_positions.tolist())
+        # Two shared pivots pin down the same line; keep only the better-scored one.
+        if any(len(touch_set & other) >= 2 for other in accepted_touch_sets):
+            continue
+        accepted_touch_sets.append(touch_set)
+        selected.append(
+            LineCandidate(
+                touch_indices=x[touch_positions],
+                slope=float(slopes[idx]),
+                intercept=float(intercepts[idx]),
+                r_squared=float(r_squared[idx]),
+                kind=kind,
+            )
+        )
+        if len(selected) >= max_lines:
+            break
+    return selected
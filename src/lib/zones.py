@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+# Each zone spans this many histogram bins: its peak bin and one on either side.
+ZONE_BINS = 3
+
+
+@dataclass(frozen=True)
+class PriceZone:
+    price_low: float
+    price_high: float
+    touch_indices: np.ndarray
+
+    @property
+    def touch_count(self) -> int:
+        return len(self.touch_indices)
+
+
+def extreme_indices(values: np.ndarray, k: int, kind: str = "low") -> np.ndarray:
+    """Return the bar indices of the ``k`` lowest (or highest) values in O(n), in bar order."""
+
+    if kind not in {"low", "high"}:
+        raise ValueError(f"Unsupported extreme kind: {kind}")
+    values = np.asarray(values, dtype=np.float64)
+    k = min(k, len(values))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    keyed = values if kind == "low" else -values
+    if k == len(values):
+        return np.arange(k, dtype=np.int64)
+    return np.sort(np.argpartition(keyed, k - 1)[:k]).astype(np.int64)
+
+
+def cluster_price_zones(
+    indices: np.ndarray,
+    prices: np.ndarray,
+    width_pct: float = 1.0,
+    min_touches: int = 3,
+    max_zones: int = 10,
+) -> List[PriceZone]:
+    """Cluster reaction prices into non-overlapping bands using a log-price histogram.
+
+    Prices are bucketed into bins of ``width_pct / 3`` percent, so bucketing and the
+    three-bin smoothing are O(n + bins). The best-populated windows are picked by partial
+    selection and accepted greedily when they do not overlap an earlier zone.
+    """
+
+    indices = np.asarray(indices, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    valid = prices > 0
+    indices, prices = indices[valid], prices[valid]
+    if len(prices) < min_touches or max_zones <= 0:
+        return []
+    step = np.log1p(width_pct / 100 / ZONE_BINS)
+    bins = np.floor(np.log(prices) / step).astype(np.int64)
+    base = bins.min()
+    counts = np.bincount(bins - base)
+    window = np.convolve(counts, np.ones(ZONE_BINS, dtype=np.int64), mode="same")
+    candidates = np.flatnonzero(window >= min_touches)
+    if not len(candidates):
+        return []
+    shortlist = min(len(candidates), max_zones * ZONE_BINS)
+    best = candidates[np.argpartition(-window[candidates], shortlist - 1)[:shortlist]]
+    best = best[np.lexsort((best, -window[best]))]
+
+    order = np.argsort(bins, kind="stable")
+    sorted_bins = bins[order] - base
+    zones: List[PriceZone] = []
+    taken: List[int] = []
+    for centre in best.tolist():
+        if any(abs(centre - other) < ZONE_BINS for other in taken):
+            continue
+        lo, hi = np.searchsorted(sorted_bins, [centre - 1, centre + 2])
+        members = np.sort(indices[order[lo:hi]])
+        if len(members) < min_touches:
+            continue
+        taken.append(centre)
+        zones.append(
+            PriceZone(
+                price_low=float(np.exp((centre - 1 + base) * step)),
+                price_high=float(np.exp((centre + 2 + base) * step)),
+                touch_indices=members,
+            )
+        )
+        if len(zones) >= max_zones:
+            break
+    return zones
@@ -37,6 +37,14 @@ class SupplyDemandLevel:
         strength = 40 * touch_factor + 40 * recency_bonus + 20 * min(2.0 / range_width, 1.0)
         return round(min(strength, 100.0), 2)
 
+    def register_touch(self, timestamp: str) -> None:
+        self.touch_count += 1
+        self.last_touched_at = timestamp
+        self.recalculate_strength()
+
+    def recalculate_strength(self) -> None:
+        self.strength_score = self._compute_strength()
+
     def distance_to_price(self, price: float) -> float:
         midpoint = (self.price_high + self.price_low) / 2
         if midpoint == 0:
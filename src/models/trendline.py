@@ -45,10 +45,11 @@ class Trendline:
         if len(self.touch_points) < 3:
             raise ValueError("Trendline requires at least three touch points")
         self._validate_touch_points()
+        distribution_score = self._calculate_distribution_score()
         if self.quality_score is None:
-            self.quality_score = self._calculate_quality_score()
+            self.quality_score = self._calculate_quality_score(distribution_score)
         if self.touch_distribution_score is None:
-            self.touch_distribution_score = self._calculate_distribution_score()
+            self.touch_distribution_score = distribution_score
         if self.age_days is None:
             created = _normalize_timestamp(self.created_at)
             updated = _normalize_timestamp(self.last_updated)
@@ -74,10 +75,12 @@ class Trendline:
         normalized = min(spread / (24 * 60 * 60 * 10), 1.0)
         return round(normalized * 100, 2)
 
-    def _calculate_quality_score(self) -> float:
+    def _calculate_quality_score(self, distribution_score: Optional[float] = None) -> float:
         touch_factor = min(self.touch_point_count / 3.0, 2.0)
         timeframe_weight = weight_for_timeframe(Timeframe.from_str(self.timeframe)) / weight_for_timeframe(Timeframe.WEEKLY)
-        distribution = (self._calculate_distribution_score() or 0) / 100
+        if distribution_score is None:
+            distribution_score = self._calculate_distribution_score()
+        distribution = (distribution_score or 0) / 100
         r_component = self.r_squared
         slope_component = min(abs(self.slope) / 5.0, 1.0)
         score = (
@@ -93,6 +96,16 @@ class Trendline:
     def touch_point_count(self) -> int:
         return len(self.touch_points)
 
+    def add_touch(self, touch: TouchPoint) -> None:
+        ensure_distance_tolerance(touch.distance_from_line, 1.0)
+        ensure_timestamp_order(self.touch_points[-1].timestamp, touch.timestamp)
+        self.touch_points.append(touch)
+        self.last_updated = touch.timestamp
+        self.touch_distribution_score = self._calculate_distribution_score()
+        self.quality_score = self._calculate_quality_score(self.touch_distribution_score)
+        created = _normalize_timestamp(self.created_at)
+        self.age_days = max((_normalize_timestamp(touch.timestamp) - created).days, 0)
+
     def mark_broken(self) -> None:
         self.is_valid = False
 
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.lib.candle_frame import CandleFrame, resample, to_epoch_ms
+from src.lib.rolling_stats import VOLUME_AVERAGE_PERIOD, volume_stats
+from src.lib.timeframe import Timeframe, horizon_bars, interval_ms
+from src.lib.trade_simulator import EXIT_REASONS, simulate_exits
+from src.models.breakout import BreakoutEvent
+from src.models.trendline import Trendline
+from src.services.breakout_detector import BreakoutDetector
+from src.services.htf_trend_cache import HIGHER_TIMEFRAMES, HTFTrendCache
+from src.services.supply_demand_detector import SupplyDemandDetector
+from src.services.trade_ranker import TradeRanker
+from src.services.trendline_detector import IncrementalTrendlineDetector, TrendlineDetector
+from src.services.zone_book import ZoneBook
+
+SIDE_BY_DIRECTION = {"upward": 1.0, "downward": -1.0}
+# Bars used to seed the detectors before the first decision.
+WARMUP_BARS = 50
+# Bars each zone refresh scans: the candles one live fetch returns (PriceFetcher's default limit).
+ZONE_WINDOW_BARS = 500
+BAR_FIELDS = ("timestamp", "low", "high", "close")
+
+
+@dataclass
+class _Watch:
+    trendline: Trendline
+    first_index: int
+    until: int
+
+
+@dataclass
+class TradeEntry:
+    breakout_id: str
+    side: float
+    entry_index: int
+    entry: float
+    stop: float
+    target: float
+    confidence_score: float
+
+
+@dataclass
+class BacktestEngine:
+    """Replays one pair bar by bar, so every decision only sees candles that have closed.
+
+    Trendlines are carried forward by the incremental detector, once per frame and trendline
+    settings, and zones by a ``ZoneBook`` refreshed over a trailing window. A line that
+    breaks is re-scanned by ``BreakoutDetector`` over the closed bars until its retest and
+    rejection windows have passed, and a trade opens at the close of the bar that confirms
+    the breakout, which is when live detection would report it (FR-025).
+
+    The daily and weekly trend the ranker checks is rebuilt from this frame's own closed
+    bars, once per higher-timeframe candle, through an ``HTFTrendCache`` clocked to the
+    bar being replayed.
+
+    Entries never depend on earlier exits, so ``finish`` resolves every stop, target and
+    ``max_holding_bars`` exit at once with ``simulate_exits``; by default trades are held
+    for the timeframe's adaptive horizon (FR-024).
+    """
+
+    pair_symbol: str
+    timeframe: str
+    trendline_detector: TrendlineDetector = field(default_factory=TrendlineDetector)
+    breakout_detector: BreakoutDetector = field(default_factory=BreakoutDetector)
+    supply_demand_detector: SupplyDemandDetector = field(default_factory=SupplyDemandDetector)
+    trade_ranker: TradeRanker = field(default_factory=TradeRanker)
+    warmup: int = WARMUP_BARS
+    zone_refresh_bars: int = 24
+    zone_window_bars: int = ZONE_WINDOW_BARS
+    min_confidence_score: float = 0.0
+    take_profit_pct: float = 5.0
+    stop_loss_pct: float = 2.5
+    max_holding_bars: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self.start(CandleFrame.empty())
+
+    @property
+    def cursor(self) -> int:
+        return self._cursor
+
+    @property
+    def breakout_count(self) -> int:
+        return len(self._breakout_ids)
+
+    @property
+    def done(self) -> bool:
+        return self._cursor >= len(self._frame)
+
+    def run(self, candles: Sequence[Dict[str, Any]] | CandleFrame) -> List[Dict[str, Any]]:
+        self.start(candles)
+        while not self.done:
+            self.step()
+        return self.finish()
+
+    def start(self, candles: Sequence[Dict[str, Any]] | CandleFrame) -> None:
+        """Load the history and seed the detectors with the first ``warmup`` bars."""
+
+        self._frame = CandleFrame.from_candles(candles)
+        frame = self._frame
+        # Bars are read as plain Python values; one conversion per frame serves every engine.
+        self._bars: List[Tuple[int, float, float, float]] = frame.derived(
+            "bars",
+            lambda: list(zip(*(getattr(frame, name).tolist() for name in BAR_FIELDS), strict=True)),
+        )
+        self._zones = ZoneBook(self.pair_symbol, self.timeframe)
+        self._watching: Dict[str, _Watch] = {}
+        self._entries: List[TradeEntry] = []
+        self._breakout_ids: Set[str] = set()
+        self._now = datetime.fromtimestamp(0, tz=timezone.utc)
+        self._htf = HTFTrendCache(clock=lambda: self._now)
+        # The caller's ranker is left untouched; this replay ranks against its own HTF state.
+        self._ranker = copy.copy(self.trade_ranker)
+        self._ranker.htf_cache = self._htf
+        self._cursor = min(self.warmup, len(self._frame))
+        # The trendline pass reads only closed bars and the detector settings, so engines that
+        # replay this frame with other breakout, zone or ranker parameters share it.
+        settings = tuple(sorted(vars(self.trendline_detector).items()))
+        self._breaks: Dict[int, List[Trendline]] = frame.derived(
+            ("trendline_breaks", self.pair_symbol, self.timeframe, settings, self._cursor),
+            self._trace_breaks,
+        )
+        if self._cursor:
+            self._refresh_zones(self._cursor)
+
+    def step(self) -> List[TradeEntry]:
+        """Close the bar under the cursor and return the trades entered at its close."""
+
+        index = self._cursor
+        timestamp, low, high, close = self._bars[index]
+        entered = len(self._entries)
+        for trendline in self._breaks.get(index, ()):
+            if trendline.id not in self._watching:
+                self._watch(trendline, index)
+        self._zones.touch(low, high, timestamp)
+        if (index - self.warmup + 1) % self.zone_refresh_bars == 0:
+            self._refresh_zones(index + 1)
+        self._enter_confirmed(index)
+        self._cursor += 1
+        return self._entries[entered:]
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Resolve the exits of every trade entered so far, in exit order."""
+
+        entries, self._entries = self._entries, []
+        if not entries:
+            return []
+        horizon = self.max_holding_bars
+        if horizon is None:
+            horizon = horizon_bars(self.timeframe)
+        exits = simulate_exits(
+            self._frame,
+            np.array([entry.entry_index for entry in entries], dtype=np.int64),
+            np.array([entry.side for entry in entries]),
+            np.array([entry.stop for entry in entries]),
+            np.array([entry.target for entry in entries]),
+            horizon,
+        )
+        return [
+            self._trade(entries[position], exit_index, exit_price, EXIT_REASONS[reason])
+            for position, exit_index, exit_price, reason in sorted(
+                zip(
+                    range(len(entries)),
+                    exits.exit_index.tolist(),
+                    exits.exit_price.tolist(),
+                    exits.reason.tolist(),
+                    strict=True,
+                ),
+                key=lambda resolved: resolved[1],
+            )
+        ]
+
+    def _trace_breaks(self) -> Dict[int, List[Trendline]]:
+        # Carries the trendlines forward bar by bar and records the lines each bar breaks. A
+        # broken line is never touched again, so the recorded lines can be shared.
+        trendlines = IncrementalTrendlineDetector(
+            self.pair_symbol, self.timeframe, self.trendline_detector
+        )
+        if self._cursor:
+            trendlines.seed(self._frame[: self._cursor])
+        breaks: Dict[int, List[Trendline]] = {}
+        for index in range(self._cursor, len(self._bars)):
+            broken = [line for line in trendlines.append(*self._bars[index]) if not line.is_valid]
+            if broken:
+                breaks[index] = broken
+        return breaks
+
+    def _refresh_zones(self, end: int) -> None:
+        # Only the trailing ``zone_window_bars`` are scanned, as live detection sees its fetched
+        # window; zones found earlier stay in the book, which merges re-detected ones. Each
+        # refresh is bounded, so a replay stays linear in the history length. Detections depend
+        # only on the detector settings, so engines replaying the same frame share them.
+        detector = self.supply_demand_detector
+        start = max(end - self.zone_window_bars, 0)
+        settings = tuple(sorted(vars(detector).items()))
+        levels = self._frame.derived(
+            ("zones", self.pair_symbol, self.timeframe, settings, start, end),
+            partial(detector.detect, self.pair_symbol, self.timeframe, self._frame[start:end]),
+        )
+        # The book merges and counts touches in place, so each engine gets its own copies.
+        self._zones.extend(replace(level) for level in levels)
+
+    def _watch(self, trendline: Trendline, index: int) -> None:
+        first_touch = int(
+            self._frame.timestamp[: index + 1].searchsorted(
+                to_epoch_ms(trendline.touch_points[0].timestamp)
+            )
+        )
+        # The closes-through break lands no earlier than the scan's crossing, so this covers
+        # both windows.
+        until = index + 2 * self.breakout_detector.retest_window + 1
+        self._watching[trendline.id] = _Watch(
+            trendline=trendline, first_index=first_touch, until=until
+        )
+
+    def _enter_confirmed(self, index: int) -> None:
+        self._watching = {
+            key: watch for key, watch in self._watching.items() if watch.until >= index
+        }
+        if not self._watching:
+            return
+        watches = list(self._watching.values())
+        start = max(min(watch.first_index for watch in watches) - VOLUME_AVERAGE_PERIOD, 0)
+        window = self._frame[start : index + 1]
+        trendlines = [watch.trendline for watch in watches]
+        volume = volume_stats(self._frame).window(start, index + 1)
+        events = self.breakout_detector.detect_batch(trendlines, window, volume)
+        self._breakout_ids.update(event.id for event in events)
+        now = window.isoformat(len(window) - 1)
+        confirmed: List[BreakoutEvent] = [
+            event
+            for event in events
+            if event.rejection is not None and event.rejection.timestamp == now
+        ]
+        if not confirmed:
+            return
+        directions = {event.id: event.direction for event in confirmed}
+        entry = float(self._frame.close[index])
+        self._refresh_htf(index)
+        # Events carry the full-history volume baseline, so the ranker reads its ratio from them.
+        for setup in self._ranker.rank(trendlines, confirmed, self._zones.levels):
+            if setup.confidence_score < self.min_confidence_score:
+                continue
+            side = SIDE_BY_DIRECTION[directions[setup.breakout_id]]
+            self._entries.append(
+                TradeEntry(
+                    breakout_id=setup.breakout_id,
+                    side=side,
+                    entry_index=index,
+                    entry=entry,
+                    stop=entry * (1 - side * self.stop_loss_pct / 100),
+                    target=entry * (1 + side * self.take_profit_pct / 100),
+                    confidence_score=setup.confidence_score,
+                )
+            )
+
+    def _refresh_htf(self, index: int) -> None:
+        close_ms = int(self._frame.timestamp[index]) + interval_ms(self.timeframe)
+        self._now = datetime.fromtimestamp(close_ms / 1000, tz=timezone.utc)
+        detector = self._htf.trendline_detector
+        for htf in HIGHER_TIMEFRAMES[Timeframe.from_str(self.timeframe)]:
+            if self._htf.get(self.pair_symbol, htf.value) is not None:
+                continue
+            candles = self._frame.derived(
+                ("resample", htf.value), partial(resample, self._frame, htf.value)
+            )
+            closed = int(
+                np.searchsorted(candles.timestamp + interval_ms(htf), close_ms, side="right")
+            )
+            # Keyed by closed-candle count, so engines replaying the same frame share the detection.
+            trendlines = self._frame.derived(
+                ("htf_trendlines", self.pair_symbol, htf.value, closed),
+                partial(detector.detect, self.pair_symbol, htf.value, candles[:closed]),
+            )
+            self._htf.put(self.pair_symbol, htf.value, trendlines)
+
+    def _trade(
+        self, entry: TradeEntry, index: int, exit_price: float, reason: str
+    ) -> Dict[str, Any]:
+        # Stamped when the fill is known: entries and horizon exits fill at the bar's close, and
+        # stops and targets are only confirmed once the bar has closed.
+        bar_ms = interval_ms(self.timeframe)
+        return {
+            "entry": entry.entry,
+            "exit": exit_price,
+            "side": entry.side,
+            "return_pct": entry.side * (exit_price - entry.entry) / entry.entry * 100,
+            "entry_timestamp": int(self._frame.timestamp[entry.entry_index]) + bar_ms,
+            "exit_timestamp": int(self._frame.timestamp[index]) + bar_ms,
+            "exit_reason": reason,
+            "confidence_score": entry.confidence_score,
+        }
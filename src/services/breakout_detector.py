@@ -1,48 +1,141 @@
 from __future__ import annotations
 
-from statistics import mean
-from typing import List, Sequence
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
+
+from src.lib.breakout_scan import scan_breakouts
+from src.lib.candle_frame import CandleFrame, to_epoch_ms
+from src.lib.rolling_stats import RollingStats, volume_stats
 from src.models.breakout import BreakoutEvent, BreakoutStage
 from src.models.trendline import Trendline
 
+# Upper bound on (lines x bars) cells evaluated at once; chunks this size stay cache-resident.
+MAX_MATRIX_CELLS = 250_000
+
+
+def breakout_id(trendline_id: str, timestamp: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"breakout/{trendline_id}/{timestamp}"))
+
 
 class BreakoutDetector:
-    def __init__(self, retest_window: int = 5) -> None:
+    def __init__(
+        self,
+        retest_window: int = 5,
+        retest_tolerance_pct: float = 0.5,
+        rejection_pct: float = 1.0,
+    ) -> None:
         self.retest_window = retest_window
+        self.retest_tolerance_pct = retest_tolerance_pct
+        self.rejection_pct = rejection_pct
 
-    def detect(self, trendline: Trendline, candles: Sequence[dict]) -> List[BreakoutEvent]:
-        if len(candles) < 5:
-            return []
-        stage_candles = candles[-5:]
-        baseline = candles[-20:-5] if len(candles) >= 20 else candles[:-5]
-        volume_average = mean(c["volume"] for c in baseline) if baseline else stage_candles[0]["volume"]
+    def detect(
+        self, trendline: Trendline, candles: Sequence[Dict[str, Any]] | CandleFrame
+    ) -> List[BreakoutEvent]:
+        return self.detect_batch([trendline], candles)
 
-        initial = BreakoutStage(
-            timestamp=stage_candles[1]["timestamp"],
-            price=float(stage_candles[1]["close"]),
-        )
-        retest = BreakoutStage(
-            timestamp=stage_candles[2]["timestamp"],
-            price=float(stage_candles[2]["close"]),
-        )
-        rejection = BreakoutStage(
-            timestamp=stage_candles[3]["timestamp"],
-            price=float(stage_candles[3]["close"]),
-            magnitude_pct=1.5,
-        )
+    def detect_batch(
+        self,
+        trendlines: Sequence[Trendline],
+        candles: Sequence[Dict[str, Any]] | CandleFrame,
+        volume: Optional[RollingStats] = None,
+    ) -> List[BreakoutEvent]:
+        """Scan every trendline against the series at once, grouped by trendline in input order.
+
+        ``volume`` supplies the volume baseline when ``candles`` is a window of a longer
+        history, so breaks near the window start keep their full trailing average.
+        """
+
+        frame = CandleFrame.from_candles(candles)
+        if not len(frame) or not trendlines:
+            return []
+        volume = volume if volume is not None else volume_stats(frame)
+        chunk = max(MAX_MATRIX_CELLS // len(frame), 1)
+        events: List[BreakoutEvent] = []
+        for offset in range(0, len(trendlines), chunk):
+            batch = list(trendlines[offset : offset + chunk])
+            lines, starts = self._line_matrix(batch, frame)
+            upward = np.array([t.direction == "resistance" for t in batch])
+            scan = scan_breakouts(
+                frame.close,
+                np.where(upward[:, None], frame.low, frame.high),
+                lines,
+                starts,
+                np.where(upward, 1.0, -1.0),
+                self.retest_window,
+                self.retest_tolerance_pct,
+                self.rejection_pct,
+            )
+            for row, stage_one, stage_two, stage_three in zip(
+                scan.line_index.tolist(),
+                scan.break_index.tolist(),
+                scan.retest_index.tolist(),
+                scan.rejection_index.tolist(),
+                strict=True,
+            ):
+                events.append(
+                    self._build_event(
+                        batch[row], frame, lines[row], volume, stage_one, stage_two, stage_three
+                    )
+                )
+        return events
 
-        event = BreakoutEvent(
-            id="breakout-0001",
+    def _build_event(
+        self,
+        trendline: Trendline,
+        frame: CandleFrame,
+        line: np.ndarray,
+        volume: RollingStats,
+        stage_one: int,
+        stage_two: int,
+        stage_three: int,
+    ) -> BreakoutEvent:
+        timestamp = frame.isoformat(stage_one)
+        rejection = None
+        if stage_three >= 0:
+            magnitude = (
+                abs(frame.close[stage_three] - line[stage_three]) / abs(line[stage_three]) * 100
+            )
+            rejection = BreakoutStage(
+                timestamp=frame.isoformat(stage_three),
+                price=float(frame.close[stage_three]),
+                magnitude_pct=round(float(magnitude), 2),
+            )
+        return BreakoutEvent(
+            id=breakout_id(trendline.id, timestamp),
             trendline_id=trendline.id,
-            direction="upward" if trendline.slope >= 0 else "downward",
-            timestamp=stage_candles[4]["timestamp"],
-            price=float(stage_candles[4]["close"]),
-            confirmation_stage=3,
-            initial_break=initial,
-            retest=retest,
+            direction="upward" if trendline.direction == "resistance" else "downward",
+            timestamp=timestamp,
+            price=float(frame.close[stage_one]),
+            confirmation_stage=3 if stage_three >= 0 else 2 if stage_two >= 0 else 1,
+            initial_break=BreakoutStage(timestamp=timestamp, price=float(frame.close[stage_one])),
+            retest=(
+                BreakoutStage(
+                    timestamp=frame.isoformat(stage_two), price=float(frame.close[stage_two])
+                )
+                if stage_two >= 0
+                else None
+            ),
             rejection=rejection,
-            volume=float(stage_candles[3]["volume"]),
-            volume_average=float(volume_average),
+            volume=float(frame.volume[stage_one]),
+            volume_average=float(volume.mean[stage_one]),
+        )
+
+    @staticmethod
+    def _line_matrix(
+        trendlines: Sequence[Trendline], frame: CandleFrame
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # Slope is price per bar from the first touch, so each line is laid over bar positions.
+        first_touch = np.searchsorted(
+            frame.timestamp, [to_epoch_ms(t.touch_points[0].timestamp) for t in trendlines]
+        )
+        last_touch = np.searchsorted(
+            frame.timestamp,
+            [to_epoch_ms(t.touch_points[-1].timestamp) for t in trendlines],
+            side="right",
         )
-        return [event]
+        intercepts = np.array([t.intercept for t in trendlines], dtype=np.float64)
+        slopes = np.array([t.slope for t in trendlines], dtype=np.float64)
+        bars = np.arange(len(frame), dtype=np.float64)[None, :] - first_touch[:, None]
+        return intercepts[:, None] + slopes[:, None] * bars, last_touch.astype(np.int64)
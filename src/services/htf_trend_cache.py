@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from src.lib.candle_frame import CandleFrame
+from src.lib.timeframe import Timeframe, candle_open_ms, interval_ms
+from src.models.trendline import Trendline
+from src.services.trendline_detector import TrendlineDetector
+
+HIGHER_TIMEFRAMES: Dict[Timeframe, Tuple[Timeframe, ...]] = {
+    Timeframe.HOUR_1: (Timeframe.DAILY, Timeframe.WEEKLY),
+    Timeframe.HOUR_4: (Timeframe.DAILY, Timeframe.WEEKLY),
+    Timeframe.DAILY: (Timeframe.WEEKLY,),
+    Timeframe.WEEKLY: (),
+}
+TREND_BY_BREAKOUT = {"upward": "up", "downward": "down"}
+
+
+@dataclass(frozen=True)
+class TrendState:
+    direction: str
+    computed_at: datetime
+    expires_at: datetime
+
+
+def trend_direction(trendlines: Sequence[Trendline]) -> str:
+    """Trend implied by the best-scored valid trendline: ``up``, ``down`` or ``neutral``."""
+
+    valid = [trendline for trendline in trendlines if trendline.is_valid]
+    if not valid:
+        return "neutral"
+    best = max(valid, key=lambda trendline: trendline.quality_score or 0.0)
+    if best.slope > 0:
+        return "up"
+    if best.slope < 0:
+        return "down"
+    return "neutral"
+
+
+@dataclass
+class HTFTrendCache:
+    """Higher-timeframe trend state per (pair, timeframe), valid for one update cycle.
+
+    A state expires when the ``timeframe`` candle it was computed in closes, so the
+    daily and weekly trend is derived once per cycle and every lower-timeframe
+    breakout is checked against it with dictionary lookups. ``clock`` supplies the
+    current time; a backtest points it at the bar being replayed.
+    """
+
+    trendline_detector: TrendlineDetector = field(default_factory=TrendlineDetector)
+    clock: Callable[[], datetime] = field(default=lambda: datetime.now(tz=timezone.utc))
+    _states: Dict[Tuple[str, str], TrendState] = field(default_factory=dict, init=False, repr=False)
+
+    def put(
+        self,
+        pair_symbol: str,
+        timeframe: str,
+        trendlines: Sequence[Trendline],
+        now: Optional[datetime] = None,
+    ) -> TrendState:
+        now = self._now(now)
+        closes_at = candle_open_ms(timeframe, int(now.timestamp() * 1000)) + interval_ms(timeframe)
+        state = TrendState(
+            direction=trend_direction(trendlines),
+            computed_at=now,
+            expires_at=datetime.fromtimestamp(closes_at / 1000, tz=timezone.utc),
+        )
+        self._states[(pair_symbol, Timeframe.from_str(timeframe).value)] = state
+        return state
+
+    def refresh(
+        self,
+        pair_symbol: str,
+        timeframe: str,
+        candles: Sequence[Dict[str, Any]] | CandleFrame,
+        now: Optional[datetime] = None,
+    ) -> TrendState:
+        cached = self.get(pair_symbol, timeframe, now)
+        if cached is not None:
+            return cached
+        trendlines = self.trendline_detector.detect(pair_symbol, timeframe, candles)
+        return self.put(pair_symbol, timeframe, trendlines, now)
+
+    def get(
+        self, pair_symbol: str, timeframe: str, now: Optional[datetime] = None
+    ) -> Optional[TrendState]:
+        key = (pair_symbol, Timeframe.from_str(timeframe).value)
+        state = self._states.get(key)
+        if state is not None and self._now(now) >= state.expires_at:
+            del self._states[key]
+            return None
+        return state
+
+    def is_aligned(
+        self,
+        pair_symbol: str,
+        timeframe: str,
+        breakout_direction: str,
+        now: Optional[datetime] = None,
+    ) -> bool:
+        """True when every higher timeframe has a fresh trend matching the breakout.
+
+        Weekly breakouts have no higher timeframe to confirm them, so they are never aligned.
+        """
+
+        higher = HIGHER_TIMEFRAMES[Timeframe.from_str(timeframe)]
+        expected = TREND_BY_BREAKOUT.get(breakout_direction)
+        if not higher or expected is None:
+            return False
+        for htf in higher:
+            state = self.get(pair_symbol, htf.value, now)
+            if state is None or state.direction != expected:
+                return False
+        return True
+
+    def _now(self, now: Optional[datetime]) -> datetime:
+        now = now or self.clock()
+        return now if now.tzinfo is not None else now.replace(tzinfo=timezone.utc)
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.lib.candle_frame import CANDLE_FIELDS, CandleFrame
+from src.lib.metrics import Metrics
+from src.services.backtester import Backtester
+from src.services.breakout_detector import BreakoutDetector
+from src.services.supply_demand_detector import SupplyDemandDetector
+from src.services.trade_ranker import TradeRanker
+from src.services.trendline_detector import TrendlineDetector
+
+# Component each tunable parameter is passed to when a worker builds its Backtester. Only
+# settings the pipeline reads are listed: SupplyDemandDetector stores distance_threshold_pct
+# without using it, so sweeping it would repeat identical runs and it is rejected.
+SWEEP_PARAMETERS: Dict[str, str] = {
+    "min_touch_spacing": "trendline_detector",
+    "pivot_width": "trendline_detector",
+    "touch_tolerance_pct": "trendline_detector",
+    "max_pivot_span": "trendline_detector",
+    "retest_window": "breakout_detector",
+    "retest_tolerance_pct": "breakout_detector",
+    "rejection_pct": "breakout_detector",
+    "zone_width_pct": "supply_demand_detector",
+    "alignment_threshold_pct": "trade_ranker",
+}
+RANKING_METRICS = ("sortino_ratio", "profit_factor", "max_drawdown")
+
+
+@dataclass
+class SweepResult:
+    parameters: Dict[str, Any]
+    metrics: Metrics
+    summary: Dict[str, float]
+
+
+def validate_parameters(names: Iterable[str]) -> None:
+    """Reject settings ``build_backtester`` cannot route, before any worker starts."""
+
+    unknown = sorted(set(names) - set(SWEEP_PARAMETERS))
+    if unknown:
+        raise ValueError(f"Unsupported sweep parameters: {', '.join(unknown)}")
+
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    validate_parameters(grid)
+    names = sorted(grid)
+    return [
+        dict(zip(names, values, strict=True))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def build_backtester(parameters: Dict[str, Any]) -> Backtester:
+    options: Dict[str, Dict[str, Any]] = {
+        component: {} for component in set(SWEEP_PARAMETERS.values())
+    }
+    for name, value in parameters.items():
+        options[SWEEP_PARAMETERS[name]][name] = value
+    return Backtester(
+        trendline_detector=TrendlineDetector(**options["trendline_detector"]),
+        breakout_detector=BreakoutDetector(**options["breakout_detector"]),
+        supply_demand_detector=SupplyDemandDetector(**options["supply_demand_detector"]),
+        trade_ranker=TradeRanker(**options["trade_ranker"]),
+    )
+
+
+class SharedCandles:
+    """Candle columns copied once into a shared-memory block that workers map without copying."""
+
+    def __init__(self, frame: CandleFrame) -> None:
+        self.length = len(frame)
+        self._block = shared_memory.SharedMemory(
+            create=True, size=max(self.length * 8 * len(CANDLE_FIELDS), 1)
+        )
+        for name, column in _columns(self._block, self.length).items():
+            column[:] = getattr(frame, name)
+
+    @property
+    def name(self) -> str:
+        return self._block.name
+
+    def close(self) -> None:
+        self._block.close()
+        self._block.unlink()
+
+    def __enter__(self) -> "SharedCandles":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+@dataclass
+class ParameterSweep:
+    """Runs one backtest per parameter combination across a process pool.
+
+    Candles live in a single shared-memory block, so each worker maps the same pages
+    instead of receiving a pickled copy per task, and every combination is independent.
+    """
+
+    processes: Optional[int] = None
+    rank_by: str = "sortino_ratio"
+
+    def __post_init__(self) -> None:
+        if self.rank_by not in RANKING_METRICS:
+            raise ValueError(f"Unsupported ranking metric: {self.rank_by}")
+
+    def run(
+        self,
+        pair_symbol: str,
+        timeframe: str,
+        candles: Sequence[Dict[str, Any]] | CandleFrame,
+        grid: Dict[str, Sequence[Any]],
+        initial_balance: float,
+    ) -> List[SweepResult]:
+        combinations = expand_grid(grid)
+        frame = CandleFrame.from_candles(candles)
+        task = (pair_symbol, timeframe, initial_balance)
+        workers = min(self.processes or os.cpu_count() or 1, len(combinations)) or 1
+        with SharedCandles(frame) as shared:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=attach_shared_candles,
+                initargs=(shared.name, shared.length),
+            ) as pool:
+                results = list(pool.map(_run_combination, itertools.repeat(task), combinations))
+        return self.rank(results)
+
+    def rank(self, results: Sequence[SweepResult]) -> List[SweepResult]:
+        # Every metric ranks higher-is-better: drawdowns are <= 0, so shallower wins. A ratio of
+        # None means the run never lost, which ranks above any measured ratio; ties go to the
+        # combination with more trades.
+        def key(result: SweepResult) -> Tuple[bool, float, float]:
+            value = result.metrics.get(self.rank_by, 0.0)
+            trades = result.summary.get("total_trades", 0.0)
+            if value is None:
+                return (True, 0.0, trades)
+            return (False, -math.inf if math.isnan(value) else value, trades)
+
+        return sorted(results, key=key, reverse=True)
+
+
+_worker_block: Optional[shared_memory.SharedMemory] = None
+_worker_frame: Optional[CandleFrame] = None
+
+
+def attach_shared_candles(name: str, length: int) -> None:
+    """Pool initializer: map the parent's ``SharedCandles`` block into this worker."""
+
+    global _worker_block, _worker_frame
+    # Pool workers share the parent's resource tracker, which unlinks the block only once.
+    _worker_block = shared_memory.SharedMemory(name=name)
+    _worker_frame = CandleFrame.from_columns(_columns(_worker_block, length))
+
+
+def shared_frame() -> CandleFrame:
+    if _worker_frame is None:
+        raise RuntimeError("Shared candles are not attached in this process")
+    return _worker_frame
+
+
+def _run_combination(task: Tuple[str, str, float], parameters: Dict[str, Any]) -> SweepResult:
+    pair_symbol, timeframe, initial_balance = task
+    report = build_backtester(parameters).run(
+        pair_symbol, timeframe, shared_frame(), initial_balance
+    )
+    return SweepResult(parameters=parameters, metrics=report.metrics, summary=report.summary)
+
+
+def _columns(block: shared_memory.SharedMemory, length: int) -> Dict[str, np.ndarray]:
+    buffer = block.buf
+    if buffer is None:
+        raise RuntimeError("Shared candle block is closed")
+    columns: Dict[str, np.ndarray] = {}
+    for position, name in enumerate(CANDLE_FIELDS):
+        dtype = np.int64 if name == "timestamp" else np.float64
+        columns[name] = np.ndarray(
+            (length,), dtype=dtype, buffer=buffer, offset=position * length * 8
+        )
+    return columns
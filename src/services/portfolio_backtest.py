@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import heapq
+import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.lib.candle_frame import CandleFrame
+from src.lib.metrics import Metrics, StreamingMetrics
+from src.services.parameter_sweep import build_backtester, validate_parameters
+
+# One row per trade entry or exit. Exits sort first so a bar's closed trades free cash for
+# its entries; a trade closed on the bar it opened exits after that entry instead.
+EVENT_DTYPE = np.dtype(
+    [("timestamp", np.int64), ("kind", np.int8), ("trade", np.int64), ("return_pct", np.float64)]
+)
+EXIT, ENTRY, SAME_BAR_EXIT = 0, 1, 2
+# Events decoded per read, which bounds what each merged stream holds in memory.
+READ_CHUNK = 4096
+
+CandleLoader = Callable[[str, str], CandleFrame]
+
+
+@dataclass(frozen=True)
+class PairStream:
+    pair_symbol: str
+    timeframe: str
+    path: Optional[str]
+    trade_count: int
+    breakout_count: int
+
+
+@dataclass
+class PortfolioReport:
+    metrics: Metrics
+    summary: Dict[str, float]
+    pairs: List[Dict[str, Any]]
+
+
+@dataclass
+class PortfolioBacktest:
+    """Backtests many (pair, timeframe) sources against one shared balance.
+
+    Candles load in the parent, one source at a time, so every fetch draws on the same
+    exchange rate budget; at most one loaded frame per worker waits for the pool. Each
+    worker writes its trades to disk as time-ordered entry/exit events, stamped when they
+    fill, and the parent k-way merges those streams with ``heapq``, so it holds one event
+    per source. Each trade stakes ``position_fraction`` of the equity when it opens,
+    capped by the cash not already committed to open trades.
+    """
+
+    load_candles: CandleLoader
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    position_fraction: float = 0.1
+    processes: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        validate_parameters(self.parameters)
+
+    def run(self, sources: Sequence[Tuple[str, str]], initial_balance: float) -> PortfolioReport:
+        workers = min(self.processes or os.cpu_count() or 1, len(sources)) or 1
+        with tempfile.TemporaryDirectory(prefix="portfolio-") as scratch:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures: List[Future[PairStream]] = []
+                for position, (pair_symbol, timeframe) in enumerate(sources):
+                    running = [future for future in futures if not future.done()]
+                    if len(running) >= workers:
+                        wait(running, return_when=FIRST_COMPLETED)
+                    futures.append(
+                        pool.submit(
+                            _backtest_source,
+                            self.parameters,
+                            (pair_symbol, timeframe),
+                            self.load_candles(pair_symbol, timeframe),
+                            os.path.join(scratch, f"{position}.npy"),
+                        )
+                    )
+                streams = [future.result() for future in futures]
+            return self.merge(streams, initial_balance)
+
+    def merge(self, streams: Sequence[PairStream], initial_balance: float) -> PortfolioReport:
+        metrics = StreamingMetrics(initial_balance)
+        stakes: Dict[Tuple[int, int], float] = {}
+        committed = 0.0
+        skipped = 0
+        events = heapq.merge(
+            *(_read_events(stream, source) for source, stream in enumerate(streams))
+        )
+        for timestamp, kind, source, trade, return_pct in events:
+            key = (source, trade)
+            if kind == ENTRY:
+                stake = min(metrics.equity * self.position_fraction, metrics.equity - committed)
+                if stake <= 0:
+                    skipped += 1
+                    continue
+                stakes[key] = stake
+                committed += stake
+                continue
+            held = stakes.pop(key, None)
+            if held is None:
+                continue
+            committed -= held
+            # Relative to the whole balance, the trade moves equity by its stake's share.
+            metrics.add(
+                {"return_pct": held * return_pct / metrics.equity, "exit_timestamp": timestamp}
+            )
+        return PortfolioReport(
+            metrics=metrics.summary(),
+            summary={
+                "total_trades": float(metrics.trade_count),
+                "skipped_trades": float(skipped),
+                "final_balance": round(metrics.equity, 2),
+                "sources": float(len(streams)),
+            },
+            pairs=[
+                {
+                    "pair_symbol": stream.pair_symbol,
+                    "timeframe": stream.timeframe,
+                    "trades": stream.trade_count,
+                    "breakouts": stream.breakout_count,
+                }
+                for stream in streams
+            ],
+        )
+
+
+def write_events(path: str, trades: Sequence[Dict[str, float]]) -> Optional[str]:
+    """Save ``trades`` as time-ordered entry and exit events; returns None when there are none."""
+
+    if not trades:
+        return None
+    events = np.empty(2 * len(trades), dtype=EVENT_DTYPE)
+    numbers = np.arange(len(trades), dtype=np.int64)
+    returns = np.array([trade["return_pct"] for trade in trades], dtype=np.float64)
+    events["timestamp"] = np.concatenate(
+        [
+            [trade["entry_timestamp"] for trade in trades],
+            [trade["exit_timestamp"] for trade in trades],
+        ]
+    )
+    same_bar = events["timestamp"][len(trades) :] == events["timestamp"][: len(trades)]
+    events["kind"] = np.concatenate(
+        [
+            np.full(len(trades), ENTRY, dtype=np.int8),
+            np.where(same_bar, SAME_BAR_EXIT, EXIT).astype(np.int8),
+        ]
+    )
+    events["trade"] = np.concatenate([numbers, numbers])
+    events["return_pct"] = np.concatenate([returns, returns])
+    np.save(path, events[np.lexsort((events["trade"], events["kind"], events["timestamp"]))])
+    return path
+
+
+def _read_events(stream: PairStream, source: int) -> Iterator[Tuple[int, int, int, int, float]]:
+    if stream.path is None:
+        return
+    events = np.load(stream.path, mmap_mode="r")
+    for start in range(0, len(events), READ_CHUNK):
+        for timestamp, kind, trade, return_pct in events[start : start + READ_CHUNK].tolist():
+            yield timestamp, kind, source, trade, return_pct
+
+
+def _backtest_source(
+    parameters: Dict[str, Any], source: Tuple[str, str], candles: CandleFrame, path: str
+) -> PairStream:
+    pair_symbol, timeframe = source
+    # Only the event file and counts leave the worker; the report stays here.
+    report = build_backtester(parameters).run(pair_symbol, timeframe, candles, 1.0)
+    return PairStream(
+        pair_symbol=pair_symbol,
+        timeframe=timeframe,
+        path=write_events(path, report.trades),
+        trade_count=len(report.trades),
+        breakout_count=int(report.summary["total_breakouts"]),
+    )
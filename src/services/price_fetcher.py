@@ -1,55 +1,260 @@
 from __future__ import annotations
 
 import asyncio
-import json
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.lib.candle_cache import CandleCache
+from src.lib.candle_frame import PRICE_FIELDS, CandleFrame, merge_frames
+from src.lib.rate_limiter import TokenBucket, klines_request_weight
+from src.lib.timeframe import next_update_schedule
+
+MAX_KLINES_PER_REQUEST = 1000
 
 
 class PriceFetcher:
-    def __init__(self, cache_dir: Optional[Path | str] = None, universe_size: int = 50) -> None:
+    def __init__(
+        self,
+        cache_dir: Optional[Path | str] = None,
+        universe_size: int = 50,
+        max_concurrency: int = 8,
+        rate_limiter: Optional[TokenBucket] = None,
+    ) -> None:
         self.cache_dir = Path(cache_dir) if cache_dir else None
-        if self.cache_dir:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache = CandleCache(self.cache_dir) if self.cache_dir else None
         self.universe_size = universe_size
         self.universe: List[str] = []
+        self.max_concurrency = max(max_concurrency, 1)
+        self.rate_limiter = rate_limiter or TokenBucket()
         self._client: Any = None
+        self._history: Dict[Tuple[str, str], CandleFrame] = {}
+        self._last_timestamps: Dict[Tuple[str, str], int] = {}
+        self._client_lock = asyncio.Lock()
+
+    @property
+    def online(self) -> bool:
+        """Whether an exchange client is connected; offline results are never persisted."""
+
+        return self._client is not None
 
     async def ensure_client(self) -> None:
         if self._client is not None:
             return
-        try:
-            from binance import AsyncClient  # type: ignore
+        async with self._client_lock:
+            if self._client is not None:
+                return
+            try:
+                from binance import AsyncClient  # type: ignore
+
+                self._client = await AsyncClient.create()
+            except Exception:
+                self._client = None
 
-            self._client = await AsyncClient.create()
-        except Exception:
-            self._client = None
+    async def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 500) -> CandleFrame:
+        cached = self._load_cached(symbol, timeframe)
+        if (
+            cached is not None
+            and len(cached) >= limit
+            and CandleCache.is_fresh(cached, timeframe)
+        ):
+            return cached[-limit:]
 
-    async def fetch_ohlcv(self, symbol: str, timeframe: str, limit: int = 500) -> List[Dict[str, Any]]:
         await self.ensure_client()
-        candles: List[Dict[str, Any]]
         if self._client is None:
-            candles = self._generate_synthetic_series(limit)
+            # Offline: serve the stale cache if there is one, and keep synthetic bars out of it.
+            if cached is not None and len(cached):
+                return cached[-limit:]
+            return CandleFrame.from_candles(self._generate_synthetic_series(limit))
+
+        interval = self._interval_for_timeframe(timeframe)
+        delta_limit = self._delta_limit(cached, timeframe, limit)
+        frame: CandleFrame
+        if delta_limit is not None and cached is not None:
+            await self.rate_limiter.acquire(klines_request_weight(delta_limit))
+            raw = await self._client.get_klines(
+                symbol=symbol,
+                interval=interval,
+                startTime=int(cached.timestamp[-1]),
+                limit=delta_limit,
+            )
+            frame = merge_frames(cached, self._klines_to_frame(raw))
         else:
-            interval = self._interval_for_timeframe(timeframe)
+            await self.rate_limiter.acquire(klines_request_weight(limit))
             raw = await self._client.get_klines(symbol=symbol, interval=interval, limit=limit)
-            candles = [
-                {
-                    "timestamp": datetime.fromtimestamp(item[0] / 1000, tz=timezone.utc).isoformat(),
-                    "open": float(item[1]),
-                    "high": float(item[2]),
-                    "low": float(item[3]),
-                    "close": float(item[4]),
-                    "volume": float(item[5]),
-                }
-                for item in raw
-            ]
-
-        if self.cache_dir:
-            cache_path = self.cache_dir / f"{symbol}_{timeframe}.json"
-            cache_path.write_text(json.dumps(candles), encoding="utf-8")
-        return candles
+            frame = self._klines_to_frame(raw)
+            if cached is not None:
+                # A short refresh must not shrink a longer (e.g. backfilled) cached history.
+                frame = merge_frames(cached, frame)
+
+        self._store_cached(symbol, timeframe, frame)
+        return frame[-limit:]
+
+    async def fetch_many(
+        self,
+        symbols: Iterable[str],
+        timeframes: Iterable[str],
+        limit: int = 500,
+    ) -> AsyncIterator[Tuple[str, str, CandleFrame]]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _fetch(symbol: str, timeframe: str) -> Tuple[str, str, CandleFrame]:
+            async with semaphore:
+                return symbol, timeframe, await self.fetch_ohlcv(symbol, timeframe, limit=limit)
+
+        timeframe_list = list(timeframes)
+        tasks = [
+            asyncio.create_task(_fetch(symbol, timeframe))
+            for symbol in symbols
+            for timeframe in timeframe_list
+        ]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                yield await completed
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def backfill(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: Optional[datetime] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> CandleFrame:
+        interval_ms = int(next_update_schedule(timeframe).total_seconds() * 1000)
+        start_ms = self._to_epoch_ms(start) // interval_ms * interval_ms
+        end_ms = self._to_epoch_ms(end or datetime.now(tz=timezone.utc))
+        if end_ms <= start_ms:
+            raise ValueError("Backfill end must be after start")
+        window_ms = interval_ms * MAX_KLINES_PER_REQUEST
+        windows = [
+            (window_start, min(window_start + window_ms, end_ms))
+            for window_start in range(start_ms, end_ms, window_ms)
+        ]
+
+        await self.ensure_client()
+        cached = self._load_cached(symbol, timeframe)
+        if self._client is None:
+            history = CandleFrame.empty() if cached is None else cached.between(start_ms, end_ms)
+            if len(history):
+                return history
+            expected = min(-(-(end_ms - start_ms) // interval_ms), MAX_KLINES_PER_REQUEST)
+            return CandleFrame.from_candles(
+                self._generate_synthetic_series(
+                    expected,
+                    start=datetime.fromtimestamp(start_ms / 1000, tz=timezone.utc),
+                    step=timedelta(milliseconds=interval_ms),
+                )
+            )
+
+        pending = [
+            window for window in windows if not self._window_is_cached(cached, window, interval_ms)
+        ]
+        completed = len(windows) - len(pending)
+        if progress is not None:
+            progress(completed, len(windows))
+
+        interval = self._interval_for_timeframe(timeframe)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _fetch_window(window: Tuple[int, int]) -> CandleFrame:
+            window_start, window_end = window
+            async with semaphore:
+                await self.rate_limiter.acquire(klines_request_weight(MAX_KLINES_PER_REQUEST))
+                raw = await self._client.get_klines(
+                    symbol=symbol,
+                    interval=interval,
+                    startTime=window_start,
+                    endTime=window_end - 1,
+                    limit=MAX_KLINES_PER_REQUEST,
+                )
+            return self._klines_to_frame(raw)
+
+        tasks = [asyncio.create_task(_fetch_window(window)) for window in pending]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                frame = await finished
+                existing = self._load_cached(symbol, timeframe)
+                if existing is not None:
+                    frame = merge_frames(existing, frame)
+                # Persisting each window as it lands lets an interrupted backfill resume.
+                self._store_cached(symbol, timeframe, frame)
+                completed += 1
+                if progress is not None:
+                    progress(completed, len(windows))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        stored = self._load_cached(symbol, timeframe)
+        if stored is None:
+            return CandleFrame.empty()
+        return stored.between(start_ms, end_ms)
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        return self._last_timestamps.get((symbol, timeframe))
+
+    def _load_cached(self, symbol: str, timeframe: str) -> Optional[CandleFrame]:
+        key = (symbol, timeframe)
+        frame = self._history.get(key)
+        if frame is None and self._cache is not None:
+            frame = self._cache.load(symbol, timeframe)
+            if frame is not None:
+                self._history[key] = frame
+                self._remember_last_timestamp(key, frame)
+        return frame
+
+    def _store_cached(self, symbol: str, timeframe: str, frame: CandleFrame) -> None:
+        key = (symbol, timeframe)
+        self._history[key] = frame
+        self._remember_last_timestamp(key, frame)
+        if self._cache is not None:
+            self._cache.store(symbol, timeframe, frame)
+
+    def _remember_last_timestamp(self, key: Tuple[str, str], frame: CandleFrame) -> None:
+        if len(frame):
+            self._last_timestamps[key] = int(frame.timestamp[-1])
+
+    @staticmethod
+    def _window_is_cached(
+        cached: Optional[CandleFrame],
+        window: Tuple[int, int],
+        interval_ms: int,
+    ) -> bool:
+        if cached is None:
+            return False
+        window_start, window_end = window
+        lo, hi = np.searchsorted(cached.timestamp, [window_start, window_end])
+        return int(hi - lo) >= -(-(window_end - window_start) // interval_ms)
+
+    @staticmethod
+    def _to_epoch_ms(value: datetime) -> int:
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+
+    @staticmethod
+    def _delta_limit(
+        cached: Optional[CandleFrame],
+        timeframe: str,
+        limit: int,
+    ) -> Optional[int]:
+        if cached is None or len(cached) < limit:
+            return None
+        try:
+            interval_ms = int(next_update_schedule(timeframe).total_seconds() * 1000)
+        except ValueError:
+            return None
+        now_ms = int(datetime.now(tz=timezone.utc).timestamp() * 1000)
+        # The cached last candle was still open when stored, so it is fetched again.
+        missing = (now_ms - int(cached.timestamp[-1])) // interval_ms + 1
+        if missing >= min(limit, MAX_KLINES_PER_REQUEST):
+            return None
+        return max(int(missing), 1)
 
     async def refresh_universe(self) -> None:
         ranks = await self._fetch_market_cap_ranks()
@@ -76,11 +281,23 @@ class PriceFetcher:
         return mapping.get(timeframe, "1h")
 
     @staticmethod
-    def _generate_synthetic_series(limit: int) -> List[Dict[str, Any]]:
-        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    def _klines_to_frame(raw: Sequence[Sequence[Any]]) -> CandleFrame:
+        table = np.asarray([row[:6] for row in raw], dtype=np.float64).reshape(-1, 6)
+        columns = {"timestamp": table[:, 0].astype(np.int64)}
+        for offset, name in enumerate(PRICE_FIELDS, start=1):
+            columns[name] = np.ascontiguousarray(table[:, offset])
+        return CandleFrame.from_columns(columns)
+
+    @staticmethod
+    def _generate_synthetic_series(
+        limit: int,
+        start: Optional[datetime] = None,
+        step: timedelta = timedelta(hours=4),
+    ) -> List[Dict[str, Any]]:
+        base = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
         return [
             {
-                "timestamp": (base + timedelta(hours=4 * idx)).isoformat(),
+                "timestamp": (base + step * idx).isoformat(),
                 "open": 2000 + idx * 5,
                 "high": 2000 + idx * 5 + 10,
                 "low": 2000 + idx * 5 - 10,
@@ -89,5 +306,3 @@ class PriceFetcher:
             }
             for idx in range(limit)
         ]
-
-
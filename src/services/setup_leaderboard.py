@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.lib.candle_frame import to_epoch_ms
+from src.models.trade_setup import TradeSetup
+
+# (confluence_strength, detected_at epoch ms, confidence_score, id): larger ranks higher.
+RankKey = Tuple[float, int, float, str]
+
+
+@dataclass(order=True)
+class _Entry:
+    key: RankKey
+    source: Tuple[str, str] = field(compare=False)
+    setup: TradeSetup = field(compare=False)
+    generation: int = field(default=0, compare=False)
+
+
+@dataclass
+class _Reserved:
+    """Heap item ordering entries best first, so ``heapq`` serves the reserve as a max-heap."""
+
+    entry: _Entry
+
+    def __lt__(self, other: "_Reserved") -> bool:
+        return other.entry < self.entry
+
+
+@dataclass
+class SetupLeaderboard:
+    """Top ``capacity`` setups across every pair and timeframe, best first (FR-018).
+
+    The board is one min-heap holding at most ``capacity`` live entries, and entries it
+    pushes off wait in a max-heap reserve. Publishing a pair again bumps that pair's
+    generation, so its earlier setups die in place and are discarded whenever they reach
+    the top of either heap; the best reserved setups then move back onto the board. A
+    publish of n setups costs O(n log K + K log(P * K)) for P pairs. Setups older than
+    ``max_age`` are evicted on every publish.
+    """
+
+    capacity: int = 20
+    max_age: Optional[timedelta] = None
+    _board: List[_Entry] = field(default_factory=list, init=False, repr=False)
+    _reserve: List[_Reserved] = field(default_factory=list, init=False, repr=False)
+    _generations: Dict[Tuple[str, str], int] = field(default_factory=dict, init=False, repr=False)
+    _board_counts: Dict[Tuple[str, str], int] = field(default_factory=dict, init=False, repr=False)
+    _live_on_board: int = field(default=0, init=False, repr=False)
+    _oldest_ms: int = field(default=-(2**63), init=False, repr=False)
+
+    def publish(
+        self,
+        pair_symbol: str,
+        timeframe: str,
+        setups: Sequence[TradeSetup],
+        now: Optional[datetime] = None,
+    ) -> List[TradeSetup]:
+        """Merge one pair's freshly ranked setups and return those that made the board."""
+
+        source = (pair_symbol, timeframe)
+        cutoff = self._cutoff(now)
+        self._expire(cutoff)
+        generation = self._generations.get(source, 0) + 1
+        self._generations[source] = generation
+        self._live_on_board -= self._board_counts.pop(source, 0)
+        # Refill the freed slots first, so the fresh setups then compete with the best survivors.
+        self._settle()
+        entries = (
+            _Entry(key=key, source=source, setup=setup, generation=generation)
+            for setup in setups
+            if (key := self._rank_key(setup))[1] >= cutoff
+        )
+        # Only a pair's own best ``capacity`` setups can ever reach the board.
+        for entry in heapq.nlargest(self.capacity, entries):
+            self._admit(entry)
+        self._settle()
+        return [entry.setup for entry in self._ranked() if entry.source == source]
+
+    def evict_stale(self, now: Optional[datetime] = None) -> None:
+        self._expire(self._cutoff(now))
+        self._settle()
+
+    def top(self) -> List[TradeSetup]:
+        return [entry.setup for entry in self._ranked()]
+
+    def __len__(self) -> int:
+        return self._live_on_board
+
+    def _is_live(self, entry: _Entry) -> bool:
+        return (
+            self._generations.get(entry.source) == entry.generation
+            and entry.key[1] >= self._oldest_ms
+        )
+
+    def _ranked(self) -> List[_Entry]:
+        return sorted((entry for entry in self._board if self._is_live(entry)), reverse=True)
+
+    def _admit(self, entry: _Entry) -> None:
+        heapq.heappush(self._board, entry)
+        self._live_on_board += 1
+        self._board_counts[entry.source] = self._board_counts.get(entry.source, 0) + 1
+
+    def _settle(self) -> None:
+        # Trim the weakest live entries into the reserve, then refill from its best ones.
+        while self._live_on_board > self.capacity:
+            entry = heapq.heappop(self._board)
+            if not self._is_live(entry):
+                continue
+            self._live_on_board -= 1
+            self._board_counts[entry.source] -= 1
+            heapq.heappush(self._reserve, _Reserved(entry))
+        while self._live_on_board < self.capacity and self._reserve:
+            entry = heapq.heappop(self._reserve).entry
+            if self._is_live(entry):
+                self._admit(entry)
+        # Dead entries below the top of a heap are only dropped here, once they dominate it.
+        if len(self._board) > 2 * self.capacity:
+            self._board = [entry for entry in self._board if self._is_live(entry)]
+            heapq.heapify(self._board)
+        if len(self._reserve) > 2 * self.capacity * len(self._generations):
+            self._reserve = [item for item in self._reserve if self._is_live(item.entry)]
+            heapq.heapify(self._reserve)
+
+    def _expire(self, cutoff: int) -> None:
+        # Age is not the heap order, so stale board entries are found by a scan of the
+        # (bounded) board; stale reserved entries are skipped when they surface.
+        if cutoff <= self._oldest_ms:
+            return
+        self._oldest_ms = cutoff
+        self._board = [entry for entry in self._board if self._is_live(entry)]
+        heapq.heapify(self._board)
+        self._live_on_board = len(self._board)
+        self._board_counts = {}
+        for entry in self._board:
+            self._board_counts[entry.source] = self._board_counts.get(entry.source, 0) + 1
+
+    def _cutoff(self, now: Optional[datetime]) -> int:
+        if self.max_age is None:
+            return -(2**63)
+        now = now or datetime.now(tz=timezone.utc)
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+        return int((now - self.max_age).timestamp() * 1000)
+
+    @staticmethod
+    def _rank_key(setup: TradeSetup) -> RankKey:
+        detected_ms = to_epoch_ms(setup.detected_at)
+        return (setup.confluence_strength, detected_ms, setup.confidence_score, setup.id)
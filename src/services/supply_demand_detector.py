@@ -1,51 +1,89 @@
 from __future__ import annotations
 
-from statistics import mean
-from typing import List, Sequence
+import uuid
+from typing import Any, Dict, List, Sequence
 
+import numpy as np
+
+from src.lib.candle_frame import CandleFrame
+from src.lib.pivots import find_swing_pivots
+from src.lib.zones import PriceZone, cluster_price_zones, extreme_indices
 from src.models.supply_demand import SupplyDemandLevel
 
+FORMATION_BY_KIND = {"low": "demand", "high": "supply"}
+
+
+def zone_id(pair_symbol: str, timeframe: str, formation_type: str, price_low: float) -> str:
+    return str(
+        uuid.uuid5(
+            uuid.NAMESPACE_URL, f"zone/{pair_symbol}/{timeframe}/{formation_type}/{price_low:.8g}"
+        )
+    )
+
 
 class SupplyDemandDetector:
-    def __init__(self, distance_threshold_pct: float = 2.0) -> None:
+    def __init__(
+        self,
+        distance_threshold_pct: float = 2.0,
+        zone_width_pct: float = 1.0,
+        pivot_width: int = 1,
+        extreme_count: int = 5,
+        min_touches: int = 3,
+        max_zones: int = 10,
+    ) -> None:
         self.distance_threshold_pct = distance_threshold_pct
+        self.zone_width_pct = zone_width_pct
+        self.pivot_width = pivot_width
+        self.extreme_count = extreme_count
+        self.min_touches = min_touches
+        self.max_zones = max_zones
 
-    def detect(self, pair_symbol: str, timeframe: str, candles: Sequence[dict]) -> List[SupplyDemandLevel]:
-        if not candles:
+    def detect(
+        self,
+        pair_symbol: str,
+        timeframe: str,
+        candles: Sequence[Dict[str, Any]] | CandleFrame,
+    ) -> List[SupplyDemandLevel]:
+        frame = CandleFrame.from_candles(candles)
+        if not len(frame):
             return []
-        lows = sorted(candles, key=lambda c: c["low"])[:5]
-        highs = sorted(candles, key=lambda c: c["high"], reverse=True)[:5]
-        demand_level = self._build_level(pair_symbol, timeframe, lows, formation_type="demand")
-        supply_level = self._build_level(pair_symbol, timeframe, highs, formation_type="supply")
-        return [demand_level, supply_level]
+        low_pivots, high_pivots = find_swing_pivots(frame.low, frame.high, width=self.pivot_width)
+        levels: List[SupplyDemandLevel] = []
+        for kind, pivots in (("low", low_pivots), ("high", high_pivots)):
+            prices = getattr(frame, kind)
+            # The series extremes are reactions too, even where the fractal window cannot see them.
+            reactions = np.union1d(pivots, extreme_indices(prices, self.extreme_count, kind))
+            zones = cluster_price_zones(
+                reactions,
+                prices[reactions],
+                width_pct=self.zone_width_pct,
+                min_touches=self.min_touches,
+                max_zones=self.max_zones,
+            )
+            levels.extend(
+                self._build_level(pair_symbol, timeframe, frame, zone, FORMATION_BY_KIND[kind])
+                for zone in zones
+            )
+        levels.sort(key=lambda level: level.strength_score or 0.0, reverse=True)
+        return levels
 
     def _build_level(
         self,
         pair_symbol: str,
         timeframe: str,
-        points: Sequence[dict],
+        frame: CandleFrame,
+        zone: PriceZone,
         formation_type: str,
     ) -> SupplyDemandLevel:
-        if not points:
-            raise ValueError("Cannot build level without points")
-        if formation_type == "demand":
-            base_prices = [float(p["low"]) for p in points]
-        else:
-            base_prices = [float(p["high"]) for p in points]
-        center = mean(base_prices)
-        band = max(center * 0.01, 1.0)
-        price_low = center - band / 2
-        price_high = center + band / 2
-        detected_at = points[-1]["timestamp"]
         return SupplyDemandLevel(
-            id=f"sd-{formation_type}",
+            id=zone_id(pair_symbol, timeframe, formation_type, zone.price_low),
             pair_symbol=pair_symbol,
             timeframe=timeframe,
-            price_high=price_high,
-            price_low=price_low,
+            price_high=zone.price_high,
+            price_low=zone.price_low,
             strength_score=None,
-            touch_count=max(len(points), 3),
+            touch_count=zone.touch_count,
             formation_type=formation_type,
-            detected_at=detected_at,
-            last_touched_at=detected_at,
+            detected_at=frame.isoformat(zone.touch_indices[0]),
+            last_touched_at=frame.isoformat(zone.touch_indices[-1]),
         )
@@ -1,32 +1,47 @@
 from __future__ import annotations
 
-from typing import Dict, List, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
+
+from src.lib.candle_frame import CandleFrame, to_epoch_ms
+from src.lib.rolling_stats import VOLUME_SPIKE_RATIO, volume_stats
 from src.models.breakout import BreakoutEvent
 from src.models.supply_demand import SupplyDemandLevel
 from src.models.trade_setup import TradeSetup
 from src.models.trendline import Trendline
+from src.services.htf_trend_cache import HTFTrendCache
 
 
 class TradeRanker:
-    def __init__(self, alignment_threshold_pct: float = 5.0) -> None:
+    def __init__(
+        self, alignment_threshold_pct: float = 5.0, htf_cache: Optional[HTFTrendCache] = None
+    ) -> None:
         self.alignment_threshold_pct = alignment_threshold_pct
+        self.htf_cache = htf_cache
 
     def rank(
         self,
         trendlines: Sequence[Trendline],
         breakouts: Sequence[BreakoutEvent],
         supply_demand_levels: Sequence[SupplyDemandLevel],
+        candles: Optional[Sequence[Dict[str, Any]] | CandleFrame] = None,
     ) -> List[TradeSetup]:
         if not breakouts:
             return []
         alignment_map = self._map_alignment(breakouts, supply_demand_levels)
+        volume_ratios = self._volume_ratios(breakouts, candles)
+        trendlines_by_id = {trendline.id: trendline for trendline in trendlines}
         setups: List[TradeSetup] = []
-        for breakout in breakouts:
+        for breakout, volume_ratio in zip(breakouts, volume_ratios, strict=True):
             aligned, factors = alignment_map.get(breakout.id, (False, []))
-            trendline = next((t for t in trendlines if t.id == breakout.trendline_id), trendlines[0])
-            confluence = max(80.0, min(100.0, trendline.quality_score + breakout.confirmation_stage * 8))
-            confidence = min(100.0, confluence + (breakout.volume / max(breakout.volume_average, 1)) * 5)
+            trendline = trendlines_by_id.get(breakout.trendline_id, trendlines[0])
+            confluence = max(
+                80.0, min(100.0, trendline.quality_score + breakout.confirmation_stage * 8)
+            )
+            confidence = min(100.0, confluence + volume_ratio * 5)
+            volume_factor = ["Volume spike"] if volume_ratio >= VOLUME_SPIKE_RATIO else []
+            htf_factor = ["HTF aligned"] if self._htf_aligned(trendline, breakout) else []
             setup = TradeSetup(
                 id=f"setup-{breakout.id}",
                 trendline_id=breakout.trendline_id,
@@ -35,7 +50,7 @@ class TradeRanker:
                 confidence_score=round(confidence, 2),
                 quality_score=trendline.quality_score,
                 confluence_strength=round(confluence, 2),
-                confirmation_factors=["3+ touches", "HTF aligned", "Volume spike", *factors],
+                confirmation_factors=["3+ touches", *htf_factor, *volume_factor, *factors],
                 supply_demand_alignment=aligned,
                 detected_at=breakout.timestamp,
             )
@@ -43,18 +58,58 @@ class TradeRanker:
         setups.sort(key=lambda s: s.confidence_score, reverse=True)
         return setups
 
+    def _htf_aligned(self, trendline: Trendline, breakout: BreakoutEvent) -> bool:
+        # Without a cache the higher-timeframe trend is unknown, so the factor is left out.
+        if self.htf_cache is None:
+            return False
+        return self.htf_cache.is_aligned(
+            trendline.pair_symbol, trendline.timeframe, breakout.direction
+        )
+
+    @staticmethod
+    def _volume_ratios(
+        breakouts: Sequence[BreakoutEvent],
+        candles: Optional[Sequence[Dict[str, Any]] | CandleFrame],
+    ) -> List[float]:
+        if candles is None:
+            return [breakout.volume / max(breakout.volume_average, 1) for breakout in breakouts]
+        frame = CandleFrame.from_candles(candles)
+        bars = np.searchsorted(frame.timestamp, [to_epoch_ms(b.timestamp) for b in breakouts])
+        ratios = volume_stats(frame).ratio()
+        return [float(ratios[bar]) if bar < len(frame) else 0.0 for bar in bars.tolist()]
+
     def _map_alignment(
         self,
         breakouts: Sequence[BreakoutEvent],
         supply_demand_levels: Sequence[SupplyDemandLevel],
     ) -> Dict[str, Tuple[bool, List[str]]]:
+        midpoints = np.array(
+            [(level.price_high + level.price_low) / 2 for level in supply_demand_levels],
+            dtype=np.float64,
+        )
+        order = np.argsort(midpoints, kind="stable")
+        sorted_midpoints = midpoints[order]
+        prices = np.array([breakout.price for breakout in breakouts], dtype=np.float64)
+        # |price - mid| <= t * mid  <=>  price / (1 + t) <= mid <= price / (1 - t); the window is
+        # padded for distance_to_price's rounding and the few hits are then checked exactly.
+        threshold = (self.alignment_threshold_pct + 0.01) / 100
+        lower = np.searchsorted(sorted_midpoints, prices / (1 + threshold), side="left")
+        upper = np.searchsorted(
+            sorted_midpoints,
+            prices / (1 - threshold) if threshold < 1 else np.full_like(prices, np.inf),
+            side="right",
+        )
+        # A zero midpoint reads as distance 0 to any price.
+        always = np.flatnonzero(midpoints == 0).tolist()
         mapping: Dict[str, Tuple[bool, List[str]]] = {}
-        for breakout in breakouts:
-            aligned_levels = []
-            for level in supply_demand_levels:
-                distance = level.distance_to_price(breakout.price)
-                if distance <= self.alignment_threshold_pct:
-                    aligned_levels.append(level)
+        for breakout, lo, hi in zip(breakouts, lower.tolist(), upper.tolist(), strict=True):
+            positions = sorted({*order[lo:hi].tolist(), *always})
+            aligned_levels = [
+                supply_demand_levels[position]
+                for position in positions
+                if supply_demand_levels[position].distance_to_price(breakout.price)
+                <= self.alignment_threshold_pct
+            ]
             mapping[breakout.id] = (
                 bool(aligned_levels),
                 [f"SD {level.formation_type}" for level in aligned_levels],
@@ -1,80 +1,419 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Sequence
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
+
+from src.lib.candle_frame import CandleFrame, format_epoch_ms, to_epoch_ms
+from src.lib.pivots import find_swing_pivots
+from src.lib.trendline_candidates import LINE_KINDS, LineCandidate, fit_candidate_sets
 from src.models.trendline import TouchPoint, Trendline
 
+MAX_TOUCH_DISTANCE_PCT = 1.0
+# Lines through swing lows act as support, lines through swing highs as resistance.
+DIRECTION_BY_KIND = {"low": "support", "high": "resistance"}
+
+
+def trendline_id(pair_symbol: str, timeframe: str, kind: str, first_ts: str, second_ts: str) -> str:
+    return str(
+        uuid.uuid5(
+            uuid.NAMESPACE_URL, f"trendline/{pair_symbol}/{timeframe}/{kind}/{first_ts}/{second_ts}"
+        )
+    )
+
 
 @dataclass
 class TrendlineDetector:
     min_touch_spacing: int = 5
+    # A 3-candle fractal: candidate lines need three touches, and the original 5-candle
+    # window (``pivot_width=2``) leaves too few pivots on short histories.
+    pivot_width: int = 1
+    touch_tolerance_pct: float = 0.5
+    max_pivot_span: int = 30
+    max_trendlines: int = 25
 
-    def detect(self, pair_symbol: str, timeframe: str, candles: Sequence[dict]) -> List[Trendline]:
-        touches = self._find_touch_points(candles)
-        if len(touches) < 3:
-            fallback_indices = {0, len(candles) // 2 if candles else 0, max(len(candles) - 1, 0)}
-            for idx in sorted(fallback_indices):
-                if idx >= len(candles):
-                    continue
-                touches.append(
-                    TouchPoint(
-                        id=f"touch-fallback-{idx}",
-                        timestamp=candles[idx]["timestamp"],
-                        price=float(candles[idx]["low"]),
-                        distance_from_line=0.5,
-                        is_confirmed=True,
-                        candle_type="wick",
-                        candles_since_previous=None,
-                    )
+    def detect(
+        self, pair_symbol: str, timeframe: str, candles: Sequence[Dict[str, Any]] | CandleFrame
+    ) -> List[Trendline]:
+        frame = CandleFrame.from_candles(candles)
+        pivots = self._find_pivots(frame.low, frame.high)
+        candidates = self._fit_candidates(
+            {kind: (indices, getattr(frame, kind)[indices]) for kind, indices in pivots.items()}
+        )
+        trendlines = [
+            trendline
+            for kind in LINE_KINDS
+            for candidate in candidates[kind]
+            if (
+                trendline := self._build_trendline(
+                    pair_symbol, timeframe, frame.timestamp, getattr(frame, kind), candidate
                 )
-        touches = touches[:3] + touches[3:]
-        touches.sort(key=lambda tp: tp.timestamp)
-        slope = self._calculate_slope(touches)
-        trendline = Trendline(
-            id="trendline-0001",
+            )
+            is not None
+        ]
+        trendlines.sort(key=lambda t: t.quality_score or 0.0, reverse=True)
+        return trendlines[: self.max_trendlines]
+
+    def _find_pivots(self, lows: np.ndarray, highs: np.ndarray) -> Dict[str, np.ndarray]:
+        low_pivots, high_pivots = find_swing_pivots(
+            lows, highs, width=self.pivot_width, min_spacing=self.min_touch_spacing
+        )
+        return {"low": low_pivots, "high": high_pivots}
+
+    def _fit_candidates(
+        self,
+        pivots: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    ) -> Dict[str, List[LineCandidate]]:
+        return fit_candidate_sets(
+            pivots,
+            tolerance_pct=self.touch_tolerance_pct,
+            max_pivot_span=self.max_pivot_span,
+            max_lines=self.max_trendlines,
+        )
+
+    def _build_trendline(
+        self,
+        pair_symbol: str,
+        timeframe: str,
+        timestamps: Sequence[int] | np.ndarray,
+        prices: Sequence[float] | np.ndarray,
+        candidate: LineCandidate,
+    ) -> Optional[Trendline]:
+        _, touches = self._touch_points(timestamps, prices, candidate)
+        if len(touches) < 3:
+            return None
+        return self._make_trendline(pair_symbol, timeframe, candidate, touches)
+
+    @staticmethod
+    def _make_trendline(
+        pair_symbol: str,
+        timeframe: str,
+        candidate: LineCandidate,
+        touches: List[TouchPoint],
+    ) -> Trendline:
+        return Trendline(
+            id=trendline_id(
+                pair_symbol, timeframe, candidate.kind, touches[0].timestamp, touches[1].timestamp
+            ),
             pair_symbol=pair_symbol,
-            direction="support" if slope >= 0 else "resistance",
+            direction=DIRECTION_BY_KIND[candidate.kind],
             timeframe=timeframe,
-            slope=slope,
-            intercept=touches[0].price,
-            r_squared=0.85,
+            slope=candidate.slope,
+            intercept=candidate.intercept,
+            r_squared=round(candidate.r_squared, 4),
             quality_score=None,
             created_at=touches[0].timestamp,
             last_updated=touches[-1].timestamp,
             is_valid=True,
             touch_points=touches,
         )
-        return [trendline]
-
-    def _find_touch_points(self, candles: Sequence[dict]) -> List[TouchPoint]:
-        touch_points: List[TouchPoint] = []
-        previous_index = None
-        for idx in range(2, len(candles) - 2):
-            window = candles[idx - 2 : idx + 3]
-            low = candles[idx]["low"]
-            if low == min(c["low"] for c in window):
-                if previous_index is not None and idx - previous_index < self.min_touch_spacing:
-                    continue
-                touch_points.append(
-                    TouchPoint(
-                        id=f"touch-{idx}",
-                        timestamp=candles[idx]["timestamp"],
-                        price=float(low),
-                        distance_from_line=0.5,
-                        is_confirmed=True,
-                        candle_type="wick",
-                        candles_since_previous=None if previous_index is None else idx - previous_index,
-                    )
-                )
-                previous_index = idx
-        return touch_points
 
     @staticmethod
-    def _calculate_slope(touches: Sequence[TouchPoint]) -> float:
-        if len(touches) < 2:
-            return 0.0
-        first = touches[0]
-        last = touches[-1]
-        span = len(touches) - 1
-        return (last.price - first.price) / max(span, 1)
+    def _touch_points(
+        timestamps: Sequence[int] | np.ndarray,
+        prices: Sequence[float] | np.ndarray,
+        candidate: LineCandidate,
+    ) -> Tuple[List[int], List[TouchPoint]]:
+        first_index = int(candidate.touch_indices[0])
+        indices: List[int] = []
+        touches: List[TouchPoint] = []
+        for idx in candidate.touch_indices.tolist():
+            price = float(prices[idx])
+            line_value = candidate.intercept + candidate.slope * (idx - first_index)
+            distance = round((price - line_value) / line_value * 100, 2) if line_value else 0.0
+            if abs(distance) > MAX_TOUCH_DISTANCE_PCT:
+                continue
+            touches.append(
+                TouchPoint(
+                    id=f"touch-{idx}",
+                    timestamp=format_epoch_ms(timestamps[idx]),
+                    price=price,
+                    distance_from_line=distance,
+                    is_confirmed=True,
+                    candle_type="wick",
+                    candles_since_previous=idx - indices[-1] if indices else None,
+                )
+            )
+            indices.append(idx)
+        return indices, touches
+
+
+@dataclass
+class _LineState:
+    trendline: Trendline
+    kind: str
+    first_index: int
+    touch_indices: List[int]
+    # Running least-squares sums over (bars since first touch, touch price).
+    n: float = 0.0
+    sx: float = 0.0
+    sy: float = 0.0
+    sxx: float = 0.0
+    sxy: float = 0.0
+    syy: float = 0.0
+
+    def __post_init__(self) -> None:
+        for idx, touch in zip(self.touch_indices, self.trendline.touch_points, strict=True):
+            self._accumulate(idx, touch.price)
+
+    def value_at(self, index: int) -> float:
+        return self.trendline.intercept + self.trendline.slope * (index - self.first_index)
+
+    def add_touch(self, index: int, touch: TouchPoint) -> None:
+        self._accumulate(index, touch.price)
+        self.touch_indices.append(index)
+        var_x = self.n * self.sxx - self.sx * self.sx
+        var_y = self.n * self.syy - self.sy * self.sy
+        cov = self.n * self.sxy - self.sx * self.sy
+        slope = cov / var_x if var_x > 0 else 0.0
+        r_squared = (
+            cov * cov / (var_x * var_y)
+            if var_x > 0 and var_y > 1e-12 * max(self.sy * self.sy, 1.0)
+            else 1.0
+        )
+        self.trendline.slope = slope
+        self.trendline.intercept = (self.sy - slope * self.sx) / self.n
+        self.trendline.r_squared = round(min(max(r_squared, 0.0), 1.0), 4)
+        self.trendline.add_touch(touch)
+
+    def _accumulate(self, index: int, price: float) -> None:
+        x = float(index - self.first_index)
+        self.n += 1
+        self.sx += x
+        self.sy += price
+        self.sxx += x * x
+        self.sxy += x * price
+        self.syy += price * price
+
+
+@dataclass
+class IncrementalTrendlineDetector:
+    """Maintains pivots and trendlines across candle closes instead of re-running ``detect``.
+
+    Each ``update`` confirms at most one pivot per kind, so a closed candle only touches
+    the active lines plus the candidates formed with the last ``max_pivot_span`` pivots.
+    """
+
+    pair_symbol: str
+    timeframe: str
+    detector: TrendlineDetector = field(default_factory=TrendlineDetector)
+
+    def __post_init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        self._timestamps: List[int] = []
+        self._closes: List[float] = []
+        self._prices: Dict[str, List[float]] = {kind: [] for kind in LINE_KINDS}
+        self._pivots: Dict[str, List[int]] = {kind: [] for kind in LINE_KINDS}
+        self._lines: List[_LineState] = []
+        self._active: List[_LineState] = []
+        self._levels: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+        self._lines_by_touch: Dict[Tuple[str, int], List[_LineState]] = {}
+
+    @property
+    def trendlines(self) -> List[Trendline]:
+        return sorted(
+            (line.trendline for line in self._lines),
+            key=lambda t: t.quality_score or 0.0,
+            reverse=True,
+        )
+
+    @property
+    def active_trendlines(self) -> List[Trendline]:
+        return sorted(
+            (line.trendline for line in self._active),
+            key=lambda t: t.quality_score or 0.0,
+            reverse=True,
+        )
+
+    def seed(self, candles: Sequence[Dict[str, Any]] | CandleFrame) -> List[Trendline]:
+        frame = CandleFrame.from_candles(candles)
+        self._reset()
+        self._timestamps = frame.timestamp.tolist()
+        self._closes = frame.close.tolist()
+        for kind in LINE_KINDS:
+            self._prices[kind] = getattr(frame, kind).tolist()
+        pivots = self.detector._find_pivots(frame.low, frame.high)
+        candidates = self.detector._fit_candidates(
+            {kind: (indices, getattr(frame, kind)[indices]) for kind, indices in pivots.items()}
+        )
+        for kind in LINE_KINDS:
+            self._pivots[kind] = pivots[kind].tolist()
+            for candidate in candidates[kind]:
+                self._register(candidate)
+        return self.trendlines
+
+    def update(self, candle: Dict[str, Any]) -> List[Trendline]:
+        """Consume one closed candle and return the lines it created, touched or broke."""
+
+        timestamp = candle["timestamp"]
+        return self.append(
+            to_epoch_ms(timestamp) if isinstance(timestamp, str) else int(timestamp),
+            float(candle["low"]),
+            float(candle["high"]),
+            float(candle["close"]),
+        )
+
+    def append(self, timestamp: int, low: float, high: float, close: float) -> List[Trendline]:
+        """``update`` for a bar given as raw column values, with no candle dict to unpack."""
+
+        index = len(self._closes)
+        self._timestamps.append(timestamp)
+        self._closes.append(close)
+        self._prices["low"].append(low)
+        self._prices["high"].append(high)
+
+        changed: List[Trendline] = []
+        if self._active:
+            intercept, slope, first_index, is_low = self._active_levels()
+            broken = self._through_mask(is_low, close, intercept + slope * (index - first_index))
+            if broken.any():
+                still_active: List[_LineState] = []
+                for line, is_broken in zip(self._active, broken.tolist(), strict=True):
+                    if is_broken:
+                        line.trendline.mark_broken()
+                        changed.append(line.trendline)
+                    else:
+                        still_active.append(line)
+                self._active = still_active
+                self._levels = None
+
+        confirmed: Dict[str, int] = {}
+        for kind in LINE_KINDS:
+            pivot = self._confirm_pivot(kind)
+            if pivot is not None:
+                self._pivots[kind].append(pivot)
+                changed.extend(self._extend_lines(kind, pivot))
+                confirmed[kind] = pivot
+        if confirmed:
+            changed.extend(self._new_lines(confirmed))
+        return changed
+
+    def _confirm_pivot(self, kind: str) -> Optional[int]:
+        width = self.detector.pivot_width
+        prices = self._prices[kind]
+        center = len(prices) - 1 - width
+        if center < width:
+            return None
+        neighbours = prices[center - width : center + width + 1]
+        if prices[center] != (min(neighbours) if kind == "low" else max(neighbours)):
+            return None
+        pivots = self._pivots[kind]
+        if pivots and center - pivots[-1] < self.detector.min_touch_spacing:
+            return None
+        return center
+
+    def _extend_lines(self, kind: str, pivot: int) -> List[Trendline]:
+        touched: List[Trendline] = []
+        price = self._prices[kind][pivot]
+        for line in self._active:
+            if line.kind != kind:
+                continue
+            line_value = line.value_at(pivot)
+            if not line_value:
+                continue
+            distance = (price - line_value) / line_value * 100
+            if abs(distance) > self.detector.touch_tolerance_pct:
+                continue
+            line.add_touch(
+                pivot,
+                TouchPoint(
+                    id=f"touch-{pivot}",
+                    timestamp=format_epoch_ms(self._timestamps[pivot]),
+                    price=price,
+                    distance_from_line=round(distance, 2),
+                    is_confirmed=True,
+                    candle_type="wick",
+                    candles_since_previous=pivot - line.touch_indices[-1],
+                ),
+            )
+            self._lines_by_touch.setdefault((kind, pivot), []).append(line)
+            touched.append(line.trendline)
+        if touched:
+            self._levels = None
+        return touched
+
+    def _new_lines(self, confirmed: Dict[str, int]) -> List[Trendline]:
+        windows: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for kind in confirmed:
+            window = self._pivots[kind][-(self.detector.max_pivot_span + 1) :]
+            prices = self._prices[kind]
+            windows[kind] = (
+                np.asarray(window, dtype=np.int64),
+                np.asarray([prices[idx] for idx in window], dtype=np.float64),
+            )
+        created: List[Trendline] = []
+        for kind, candidates in self.detector._fit_candidates(windows).items():
+            for candidate in candidates:
+                if int(candidate.touch_indices[-1]) != confirmed[kind]:
+                    continue
+                line = self._register(candidate)
+                if line is not None:
+                    created.append(line.trendline)
+        return created
+
+    def _register(self, candidate: LineCandidate) -> Optional[_LineState]:
+        kind = candidate.kind
+        indices, touches = self.detector._touch_points(
+            self._timestamps, self._prices[kind], candidate
+        )
+        if len(touches) < 3 or self._is_known(kind, indices):
+            return None
+        trendline = self.detector._make_trendline(
+            self.pair_symbol, self.timeframe, candidate, touches
+        )
+        line = _LineState(
+            trendline=trendline,
+            kind=kind,
+            first_index=int(candidate.touch_indices[0]),
+            touch_indices=indices,
+        )
+        self._lines.append(line)
+        for idx in indices:
+            self._lines_by_touch.setdefault((kind, idx), []).append(line)
+        # Candles after the last touch may already have closed through the line.
+        after = np.asarray(self._closes[indices[-1] + 1 :], dtype=np.float64)
+        offsets = np.arange(indices[-1] + 1, len(self._closes)) - line.first_index
+        values = trendline.intercept + trendline.slope * offsets
+        if self._through(kind, after, values).any():
+            trendline.mark_broken()
+        else:
+            self._active.append(line)
+            self._levels = None
+        return line
+
+    def _active_levels(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Active lines outlive many bars and only change on a touch, a break or a new line,
+        # so their coefficients are kept as arrays and every close is checked against all
+        # of them at once.
+        if self._levels is None:
+            lines = self._active
+            self._levels = (
+                np.array([line.trendline.intercept for line in lines], dtype=np.float64),
+                np.array([line.trendline.slope for line in lines], dtype=np.float64),
+                np.array([line.first_index for line in lines], dtype=np.int64),
+                np.array([line.kind == "low" for line in lines], dtype=bool),
+            )
+        return self._levels
+
+    def _through_mask(self, is_low: np.ndarray, close: float, values: np.ndarray) -> np.ndarray:
+        tolerance = self.detector.touch_tolerance_pct / 100
+        return np.where(is_low, close < values * (1 - tolerance), close > values * (1 + tolerance))
+
+    def _is_known(self, kind: str, indices: List[int]) -> bool:
+        shared: Dict[int, int] = {}
+        for idx in indices:
+            for line in self._lines_by_touch.get((kind, idx), ()):
+                shared[id(line)] = shared.get(id(line), 0) + 1
+                if shared[id(line)] >= 2:
+                    return True
+        return False
+
+    def _through(self, kind: str, closes: Any, values: Any) -> Any:
+        tolerance = self.detector.touch_tolerance_pct / 100
+        if kind == "low":
+            return closes < values * (1 - tolerance)
+        return closes > values * (1 + tolerance)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import functools
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.lib.candle_frame import CandleFrame
+from src.lib.metrics import Metrics, summarize
+from src.services.parameter_sweep import (
+    RANKING_METRICS,
+    ParameterSweep,
+    SharedCandles,
+    SweepResult,
+    attach_shared_candles,
+    build_backtester,
+    expand_grid,
+    shared_frame,
+)
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Bar ranges of one walk-forward step.
+
+    Trains on ``train_start:test_start`` and tests on ``test_start:test_end``.
+    """
+
+    index: int
+    train_start: int
+    test_start: int
+    test_end: int
+
+
+def make_folds(length: int, train_bars: int, test_bars: int, anchored: bool = False) -> List[Fold]:
+    """Roll a ``train_bars`` window forward by ``test_bars``.
+
+    Anchored folds keep training from bar 0.
+    """
+
+    if train_bars < 1 or test_bars < 1:
+        raise ValueError("Walk-forward windows must span at least one bar")
+    folds: List[Fold] = []
+    test_start = train_bars
+    while test_start + test_bars <= length:
+        folds.append(
+            Fold(
+                index=len(folds),
+                train_start=0 if anchored else test_start - train_bars,
+                test_start=test_start,
+                test_end=test_start + test_bars,
+            )
+        )
+        test_start += test_bars
+    return folds
+
+
+@dataclass
+class FoldResult:
+    fold: Fold
+    parameters: Dict[str, Any]
+    train_metrics: Metrics
+    test_metrics: Metrics
+    test_trades: List[Dict[str, float]]
+
+
+@dataclass
+class WalkForwardReport:
+    folds: List[FoldResult]
+    trades: List[Dict[str, float]]
+    metrics: Metrics
+
+
+@dataclass
+class WalkForward:
+    """Optimises the parameter grid on each training window and trades it on the next.
+
+    Every (fold, combination) training run is its own task over one shared-memory copy of
+    the candles, so a few long folds still fill the pool. Tasks are handed out fold by fold
+    in contiguous chunks and each worker reuses its fold's training frame, so indicators
+    memoised on it (volume baselines, supply/demand zones, and the trendline pass per set
+    of trendline parameters) are computed once per fold and worker. Each fold's best
+    combination is then traded on its test window, and the out-of-sample trades of all
+    folds are stitched into one equity curve.
+    """
+
+    train_bars: int
+    test_bars: int
+    anchored: bool = False
+    processes: Optional[int] = None
+    rank_by: str = "sortino_ratio"
+
+    def __post_init__(self) -> None:
+        if self.rank_by not in RANKING_METRICS:
+            raise ValueError(f"Unsupported ranking metric: {self.rank_by}")
+
+    def run(
+        self,
+        pair_symbol: str,
+        timeframe: str,
+        candles: Sequence[Dict[str, Any]] | CandleFrame,
+        grid: Dict[str, Sequence[Any]],
+        initial_balance: float,
+    ) -> WalkForwardReport:
+        combinations = expand_grid(grid)
+        frame = CandleFrame.from_candles(candles)
+        folds = make_folds(len(frame), self.train_bars, self.test_bars, self.anchored)
+        if not folds:
+            return WalkForwardReport(folds=[], trades=[], metrics=summarize([], initial_balance))
+        task = (pair_symbol, timeframe, initial_balance)
+        jobs = [(fold, parameters) for fold in folds for parameters in combinations]
+        workers = min(self.processes or os.cpu_count() or 1, len(jobs))
+        # Never more than one fold per chunk; a fold is split only when the pool outnumbers folds.
+        chunksize = min(len(combinations), math.ceil(len(jobs) / workers))
+        with SharedCandles(frame) as shared:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=attach_shared_candles,
+                initargs=(shared.name, shared.length),
+            ) as pool:
+                trained = list(pool.map(_train, itertools.repeat(task), jobs, chunksize=chunksize))
+                sweep = ParameterSweep(rank_by=self.rank_by)
+                size = len(combinations)
+                best = [
+                    sweep.rank(trained[fold.index * size : (fold.index + 1) * size])[0]
+                    for fold in folds
+                ]
+                results = list(pool.map(_test, itertools.repeat(task), folds, best))
+        trades = [trade for result in results for trade in result.test_trades]
+        return WalkForwardReport(
+            folds=results, trades=trades, metrics=summarize(trades, initial_balance)
+        )
+
+
+@functools.lru_cache(maxsize=2)
+def _window(start: int, end: int) -> CandleFrame:
+    # One frame per window and worker, so the runs of a fold share what is memoised on it.
+    return shared_frame()[start:end]
+
+
+def _train(task: Tuple[str, str, float], job: Tuple[Fold, Dict[str, Any]]) -> SweepResult:
+    pair_symbol, timeframe, initial_balance = task
+    fold, parameters = job
+    train = _window(fold.train_start, fold.test_start)
+    report = build_backtester(parameters).run(pair_symbol, timeframe, train, initial_balance)
+    return SweepResult(parameters=parameters, metrics=report.metrics, summary=report.summary)
+
+
+def _test(task: Tuple[str, str, float], fold: Fold, best: SweepResult) -> FoldResult:
+    pair_symbol, timeframe, initial_balance = task
+    # The training window only seeds the detectors here, so every trade opens inside the
+    # test window.
+    tested = build_backtester(best.parameters).run(
+        pair_symbol,
+        timeframe,
+        shared_frame()[fold.train_start : fold.test_end],
+        initial_balance,
+        warmup=fold.test_start - fold.train_start,
+    )
+    return FoldResult(
+        fold=fold,
+        parameters=best.parameters,
+        train_metrics=best.metrics,
+        test_metrics=tested.metrics,
+        test_trades=tested.trades,
+    )
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Set
+
+from src.lib.candle_frame import format_epoch_ms
+from src.lib.validators import _normalize_timestamp
+from src.models.supply_demand import SupplyDemandLevel
+
+
+@dataclass
+class _ZoneIndex:
+    """Disjoint zones kept sorted by price, so both boundary lists are sorted too."""
+
+    lows: List[float] = field(default_factory=list)
+    highs: List[float] = field(default_factory=list)
+    levels: List[SupplyDemandLevel] = field(default_factory=list)
+
+    def overlapping(self, price_low: float, price_high: float) -> range:
+        start = bisect_left(self.highs, price_low)
+        stop = bisect_right(self.lows, price_high)
+        return range(start, max(start, stop))
+
+    def insert(self, level: SupplyDemandLevel) -> None:
+        position = bisect_left(self.lows, level.price_low)
+        self.lows.insert(position, level.price_low)
+        self.highs.insert(position, level.price_high)
+        self.levels.insert(position, level)
+
+    def remove(self, positions: range) -> List[SupplyDemandLevel]:
+        removed = self.levels[positions.start : positions.stop]
+        del self.lows[positions.start : positions.stop]
+        del self.highs[positions.start : positions.stop]
+        del self.levels[positions.start : positions.stop]
+        return removed
+
+
+@dataclass
+class ZoneBook:
+    """Supply/demand zones for one pair and timeframe, kept across detection cycles.
+
+    Zones of one formation type never overlap: adding a zone merges every zone it
+    intersects. Each candle looks up the zones its range reaches in O(log z) and counts
+    a touch when price enters a zone it was not already inside.
+    """
+
+    pair_symbol: str
+    timeframe: str
+
+    def __post_init__(self) -> None:
+        self._indices: Dict[str, _ZoneIndex] = {"demand": _ZoneIndex(), "supply": _ZoneIndex()}
+        self._inside: Set[str] = set()
+
+    @property
+    def levels(self) -> List[SupplyDemandLevel]:
+        levels = [level for index in self._indices.values() for level in index.levels]
+        return sorted(levels, key=lambda level: level.strength_score or 0.0, reverse=True)
+
+    def extend(self, levels: Iterable[SupplyDemandLevel]) -> None:
+        for level in levels:
+            self.add(level)
+
+    def add(self, level: SupplyDemandLevel) -> SupplyDemandLevel:
+        """Insert ``level``, merging it with overlapping zones; returns the zone that remains."""
+
+        if (level.pair_symbol, level.timeframe) != (self.pair_symbol, self.timeframe):
+            raise ValueError("Zone belongs to a different pair or timeframe")
+        index = self._indices[level.formation_type]
+        price_low, price_high = level.price_low, level.price_high
+        overlapping: List[SupplyDemandLevel] = []
+        # A widened zone may reach neighbours the original bounds did not, so repeat.
+        while found := index.remove(index.overlapping(price_low, price_high)):
+            overlapping.extend(found)
+            price_low = min(price_low, *(zone.price_low for zone in found))
+            price_high = max(price_high, *(zone.price_high for zone in found))
+        if not overlapping:
+            index.insert(level)
+            return level
+        # The oldest zone keeps its identity; existing zones are disjoint, so their touches add up.
+        kept = min(overlapping, key=lambda zone: _normalize_timestamp(zone.detected_at))
+        merged = [*overlapping, level]
+        kept.price_low = price_low
+        kept.price_high = price_high
+        kept.touch_count = max(level.touch_count, sum(zone.touch_count for zone in overlapping))
+        kept.last_touched_at = max(
+            (zone.last_touched_at or zone.detected_at for zone in merged),
+            key=_normalize_timestamp,
+        )
+        kept.recalculate_strength()
+        if any(zone.id in self._inside for zone in merged):
+            self._inside.add(kept.id)
+        index.insert(kept)
+        return kept
+
+    def update(self, candle: Dict[str, Any]) -> List[SupplyDemandLevel]:
+        """Record the zones ``candle`` enters and return them."""
+
+        low, high = float(candle["low"]), float(candle["high"])
+        return self._enter(low, high, lambda: candle["timestamp"])
+
+    def touch(self, low: float, high: float, timestamp: int) -> List[SupplyDemandLevel]:
+        """``update`` for a bar given as raw values; the timestamp is only formatted on a touch."""
+
+        return self._enter(low, high, lambda: format_epoch_ms(timestamp))
+
+    def _enter(
+        self, low: float, high: float, timestamp: Callable[[], str]
+    ) -> List[SupplyDemandLevel]:
+        touched: List[SupplyDemandLevel] = []
+        inside: Set[str] = set()
+        for index in self._indices.values():
+            for position in index.overlapping(low, high):
+                level = index.levels[position]
+                inside.add(level.id)
+                if level.id not in self._inside:
+                    level.register_touch(timestamp())
+                    touched.append(level)
+        self._inside = inside
+        return touched
@@ -5,7 +5,10 @@ from unittest.mock import patch
 import pytest
 from typer.testing import CliRunner
 
+from src.cli import detect_cmd
 from src.cli.main import app
+from src.lib.candle_frame import CandleFrame
+from src.models.trade_setup import TradeSetup
 
 
 @pytest.fixture
@@ -63,3 +66,89 @@ def test_cli_detect_streams_results(runner, config_files):
         mock_run.return_value = []
         result = runner.invoke(app, ["detect", "--config", str(detect_cfg)])
     assert result.exit_code == 0
+
+
+def test_detection_reuses_cached_results(tmp_path, config_files):
+    _, detect_cfg = config_files
+    config = json.loads(detect_cfg.read_text())
+    config["result_cache_dir"] = str(tmp_path / "results")
+    detect_cfg.write_text(json.dumps(config))
+    candles = CandleFrame.from_candles(
+        [
+            {
+                "timestamp": f"2024-09-0{1 + idx // 24}T{idx % 24:02d}:00:00Z",
+                "open": 100.0 + idx,
+                "high": 102.0 + idx,
+                "low": 99.0 + idx,
+                "close": 101.0 + idx,
+                "volume": 1000.0,
+            }
+            for idx in range(48)
+        ]
+    )
+
+    fetched = []
+
+    async def fake_fetch(fetcher, _config, timeframe):
+        fetched.append((id(fetcher), timeframe))
+        return candles
+
+    with patch.object(detect_cmd, "_fetch_candles", fake_fetch), patch.object(
+        detect_cmd.TrendlineDetector, "detect", autospec=True, return_value=[]
+    ) as detect:
+        first = detect_cmd.run_detection(detect_cfg)
+        computed = detect.call_count
+        second = detect_cmd.run_detection(detect_cfg)
+    assert first == second == []
+    # The 4h pass plus the daily and weekly trend, all skipped on the cached run.
+    assert computed == 3
+    assert detect.call_count == computed
+    # Each run loads every timeframe through a single fetcher.
+    assert [timeframe for _, timeframe in fetched[:3]] == ["4h", "daily", "weekly"]
+    assert len({fetcher for fetcher, _ in fetched[:3]}) == 1
+
+
+def test_detection_reports_confirmation_factors(config_files):
+    _, detect_cfg = config_files
+    setup = TradeSetup(
+        id="setup-b",
+        trendline_id="t",
+        breakout_id="b",
+        timeframe="4h",
+        confidence_score=90.0,
+        quality_score=80.0,
+        confluence_strength=90.0,
+        confirmation_factors=["3+ touches", "HTF aligned"],
+        supply_demand_alignment=False,
+        detected_at="2024-09-01T00:00:00Z",
+    )
+
+    async def fake_fetch(_fetcher, _config, _timeframe):
+        return CandleFrame.empty()
+
+    with patch.object(detect_cmd, "_fetch_candles", fake_fetch), patch.object(
+        detect_cmd.TradeRanker, "rank", return_value=[setup]
+    ):
+        (result,) = detect_cmd.run_detection(detect_cfg)
+    assert result["confirmation_factors"] == ["3+ touches", "HTF aligned"]
+
+
+def test_backtest_store_coverage_rejects_late_starts_and_gaps():
+    from datetime import datetime, timezone
+
+    from src.cli.backtest_cmd import _covers
+
+    hour_ms = 3_600_000
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    first = int(start.timestamp() * 1000)
+
+    def frame(hours):
+        hours = list(hours)
+        columns = {name: [1.0] * len(hours) for name in ("open", "high", "low", "close", "volume")}
+        timestamps = [first + hour * hour_ms for hour in hours]
+        return CandleFrame.from_columns({"timestamp": timestamps, **columns})
+
+    assert _covers(frame(range(24)), "1h", start, end)
+    assert not _covers(frame(range(5, 24)), "1h", start, end)
+    assert not _covers(frame([hour for hour in range(24) if hour != 12]), "1h", start, end)
@@ -1,8 +1,36 @@
 import sys
 from pathlib import Path
 
+import numpy as np
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(ROOT))
     sys.path.insert(0, str(SRC))
+
+from src.lib.candle_frame import CandleFrame  # noqa: E402
+
+
+def _random_walk(count: int, seed: int = 0) -> CandleFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.008, count)))
+    open_ = np.r_[close[0], close[:-1]]
+    return CandleFrame.from_columns(
+        {
+            "timestamp": 1725148800000 + np.arange(count, dtype=np.int64) * 3_600_000,
+            "open": open_,
+            "high": np.maximum(open_, close) * 1.003,
+            "low": np.minimum(open_, close) * 0.997,
+            "close": close,
+            "volume": rng.uniform(1000, 5000, count),
+        }
+    )
+
+
+@pytest.fixture
+def random_walk():
+    """Factory for a seeded hourly random-walk ``CandleFrame`` starting 2024-09-01."""
+
+    return _random_walk
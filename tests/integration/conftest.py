@@ -29,8 +29,8 @@ def _generate_base_series() -> Tuple[List[Dict[str, float | str]], datetime, flo
     for idx in range(80):
         trend_price = base_price + slope * idx
         is_touch = idx in {12, 34, 56}
-        low = trend_price - (22 if is_touch else 8)
-        high = trend_price + 10
+        low = trend_price - 8
+        high = trend_price + (22 if is_touch else 10)
         close = trend_price + (6 if is_touch else 8)
         open_price = close - 4
         volume = 1800 + idx * 14
@@ -50,8 +50,6 @@ def _generate_breakout_sequence(start_time: datetime, last_close: float) -> List
     stage1_time = start_time + timedelta(hours=CANDLE_INTERVAL_HOURS)
     stage2_time = stage1_time + timedelta(hours=CANDLE_INTERVAL_HOURS)
     stage3_time = stage2_time + timedelta(hours=CANDLE_INTERVAL_HOURS)
-    follow1_time = stage3_time + timedelta(hours=CANDLE_INTERVAL_HOURS)
-    follow2_time = follow1_time + timedelta(hours=CANDLE_INTERVAL_HOURS)
 
     breakout_close = last_close + 80
     retest_close = breakout_close - 40
@@ -81,24 +79,23 @@ def _generate_breakout_sequence(start_time: datetime, last_close: float) -> List
         rejection_close,
         rejection_volume,
     )
-    follow1 = _make_candle(
-        follow1_time,
-        rejection_close,
-        rejection_close + 45,
-        rejection_close - 20,
-        rejection_close + 30,
-        3100.0,
-    )
-    follow2 = _make_candle(
-        follow2_time,
-        rejection_close + 10,
-        rejection_close + 80,
-        rejection_close - 5,
-        rejection_close + 70,
-        2900.0,
-    )
+    # After the rejection price ranges sideways, printing three lows and three highs at
+    # the same prices: a demand zone just above the breakout and a supply zone above it.
+    range_lows = [8, -10, 8, -9, 7, -8, 8]
+    range_highs = [40, 30, 42, 31, 41, 30, 40]
+    consolidation = [
+        _make_candle(
+            stage3_time + timedelta(hours=CANDLE_INTERVAL_HOURS * (offset + 1)),
+            rejection_close + 15,
+            rejection_close + high,
+            rejection_close + low,
+            rejection_close + 20,
+            3000.0 - offset * 50,
+        )
+        for offset, (low, high) in enumerate(zip(range_lows, range_highs, strict=True))
+    ]
 
-    return [stage1, stage2, stage3, follow1, follow2]
+    return [stage1, stage2, stage3, *consolidation]
 
 
 @pytest.fixture(scope="module")
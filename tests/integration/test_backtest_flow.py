@@ -26,7 +26,9 @@ def test_backtest_flow(backtest_candles) -> None:
     )
 
     assert report.trades, "Backtester should register trades for detected breakouts"
-    assert report.metrics["sortino_ratio"] is not None
-    assert report.metrics["profit_factor"] is not None
+    # Profit factor is undefined (None) exactly when no trade lost, and so is Sortino then.
+    lost = any(trade["return_pct"] < 0 for trade in report.trades)
+    assert (report.metrics["profit_factor"] is not None) == lost
+    assert lost or report.metrics["sortino_ratio"] is None
     assert report.metrics["max_drawdown"] <= 0
     assert report.summary["total_breakouts"] >= len(report.trades)
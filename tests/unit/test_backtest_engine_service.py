@@ -0,0 +1,113 @@
+from src.lib.candle_frame import CandleFrame
+from src.services.backtest_engine import BacktestEngine, TradeEntry
+from src.services.breakout_detector import BreakoutDetector
+from src.services.supply_demand_detector import SupplyDemandDetector
+from src.services.trendline_detector import TrendlineDetector
+
+
+def test_backtest_engine_ignores_future_bars(random_walk):
+    frame = random_walk(900, seed=5)
+    full = BacktestEngine("ETHUSDT", "1h")
+    full.start(frame)
+    truncated = BacktestEngine("ETHUSDT", "1h")
+    truncated.start(frame[:600])
+
+    full_entries = [entry for _ in range(550) for entry in full.step()]
+    truncated_entries = []
+    while not truncated.done:
+        truncated_entries.extend(truncated.step())
+    assert full_entries
+    assert full_entries == truncated_entries
+
+
+def test_backtest_engine_resolves_exits_after_replay():
+    frame = CandleFrame.from_candles(
+        [
+            {
+                "timestamp": "2024-09-01T00:00:00Z",
+                "open": 100,
+                "high": 101,
+                "low": 99,
+                "close": 100,
+                "volume": 1,
+            },
+            {
+                "timestamp": "2024-09-01T01:00:00Z",
+                "open": 100,
+                "high": 104,
+                "low": 98,
+                "close": 103,
+                "volume": 1,
+            },
+            {
+                "timestamp": "2024-09-01T02:00:00Z",
+                "open": 103,
+                "high": 106,
+                "low": 97,
+                "close": 100,
+                "volume": 1,
+            },
+            {
+                "timestamp": "2024-09-01T03:00:00Z",
+                "open": 100,
+                "high": 101,
+                "low": 99,
+                "close": 100,
+                "volume": 1,
+            },
+        ]
+    )
+    engine = BacktestEngine("ETHUSDT", "1h", warmup=1)
+    engine.start(frame)
+    engine._entries.append(
+        TradeEntry(
+            breakout_id="b",
+            side=1.0,
+            entry_index=0,
+            entry=100.0,
+            stop=97.5,
+            target=105.0,
+            confidence_score=90.0,
+        )
+    )
+    while not engine.done:
+        engine.step()
+    (trade,) = engine.finish()
+    # Bar 2 reaches both levels; the stop is assumed to fill first.
+    assert trade["exit"] == 97.5
+    assert trade["exit_reason"] == "stop"
+    assert trade["return_pct"] == -2.5
+    assert trade["entry_timestamp"] == frame.timestamp[1]
+    assert trade["exit_timestamp"] == frame.timestamp[3]
+    assert not engine.finish()
+
+
+def test_backtest_engine_scans_a_bounded_window_per_zone_refresh(random_walk):
+    scanned = []
+
+    class RecordingDetector(SupplyDemandDetector):
+        def detect(self, pair_symbol, timeframe, candles):
+            scanned.append(len(candles))
+            return super().detect(pair_symbol, timeframe, candles)
+
+    engine = BacktestEngine(
+        "ETHUSDT", "1h", supply_demand_detector=RecordingDetector(), zone_window_bars=120
+    )
+    engine.run(random_walk(600, seed=3))
+    assert len(scanned) > 1
+    assert max(scanned) == 120
+
+
+def test_backtest_engines_share_the_trendline_pass_per_trendline_settings(random_walk):
+    frame = random_walk(300, seed=2)
+    first = BacktestEngine("ETHUSDT", "1h", breakout_detector=BreakoutDetector(retest_window=3))
+    first.start(frame)
+    second = BacktestEngine("ETHUSDT", "1h", breakout_detector=BreakoutDetector(retest_window=7))
+    second.start(frame)
+    other = BacktestEngine(
+        "ETHUSDT", "1h", trendline_detector=TrendlineDetector(min_touch_spacing=8)
+    )
+    other.start(frame)
+
+    assert first._breaks is second._breaks
+    assert other._breaks is not first._breaks
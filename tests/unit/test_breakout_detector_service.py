@@ -27,20 +27,25 @@ def candles():
 
 @pytest.fixture
 def breakout_extension():
-    base_ts = "2024-10-01T00:00:00Z"
-    template = []
-    for idx in range(5):
-        template.append(
-            {
-                "timestamp": f"2024-10-01T{idx:02d}:00:00Z",
-                "open": 1950 + idx * 15,
-                "high": 1980 + idx * 20,
-                "low": 1900 + idx * 10,
-                "close": 1970 + idx * 25,
-                "volume": 4000 + idx * 450,
-            }
-        )
-    return template
+    # Support sits at 1802 + 6 * idx: close through it, retest it from below, then reject.
+    bars = [
+        (2240, 2245, 2185, 2190, 6000),
+        (2195, 2226, 2195, 2205, 3200),
+        (2200, 2210, 2160, 2170, 4500),
+        (2170, 2175, 2130, 2140, 3000),
+        (2140, 2150, 2100, 2110, 2800),
+    ]
+    return [
+        {
+            "timestamp": f"2024-10-01T{idx:02d}:00:00Z",
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }
+        for idx, (open_, high, low, close, volume) in enumerate(bars)
+    ]
 
 
 def test_breakout_detector_three_stage_confirmation(candles, breakout_extension):
@@ -55,3 +60,25 @@ def test_breakout_detector_flags_volume_spike(candles, breakout_extension):
     detector = BreakoutDetector()
     event = detector.detect(trendline, [*candles, *breakout_extension])[0]
     assert event.volume > event.volume_average
+
+
+def test_breakout_detector_reports_every_break_with_stable_ids(candles, breakout_extension):
+    trendline = TrendlineDetector().detect("ETHUSDT", "4h", candles)[0]
+    detector = BreakoutDetector(retest_window=5)
+    series = [*candles, *breakout_extension]
+    events = detector.detect(trendline, series)
+    assert [event.direction for event in events] == ["downward"]
+    assert events[0].timestamp == "2024-10-01T00:00:00+00:00"
+    assert events[0].retest.timestamp == "2024-10-01T01:00:00+00:00"
+    assert events[0].rejection.magnitude_pct >= 1.0
+    assert detector.detect(trendline, series)[0].id == events[0].id
+    assert detector.detect(trendline, candles) == []
+
+
+def test_breakout_detector_batch_matches_per_line_scans(candles, breakout_extension):
+    series = [*candles, *breakout_extension]
+    trendlines = TrendlineDetector().detect("ETHUSDT", "4h", candles)
+    detector = BreakoutDetector()
+    expected = [event for trendline in trendlines for event in detector.detect(trendline, series)]
+    assert detector.detect_batch(trendlines, series) == expected
+    assert detector.detect_batch([], series) == []
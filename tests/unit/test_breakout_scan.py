@@ -0,0 +1,22 @@
+import numpy as np
+
+from src.lib.breakout_scan import next_true, scan_breakouts
+
+
+def test_next_true_answers_queries_within_each_row():
+    mask = np.array(
+        [[False, True, False, False, True, False], [True, False, False, False, False, False]]
+    )
+    rows = np.array([0, 0, 0, 0, 1, 1])
+    cols = np.array([0, 2, 5, 6, 0, 1])
+    assert next_true(mask, rows, cols).tolist() == [1, 4, 6, 6, 0, 6]
+
+
+def test_scan_breakouts_tracks_stages_and_failed_breaks():
+    line = np.full(12, 100.0)
+    close = np.array([99, 99, 102, 100.5, 103, 99, 98, 101, 98, 99, 99, 99], dtype=float)
+    low = close - np.array([1, 1, 1, 1.2, 1, 1, 1, 1, 1, 1, 1, 1])
+    scan = scan_breakouts(close, low, line, start=1, sign=1.0, retest_window=3)
+    assert scan.break_index.tolist() == [2, 7]
+    assert scan.retest_index.tolist() == [3, -1]
+    assert scan.rejection_index.tolist() == [4, -1]
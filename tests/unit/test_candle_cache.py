@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from src.lib.candle_cache import CandleCache
+from src.lib.candle_frame import CandleFrame
+
+
+def _candles(count: int, start: datetime):
+    return [
+        {
+            "timestamp": (start + timedelta(hours=4 * idx)).isoformat(),
+            "open": 100.0 + idx,
+            "high": 105.0 + idx,
+            "low": 95.0 + idx,
+            "close": 102.0 + idx,
+            "volume": 1000.0 + idx,
+        }
+        for idx in range(count)
+    ]
+
+
+def test_candle_cache_round_trips_columns_atomically(tmp_path):
+    cache = CandleCache(tmp_path)
+    candles = _candles(5, datetime(2024, 1, 1, tzinfo=timezone.utc))
+    cache.store("ETHUSDT", "4h", CandleFrame.from_candles(candles))
+
+    loaded = cache.load("ETHUSDT", "4h")
+    assert loaded.timestamp.dtype == np.int64
+    assert loaded.to_candles() == candles
+    assert [path.name for path in tmp_path.iterdir()] == ["ETHUSDT_4h.npz"]
+
+
+def test_candle_cache_freshness_follows_update_schedule():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    frame = CandleFrame.from_candles(_candles(3, start))
+    last_open = start + timedelta(hours=8)
+    assert CandleCache.is_fresh(frame, "4h", now=last_open + timedelta(hours=3))
+    assert not CandleCache.is_fresh(frame, "4h", now=last_open + timedelta(hours=4))
+
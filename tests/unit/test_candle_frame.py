@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from src.lib.candle_frame import CandleFrame, merge_frames, resample
+
+
+def _candles(count: int, start_hour: int = 0):
+    return [
+        {
+            "timestamp": f"2024-09-01T{start_hour + idx:02d}:00:00Z",
+            "open": 100 + idx,
+            "high": 105 + idx,
+            "low": 95 + idx,
+            "close": 102 + idx,
+            "volume": 1000 + idx,
+        }
+        for idx in range(count)
+    ]
+
+
+def test_candle_frame_adapts_dict_candles_to_contiguous_columns():
+    frame = CandleFrame.from_candles(_candles(30))
+    assert len(frame) == 30
+    assert frame.timestamp.dtype == np.int64
+    assert frame.close.dtype == np.float64 and frame.close.flags["C_CONTIGUOUS"]
+    assert frame.timestamp[25] - frame.timestamp[24] == 3_600_000
+    assert frame[-1]["close"] == 131.0
+    assert frame[-1]["timestamp"] == "2024-09-02T05:00:00+00:00"
+    window = frame[5:10]
+    assert isinstance(window, CandleFrame) and np.shares_memory(window.low, frame.low)
+    assert CandleFrame.from_candles(frame) is frame
+
+
+def test_candle_frame_rejects_ragged_columns_and_merges_by_timestamp():
+    with pytest.raises(ValueError):
+        CandleFrame(
+            timestamp=np.arange(3),
+            open=np.ones(3),
+            high=np.ones(3),
+            low=np.ones(2),
+            close=np.ones(3),
+            volume=np.ones(3),
+        )
+    existing = CandleFrame.from_candles(_candles(3))
+    revised = _candles(3, start_hour=2)
+    revised[0]["close"] = 999.0
+    merged = merge_frames(existing, CandleFrame.from_candles(revised))
+    assert len(merged) == 5
+    assert np.all(np.diff(merged.timestamp) > 0)
+    assert merged.close[2] == 999.0
+
+
+def test_resample_aggregates_complete_periods_from_the_first_full_one():
+    hour_ms = 3_600_000
+    start = 1725148800000 - 3 * hour_ms  # 2024-08-31T21:00Z, three hours before a daily open
+    count = 53
+    frame = CandleFrame.from_columns(
+        {
+            "timestamp": start + np.arange(count, dtype=np.int64) * hour_ms,
+            "open": np.arange(count, dtype=np.float64),
+            "high": np.arange(count, dtype=np.float64) + 1,
+            "low": np.arange(count, dtype=np.float64) - 1,
+            "close": np.arange(count, dtype=np.float64) + 0.5,
+            "volume": np.ones(count),
+        }
+    )
+    daily = resample(frame, "daily")
+
+    assert daily.timestamp.tolist() == [1725148800000 + day * 86_400_000 for day in range(3)]
+    assert daily[0] == {
+        "timestamp": "2024-09-01T00:00:00+00:00",
+        "open": 3.0,
+        "high": 27.0,
+        "low": 2.0,
+        "close": 26.5,
+        "volume": 24.0,
+    }
+    assert daily[2]["volume"] == 2.0
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from src.services.htf_trend_cache import HTFTrendCache, trend_direction
+
+
+def _line(slope, quality=80.0, valid=True):
+    return SimpleNamespace(is_valid=valid, quality_score=quality, slope=slope)
+
+
+def test_trend_direction_follows_best_valid_line():
+    assert (
+        trend_direction([_line(2.0, 60.0), _line(-1.0, 85.0), _line(5.0, 99.0, valid=False)])
+        == "down"
+    )
+    assert trend_direction([_line(5.0, valid=False)]) == "neutral"
+
+
+def test_htf_trend_cache_expires_after_update_cycle():
+    now = datetime(2024, 9, 2, tzinfo=timezone.utc)
+    cache = HTFTrendCache()
+    cache.put("BTCUSDT", "daily", [_line(1.5)], now=now)
+    cache.put("BTCUSDT", "weekly", [_line(0.5)], now=now)
+
+    assert cache.is_aligned("BTCUSDT", "4h", "upward", now=now + timedelta(hours=4))
+    assert not cache.is_aligned("BTCUSDT", "4h", "downward", now=now)
+    assert cache.get("BTCUSDT", "weekly", now=now + timedelta(days=2)) is not None
+    assert cache.get("BTCUSDT", "daily", now=now + timedelta(days=1)) is None
+    assert not cache.is_aligned("BTCUSDT", "4h", "upward", now=now + timedelta(days=1))
+
+
+def test_htf_trend_cache_expires_at_candle_close_and_follows_its_clock():
+    now = datetime(2024, 9, 4, 23, tzinfo=timezone.utc)
+    cache = HTFTrendCache(clock=lambda: now)
+    daily = cache.put("BTCUSDT", "daily", [_line(1.5)])
+    weekly = cache.put("BTCUSDT", "weekly", [_line(1.5)])
+
+    assert daily.expires_at == datetime(2024, 9, 5, tzinfo=timezone.utc)
+    assert weekly.expires_at == datetime(2024, 9, 9, tzinfo=timezone.utc)
+    assert cache.is_aligned("BTCUSDT", "1h", "upward")
+    assert not cache.is_aligned("BTCUSDT", "weekly", "upward")
+    now = datetime(2024, 9, 5, tzinfo=timezone.utc)
+    assert not cache.is_aligned("BTCUSDT", "1h", "upward")
@@ -0,0 +1,55 @@
+import json
+import math
+
+import numpy as np
+
+from src.lib.metrics import StreamingMetrics, equity_curve, max_drawdown, summarize
+
+DAY_MS = 86_400_000
+
+
+def _trades(returns, days):
+    return [
+        {"return_pct": value, "exit_timestamp": 1725148800000 + day * DAY_MS + 3_600_000}
+        for value, day in zip(returns, days, strict=True)
+    ]
+
+
+def test_metrics_use_equity_curve_and_daily_returns():
+    trades = _trades([10.0, -20.0, 5.0, 10.0], [0, 0, 2, 3])
+    curve = equity_curve(trades, 1000.0)
+    np.testing.assert_allclose(curve.equity, [1000.0, 1100.0, 880.0, 924.0, 1016.4])
+    np.testing.assert_allclose(curve.period_returns(), [-0.12, 0.0, 0.05, 0.1])
+    assert math.isclose(max_drawdown(curve.equity), -0.2)
+
+    metrics = summarize(trades, 1000.0)
+    downside = math.sqrt(0.12**2 / 4)
+    assert metrics["sortino_ratio"] == round(0.0075 / downside * math.sqrt(365), 4)
+    assert metrics["profit_factor"] == round((100 + 44 + 92.4) / 220, 4)
+    assert metrics["max_drawdown"] == -0.2
+
+
+def test_summary_marks_loss_free_ratios_as_undefined_not_zero():
+    all_wins = summarize(_trades([3.0, 2.0], [0, 1]), 1000.0)
+    all_losses = summarize(_trades([-3.0, -2.0], [0, 1]), 1000.0)
+
+    assert all_wins == {"sortino_ratio": None, "profit_factor": None, "max_drawdown": 0.0}
+    assert all_losses["profit_factor"] == 0.0
+    assert all_losses["sortino_ratio"] < 0
+    json.dumps(all_wins, allow_nan=False)
+    streaming = StreamingMetrics(1000.0)
+    for trade in _trades([3.0, 2.0], [0, 1]):
+        streaming.add(trade)
+    assert streaming.summary() == all_wins
+
+
+def test_streaming_metrics_match_vectorized_summary():
+    rng = np.random.default_rng(11)
+    trades = _trades(
+        rng.normal(0.3, 3.0, 400).tolist(), np.sort(rng.integers(0, 250, 400)).tolist()
+    )
+    streaming = StreamingMetrics(10_000.0)
+    for trade in trades:
+        streaming.add(trade)
+    assert streaming.summary() == summarize(trades, 10_000.0)
+    assert streaming.max_drawdown <= 0
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from src.lib.candle_frame import CandleFrame
+from src.lib.ohlcv_store import OHLCVStore
+from src.services.trendline_detector import TrendlineDetector
+
+
+def _columns(count: int, offset: int = 0):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return CandleFrame.from_candles(
+        [
+            {
+                "timestamp": (start + timedelta(hours=idx)).isoformat(),
+                "open": 100.0 + idx,
+                "high": 105.0 + idx,
+                "low": 95.0 + idx - (8 if idx % 10 == 5 else 0),
+                "close": 102.0 + idx,
+                "volume": 1000.0 + idx,
+            }
+            for idx in range(offset, offset + count)
+        ]
+    )
+
+
+def test_ohlcv_store_appends_only_new_rows_and_reopens_as_memmap(tmp_path):
+    store = OHLCVStore(tmp_path)
+    assert store.append("ETHUSDT", "1h", _columns(50)) == 50
+    assert store.append("ETHUSDT", "1h", _columns(30, offset=40)) == 20
+
+    series = store.open("ETHUSDT", "1h")
+    assert len(series) == 70
+    assert isinstance(series.close, np.memmap)
+    assert series.timestamp.dtype == np.int64
+    assert np.all(np.diff(series.timestamp) > 0)
+
+
+def test_ohlcv_store_slices_are_zero_copy_views_usable_by_detectors(tmp_path):
+    store = OHLCVStore(tmp_path)
+    store.append("ETHUSDT", "1h", _columns(60))
+    series = store.open("ETHUSDT", "1h")
+
+    window = series.between(int(series.timestamp[10]), int(series.timestamp[50]))
+    assert len(window) == 40
+    assert np.shares_memory(window.low, series.low)
+    assert window[0]["close"] == 112.0
+
+    trendlines = TrendlineDetector().detect("ETHUSDT", "1h", window)
+    assert trendlines
+
+
+def test_ohlcv_store_prepends_earlier_history_and_fills_gaps(tmp_path):
+    store = OHLCVStore(tmp_path)
+    store.append("ETHUSDT", "1h", _columns(100, offset=100))
+    assert store.append("ETHUSDT", "1h", _columns(250)) == 150
+
+    series = store.open("ETHUSDT", "1h")
+    assert len(series) == 250
+    assert series[0]["close"] == 102.0
+    assert np.all(np.diff(series.timestamp) == 3_600_000)
+
+    store.append("ETHUSDT", "1h", _columns(10, offset=300))
+    assert store.append("ETHUSDT", "1h", _columns(50, offset=250)) == 50
+    assert np.all(np.diff(store.open("ETHUSDT", "1h").timestamp) == 3_600_000)
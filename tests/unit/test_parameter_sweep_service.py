@@ -0,0 +1,44 @@
+import pytest
+
+from src.services.parameter_sweep import ParameterSweep, SweepResult, build_backtester, expand_grid
+
+
+def test_expand_grid_builds_every_combination():
+    combinations = expand_grid({"retest_window": [3, 5], "min_touch_spacing": [4, 6, 8]})
+    assert len(combinations) == 6
+    assert {"min_touch_spacing": 4, "retest_window": 5} in combinations
+    assert build_backtester(combinations[0]).trendline_detector.min_touch_spacing == 4
+    with pytest.raises(ValueError):
+        expand_grid({"leverage": [2]})
+    with pytest.raises(ValueError, match="distance_threshold_pct"):
+        expand_grid({"distance_threshold_pct": [1.0, 2.0]})
+
+
+def test_parameter_sweep_matches_serial_backtests(random_walk):
+    frame = random_walk(400, seed=3)
+    grid = {"retest_window": [3, 5], "alignment_threshold_pct": [2.0, 5.0]}
+    results = ParameterSweep(processes=2).run("ETHUSDT", "1h", frame, grid, 10_000.0)
+
+    assert len(results) == 4
+    sortinos = [result.metrics["sortino_ratio"] for result in results]
+    assert sortinos == sorted(sortinos, reverse=True)
+    for result in results:
+        report = build_backtester(result.parameters).run("ETHUSDT", "1h", frame, 10_000.0)
+        assert result.metrics == report.metrics
+
+
+def test_parameter_sweep_ranks_loss_free_runs_first_and_all_losing_runs_last():
+    def result(name, profit_factor, trades):
+        return SweepResult(
+            parameters={"name": name},
+            metrics={"sortino_ratio": 0.0, "profit_factor": profit_factor, "max_drawdown": 0.0},
+            summary={"total_trades": trades},
+        )
+
+    results = [
+        result("losing", 0.0, 9.0),
+        result("robust", 2.5, 40.0),
+        result("winning", None, 3.0),
+    ]
+    ranked = ParameterSweep(rank_by="profit_factor").rank(results)
+    assert [r.parameters["name"] for r in ranked] == ["winning", "robust", "losing"]
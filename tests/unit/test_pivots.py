@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.lib.pivots import find_pivots, find_swing_pivots
+from src.services.trendline_detector import TrendlineDetector
+
+
+def _naive_pivots(values, width, kind, min_spacing):
+    pivots = []
+    for idx in range(width, len(values) - width):
+        window = values[idx - width : idx + width + 1]
+        extreme = min(window) if kind == "low" else max(window)
+        if values[idx] != extreme:
+            continue
+        if pivots and idx - pivots[-1] < min_spacing:
+            continue
+        pivots.append(idx)
+    return pivots
+
+
+@pytest.mark.parametrize("width,kind,min_spacing", [(2, "low", 5), (1, "high", 3), (3, "low", 1)])
+def test_find_pivots_matches_sequential_scan(width, kind, min_spacing):
+    rng = np.random.default_rng(7)
+    values = np.round(rng.normal(size=2_000).cumsum(), 1)
+    expected = _naive_pivots(values.tolist(), width, kind, min_spacing)
+    assert find_pivots(values, width=width, kind=kind, min_spacing=min_spacing).tolist() == expected
+
+
+def test_find_pivots_matches_sequential_scan_on_long_histories():
+    values = np.random.default_rng(1).normal(size=100_000).cumsum()
+    pivots = find_pivots(values, width=2, kind="low", min_spacing=5)
+    assert len(pivots) > 0
+    assert np.all(np.diff(pivots) >= 5)
+    assert pivots.tolist() == _naive_pivots(values.tolist(), 2, "low", 5)
+
+
+def test_find_swing_pivots_matches_separate_scans():
+    rng = np.random.default_rng(3)
+    close = np.round(rng.normal(size=1_000).cumsum(), 1)
+    lows, highs = close - rng.random(1_000), close + rng.random(1_000)
+    low_pivots, high_pivots = find_swing_pivots(lows, highs, width=2, min_spacing=4)
+    assert low_pivots.tolist() == find_pivots(lows, width=2, kind="low", min_spacing=4).tolist()
+    assert high_pivots.tolist() == find_pivots(highs, width=2, kind="high", min_spacing=4).tolist()
+
+
+@pytest.mark.parametrize("width", [1, 2])
+def test_trendline_detector_pivots_match_the_sequential_scan(width):
+    # Width 1 is the default 3-candle fractal; width 2 is the original 5-candle window.
+    rng = np.random.default_rng(11)
+    close = np.round(rng.normal(size=500).cumsum(), 1)
+    lows, highs = close - rng.random(500), close + rng.random(500)
+    detector = TrendlineDetector() if width == 1 else TrendlineDetector(pivot_width=2)
+    pivots = detector._find_pivots(lows, highs)
+    spacing = detector.min_touch_spacing
+    assert pivots["low"].tolist() == _naive_pivots(lows.tolist(), width, "low", spacing)
+    assert pivots["high"].tolist() == _naive_pivots(highs.tolist(), width, "high", spacing)
@@ -0,0 +1,69 @@
+import pytest
+
+from src.services.parameter_sweep import build_backtester
+from src.services.portfolio_backtest import PairStream, PortfolioBacktest, write_events
+
+HOUR_MS = 3_600_000
+
+
+def _trade(entry_hour, exit_hour, return_pct):
+    return {
+        "entry_timestamp": entry_hour * HOUR_MS,
+        "exit_timestamp": exit_hour * HOUR_MS,
+        "return_pct": return_pct,
+    }
+
+
+def test_portfolio_merge_shares_one_balance(tmp_path, random_walk):
+    first = write_events(str(tmp_path / "a.npy"), [_trade(0, 3, 10.0), _trade(5, 6, -10.0)])
+    second = write_events(str(tmp_path / "b.npy"), [_trade(1, 4, 20.0), _trade(2, 5, 5.0)])
+    streams = [
+        PairStream("BTCUSDT", "1h", first, trade_count=2, breakout_count=2),
+        PairStream("ETHUSDT", "1h", second, trade_count=2, breakout_count=3),
+        PairStream("SOLUSDT", "1h", None, trade_count=0, breakout_count=0),
+    ]
+    portfolio = PortfolioBacktest(
+        load_candles=lambda pair, timeframe: random_walk(500), position_fraction=0.5
+    )
+    report = portfolio.merge(streams, 1000.0)
+
+    # Hour 2 finds the balance fully committed; hour 5 reuses the stake freed at hour 4.
+    # 1000 -> +50 (h3) -> +100 (h4) -> -57.5 (h6)
+    assert report.summary["total_trades"] == 3
+    assert report.summary["skipped_trades"] == 1
+    assert report.summary["final_balance"] == pytest.approx(1092.5)
+    assert report.metrics["max_drawdown"] == pytest.approx(-0.05, abs=1e-4)
+    assert [pair["breakouts"] for pair in report.pairs] == [2, 3, 0]
+
+
+def test_portfolio_backtest_runs_sources_in_pool(random_walk):
+    sources = [("BTCUSDT", "1h"), ("ETHUSDT", "1h"), ("SOLUSDT", "4h")]
+    loaded = []
+
+    def load_candles(pair_symbol, timeframe):
+        # A closure cannot be pickled, so this also shows candles load in the parent.
+        loaded.append((pair_symbol, timeframe))
+        return random_walk(500, seed=sum(map(ord, pair_symbol)))
+
+    report = PortfolioBacktest(load_candles=load_candles, processes=2).run(sources, 10_000.0)
+    assert loaded == sources
+
+    expected = [
+        len(
+            build_backtester({})
+            .run(pair, timeframe, random_walk(500, seed=sum(map(ord, pair))), 1.0)
+            .trades
+        )
+        for pair, timeframe in sources
+    ]
+    assert [pair["trades"] for pair in report.pairs] == expected
+    assert report.summary["total_trades"] + report.summary["skipped_trades"] == sum(expected)
+    assert report.metrics["max_drawdown"] <= 0
+
+
+def test_portfolio_backtest_rejects_unknown_parameters_before_loading():
+    def load_candles(pair_symbol, timeframe):
+        raise AssertionError("candles must not load for an invalid configuration")
+
+    with pytest.raises(ValueError, match="leverage"):
+        PortfolioBacktest(load_candles=load_candles, parameters={"leverage": 2, "retest_window": 3})
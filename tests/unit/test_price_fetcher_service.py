@@ -27,3 +27,150 @@ async def test_price_fetcher_refreshes_top_universe():
     fetcher._fetch_market_cap_ranks = AsyncMock(return_value=[("BTCUSDT", 1), ("ETHUSDT", 2)])
     await fetcher.refresh_universe()
     assert "BTCUSDT" in fetcher.universe
+
+
+@pytest.mark.asyncio
+async def test_price_fetcher_fetch_many_streams_every_pair_and_timeframe():
+    fetcher = PriceFetcher(cache_dir=None, universe_size=50, max_concurrency=2)
+    mock_client = AsyncMock()
+    mock_client.get_klines.return_value = [[1, 2, 3, 4, 5, 1000]] * 10
+    fetcher._client = mock_client
+
+    results = [
+        (symbol, timeframe, len(candles))
+        async for symbol, timeframe, candles in fetcher.fetch_many(
+            ["BTCUSDT", "ETHUSDT"], ["1h", "4h"], limit=10
+        )
+    ]
+    assert sorted(results) == [
+        ("BTCUSDT", "1h", 10),
+        ("BTCUSDT", "4h", 10),
+        ("ETHUSDT", "1h", 10),
+        ("ETHUSDT", "4h", 10),
+    ]
+    assert mock_client.get_klines.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_price_fetcher_serves_fresh_cache_without_network(tmp_path):
+    from datetime import datetime, timezone
+
+    now_ms = int(datetime.now(tz=timezone.utc).timestamp() * 1000)
+    klines = [[now_ms - (9 - idx) * 3_600_000, 2, 3, 1, 2.5, 1000] for idx in range(10)]
+    fetcher = PriceFetcher(cache_dir=tmp_path, universe_size=50)
+    mock_client = AsyncMock()
+    mock_client.get_klines.return_value = klines
+    fetcher._client = mock_client
+
+    first = await fetcher.fetch_ohlcv("BTCUSDT", "1h", limit=10)
+    second = await fetcher.fetch_ohlcv("BTCUSDT", "1h", limit=10)
+    assert second.to_candles() == first.to_candles()
+    assert mock_client.get_klines.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_price_fetcher_requests_only_new_bars_after_last_cached_candle(tmp_path):
+    from datetime import datetime, timezone
+
+    hour_ms = 3_600_000
+    now_ms = int(datetime.now(tz=timezone.utc).timestamp() * 1000) // hour_ms * hour_ms
+    stale = [[now_ms - (11 - idx) * hour_ms, 2, 3, 1, 2.5, 1000] for idx in range(10)]
+    delta = [[now_ms - hour_ms, 2, 4, 1, 3.5, 1500], [now_ms, 3, 4, 2, 3.0, 200]]
+    fetcher = PriceFetcher(cache_dir=tmp_path, universe_size=50)
+    mock_client = AsyncMock()
+    mock_client.get_klines.side_effect = [stale, delta]
+    fetcher._client = mock_client
+
+    await fetcher.fetch_ohlcv("BTCUSDT", "1h", limit=10)
+    candles = await fetcher.fetch_ohlcv("BTCUSDT", "1h", limit=10)
+
+    delta_call = mock_client.get_klines.await_args_list[1].kwargs
+    assert delta_call["startTime"] == now_ms - 2 * hour_ms
+    assert delta_call["limit"] == 3
+    assert len(candles) == 10
+    assert candles[-2]["close"] == 3.5
+    assert candles[-1]["volume"] == 200
+    assert fetcher.last_timestamp("BTCUSDT", "1h") == now_ms
+
+
+@pytest.mark.asyncio
+async def test_price_fetcher_backfill_stitches_windows_and_resumes(tmp_path):
+    from datetime import datetime, timedelta, timezone
+
+    hour_ms = 3_600_000
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = start + timedelta(hours=2500)
+
+    async def fake_klines(symbol, interval, startTime, endTime, limit):
+        first = startTime // hour_ms
+        last = min(endTime // hour_ms, first + limit - 1)
+        return [[ts * hour_ms, 2, 3, 1, 2.5, 1000] for ts in range(first, last + 1)]
+
+    fetcher = PriceFetcher(cache_dir=tmp_path, universe_size=50, max_concurrency=3)
+    mock_client = AsyncMock()
+    mock_client.get_klines.side_effect = fake_klines
+    fetcher._client = mock_client
+    reports = []
+
+    candles = await fetcher.backfill(
+        "BTCUSDT", "1h", start, end, progress=lambda d, t: reports.append((d, t))
+    )
+    assert len(candles) == 2500
+    assert len({c["timestamp"] for c in candles}) == 2500
+    assert mock_client.get_klines.await_count == 3
+    assert reports[0] == (0, 3) and reports[-1] == (3, 3)
+
+    resumed = PriceFetcher(cache_dir=tmp_path, universe_size=50)
+    resumed._client = AsyncMock()
+    again = await resumed.backfill("BTCUSDT", "1h", start, end)
+    assert len(again) == 2500
+    assert resumed._client.get_klines.await_count == 0
+
+
+@pytest.mark.asyncio
+async def test_price_fetcher_offline_serves_stale_cache_without_overwriting_it(tmp_path):
+    hour_ms = 3_600_000
+    real = [[idx * hour_ms, 50_000, 50_100, 49_900, 50_050, 1000] for idx in range(10)]
+    fetcher = PriceFetcher(cache_dir=tmp_path, universe_size=50)
+    mock_client = AsyncMock()
+    mock_client.get_klines.return_value = real
+    fetcher._client = mock_client
+    await fetcher.fetch_ohlcv("BTCUSDT", "1h", limit=10)
+    stored = (tmp_path / "BTCUSDT_1h.npz").read_bytes()
+
+    offline = PriceFetcher(cache_dir=tmp_path, universe_size=50)
+    with patch.object(offline, "ensure_client", AsyncMock()):
+        candles = await offline.fetch_ohlcv("BTCUSDT", "1h", limit=10)
+        synthetic = await offline.fetch_ohlcv("ETHUSDT", "1h", limit=10)
+
+    assert not offline.online
+    assert candles[-1]["close"] == 50_050
+    assert len(synthetic) == 10
+    assert (tmp_path / "BTCUSDT_1h.npz").read_bytes() == stored
+    assert not (tmp_path / "ETHUSDT_1h.npz").exists()
+
+
+@pytest.mark.asyncio
+async def test_price_fetcher_short_refetch_keeps_backfilled_history(tmp_path):
+    from datetime import datetime, timedelta, timezone
+
+    hour_ms = 3_600_000
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    async def fake_klines(symbol, interval, startTime=None, endTime=None, limit=500):
+        if startTime is None:
+            last = int(datetime.now(tz=timezone.utc).timestamp() * 1000) // hour_ms
+            return [[ts * hour_ms, 2, 3, 1, 2.5, 1000] for ts in range(last - limit + 1, last + 1)]
+        first = startTime // hour_ms
+        last = min(endTime // hour_ms, first + limit - 1)
+        return [[ts * hour_ms, 2, 3, 1, 2.5, 1000] for ts in range(first, last + 1)]
+
+    fetcher = PriceFetcher(cache_dir=tmp_path, universe_size=50)
+    fetcher._client = AsyncMock()
+    fetcher._client.get_klines.side_effect = fake_klines
+    await fetcher.backfill("BTCUSDT", "1h", start, start + timedelta(hours=2500))
+
+    candles = await fetcher.fetch_ohlcv("BTCUSDT", "1h", limit=200)
+    assert len(candles) == 200
+    reloaded = PriceFetcher(cache_dir=tmp_path)._load_cached("BTCUSDT", "1h")
+    assert reloaded is not None and len(reloaded) == 2700
@@ -0,0 +1,34 @@
+import pytest
+
+from src.lib.rate_limiter import TokenBucket, klines_request_weight
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill_when_budget_exhausted():
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=10, refill_per_second=2, clock=clock, sleep=clock.sleep)
+    await bucket.acquire(8)
+    await bucket.acquire(6)
+    assert clock.sleeps == [pytest.approx(2.0)]
+    assert bucket.available == pytest.approx(0.0)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_rejects_weight_above_capacity():
+    bucket = TokenBucket(capacity=5, refill_per_second=1)
+    with pytest.raises(ValueError):
+        await bucket.acquire(6)
+    assert klines_request_weight(500) > klines_request_weight(10)
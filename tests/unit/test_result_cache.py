@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+
+from src.lib.candle_frame import CandleFrame
+from src.lib.result_cache import ResultCache, describe
+from src.services.trendline_detector import TrendlineDetector
+
+
+def _frame(close):
+    close = np.asarray(close, dtype=np.float64)
+    return CandleFrame.from_columns(
+        {
+            "timestamp": 1725148800000 + np.arange(len(close), dtype=np.int64) * 3_600_000,
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": np.full(len(close), 100.0),
+        }
+    )
+
+
+def test_result_cache_keys_on_candles_and_parameters(tmp_path):
+    cache = ResultCache(tmp_path)
+    parameters = {"components": [describe(TrendlineDetector())]}
+    key = cache.key("detect", _frame([1.0, 2.0, 3.0]), parameters)
+
+    assert key == cache.key("detect", _frame([1.0, 2.0, 3.0]), parameters)
+    assert key != cache.key("detect", _frame([1.0, 2.0, 3.5]), parameters)
+    assert key != cache.key(
+        "detect",
+        _frame([1.0, 2.0, 3.0]),
+        {"components": [describe(TrendlineDetector(pivot_width=2))]},
+    )
+    assert key != cache.key("backtest", _frame([1.0, 2.0, 3.0]), parameters)
+
+    assert cache.load(key) is None
+    cache.store(key, {"metrics": {"profit_factor": float("inf")}})
+    assert cache.load(key) == {"metrics": {"profit_factor": float("inf")}}
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=250)
+    payload = ["x" * 90]
+    for position, key in enumerate(["a", "b"]):
+        cache.store(key, payload)
+        os.utime(cache.path_for(key), (1000 + position, 1000 + position))
+    assert cache.load("a") == payload  # refreshes "a", leaving "b" least recently used
+
+    cache.store("c", payload)
+    assert cache.path_for("a").exists()
+    assert not cache.path_for("b").exists()
+    assert cache.path_for("c").exists()
@@ -0,0 +1,33 @@
+import numpy as np
+
+from src.lib.candle_frame import CandleFrame
+from src.lib.rolling_stats import RollingStats, volume_stats
+
+
+def test_rolling_stats_match_trailing_windows():
+    rng = np.random.default_rng(2)
+    values = rng.random(300) * 1e6 + 1e9
+    stats = RollingStats.compute(values, period=20)
+    for idx in (1, 7, 20, 150, 299):
+        window = values[max(idx - 20, 0) : idx]
+        assert np.isclose(stats.mean[idx], window.mean())
+        assert np.isclose(stats.std[idx], window.std(), rtol=1e-6)
+    assert stats.mean[0] == values[0]
+    assert stats.std[0] == 0.0
+
+
+def test_volume_stats_are_computed_once_per_frame_and_flag_spikes():
+    volume = np.full(40, 1000.0)
+    volume[30] = 2500.0
+    frame = CandleFrame(
+        timestamp=np.arange(40, dtype=np.int64),
+        open=np.ones(40),
+        high=np.ones(40),
+        low=np.ones(40),
+        close=np.ones(40),
+        volume=volume,
+    )
+    stats = volume_stats(frame)
+    assert volume_stats(frame) is stats
+    assert stats.spikes().tolist() == [30]
+    assert stats.zscore()[31] < 0
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from src.models.trade_setup import TradeSetup
+from src.services.setup_leaderboard import SetupLeaderboard
+
+
+def _setup(name, confluence, day):
+    return TradeSetup(
+        id=name,
+        trendline_id=f"trendline-{name}",
+        breakout_id=f"breakout-{name}",
+        timeframe="4h",
+        confidence_score=90.0,
+        quality_score=70.0,
+        confluence_strength=confluence,
+        confirmation_factors=["3+ touches"],
+        supply_demand_alignment=True,
+        detected_at=f"2024-10-{day:02d}T00:00:00Z",
+    )
+
+
+def _detected(setup):
+    return datetime.fromisoformat(setup.detected_at.replace("Z", "+00:00"))
+
+
+def test_leaderboard_keeps_top_k_by_confluence_then_recency():
+    board = SetupLeaderboard(capacity=3)
+    board.publish("BTCUSDT", "4h", [_setup("a", 85, 1), _setup("b", 90, 1)])
+    admitted = board.publish(
+        "ETHUSDT", "1h", [_setup("c", 85, 3), _setup("d", 80, 5), _setup("e", 95, 2)]
+    )
+    assert [s.id for s in admitted] == ["e", "c"]
+    assert [s.id for s in board.top()] == ["e", "b", "c"]
+
+
+def test_leaderboard_replaces_republished_pairs_and_evicts_stale_setups():
+    board = SetupLeaderboard(capacity=5, max_age=timedelta(days=7))
+    now = datetime(2024, 10, 10, tzinfo=timezone.utc)
+    board.publish("BTCUSDT", "4h", [_setup("a", 85, 1), _setup("b", 90, 6)], now=now)
+    board.publish("ETHUSDT", "4h", [_setup("c", 88, 8)], now=now)
+    assert [s.id for s in board.top()] == ["b", "c"]
+    board.publish("ETHUSDT", "4h", [_setup("d", 81, 9)], now=now)
+    assert [s.id for s in board.top()] == ["b", "d"]
+    board.evict_stale(now + timedelta(days=4))
+    assert [s.id for s in board.top()] == ["d"]
+
+
+def test_leaderboard_restores_setups_pushed_off_by_a_republished_pair():
+    board = SetupLeaderboard(capacity=2)
+    board.publish("BTCUSDT", "4h", [_setup("a", 90, 1), _setup("b", 85, 1)])
+    board.publish("ETHUSDT", "4h", [_setup("c", 95, 1), _setup("d", 94, 1)])
+    assert [s.id for s in board.top()] == ["c", "d"]
+    assert board.publish("ETHUSDT", "4h", []) == []
+    assert [s.id for s in board.top()] == ["a", "b"]
+
+
+def test_leaderboard_matches_a_full_rescan_over_random_publishes():
+    rng = np.random.default_rng(4)
+    board = SetupLeaderboard(capacity=4, max_age=timedelta(days=6))
+    published = {}
+    for step in range(300):
+        now = datetime(2024, 10, 1, tzinfo=timezone.utc) + timedelta(hours=2 * step)
+        pair = str(rng.choice(["BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "ADAUSDT"]))
+        setups = [
+            _setup(
+                f"{pair}-{step}-{n}", int(rng.integers(80, 100)), int(rng.integers(1, now.day + 1))
+            )
+            for n in range(rng.integers(0, 7))
+        ]
+        board.publish(pair, "4h", setups, now=now)
+        cutoff = now - timedelta(days=6)
+        # Each pair keeps only its own best ``capacity`` setups from the time it published.
+        fresh = [setup for setup in setups if _detected(setup) >= cutoff]
+        published[pair] = sorted(fresh, key=SetupLeaderboard._rank_key, reverse=True)[:4]
+        live = [
+            setup for kept in published.values() for setup in kept if _detected(setup) >= cutoff
+        ]
+        expected = sorted(live, key=SetupLeaderboard._rank_key, reverse=True)[:4]
+        assert [s.id for s in board.top()] == [s.id for s in expected]
+        assert len(board) == len(expected)
@@ -35,3 +35,27 @@ def test_supply_demand_detector_returns_alignment_candidates(candles):
     levels = detector.detect("ETHUSDT", "4h", candles)
     assert levels
     assert all(level.distance_to_price(level.price_high) <= 2.0 for level in levels)
+
+
+def test_supply_demand_detector_counts_touches_per_zone():
+    candles = []
+    for idx in range(60):
+        # Price swings between a floor near 100 and a ceiling near 110 every ten bars.
+        phase = idx % 10
+        close = 100 + 2 * (phase if phase < 5 else 10 - phase)
+        candles.append(
+            {
+                "timestamp": f"2024-09-{1 + idx // 24:02d}T{idx % 24:02d}:00:00Z",
+                "open": close,
+                "high": close + 0.5,
+                "low": close - 0.5,
+                "close": close,
+                "volume": 1000.0,
+            }
+        )
+    levels = SupplyDemandDetector().detect("ETHUSDT", "4h", candles)
+    by_type = {level.formation_type: level for level in levels}
+    assert by_type["demand"].touch_count == 6
+    assert by_type["supply"].touch_count == 6
+    assert by_type["demand"].price_low <= 99.5 <= by_type["demand"].price_high
+    assert by_type["supply"].price_low <= 110.5 <= by_type["supply"].price_high
@@ -34,3 +34,22 @@ def test_supply_demand_strength_scoring():
 
     assert 0 <= level.strength_score <= 100
     assert level.distance_to_price(2045.0) <= 2.0
+
+
+def test_supply_demand_register_touch_updates_strength():
+    level = SupplyDemandLevel(
+        id="00000000-0000-0000-0000-000000020002",
+        pair_symbol="ETHUSDT",
+        timeframe="4h",
+        price_high=2050.0,
+        price_low=2025.0,
+        strength_score=None,
+        touch_count=3,
+        formation_type="demand",
+        detected_at="2024-10-07T12:00:00Z",
+    )
+    before = level.strength_score
+    level.register_touch("2024-10-08T12:00:00Z")
+    assert level.touch_count == 4
+    assert level.last_touched_at == "2024-10-08T12:00:00Z"
+    assert level.strength_score > before
@@ -3,6 +3,7 @@ import pytest
 from src.lib.timeframe import Timeframe
 from src.lib.timeframe import weight_for_timeframe
 from src.lib.timeframe import adaptive_horizon
+from src.lib.timeframe import horizon_bars
 from src.lib.timeframe import next_update_schedule
 
 
@@ -25,6 +26,11 @@ def test_adaptive_horizon_returns_longer_for_higher_timeframe():
     assert daily_span > h1_span
 
 
+def test_horizon_bars_converts_adaptive_horizon_to_candles():
+    assert horizon_bars(Timeframe.HOUR_4) == adaptive_horizon(Timeframe.HOUR_4) * 6
+    assert horizon_bars("weekly") == adaptive_horizon("weekly") // 7
+
+
 def test_next_update_schedule_weekly_returns_seven_days():
     delta = next_update_schedule(Timeframe.WEEKLY)
     assert delta.days == 7
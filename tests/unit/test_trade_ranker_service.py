@@ -1,6 +1,11 @@
+from types import SimpleNamespace
+
+import numpy as np
 import pytest
 
+from src.models.supply_demand import SupplyDemandLevel
 from src.services.breakout_detector import BreakoutDetector
+from src.services.htf_trend_cache import HTFTrendCache
 from src.services.supply_demand_detector import SupplyDemandDetector
 from src.services.trade_ranker import TradeRanker
 from src.services.trendline_detector import TrendlineDetector
@@ -29,21 +34,25 @@ def candles():
 
 @pytest.fixture
 def breakout_series(candles):
-    extra = []
-    base_close = candles[-1]["close"]
-    base_ts = candles[-1]["timestamp"]
-    for idx in range(1, 6):
-        close = base_close + idx * 20
-        extra.append(
-            {
-                "timestamp": f"2024-10-01T{idx:02d}:00:00Z",
-                "open": close - 10,
-                "high": close + 30,
-                "low": close - 25,
-                "close": close,
-                "volume": 3000 + idx * 300,
-            }
-        )
+    # Support sits at 1775 + 6 * idx: break below it, retest it, then fall away.
+    bars = [
+        (2250, 2255, 2190, 2195, 6000),
+        (2195, 2228, 2195, 2205, 3300),
+        (2205, 2210, 2160, 2170, 3900),
+        (2170, 2175, 2130, 2140, 3600),
+        (2140, 2150, 2100, 2110, 4500),
+    ]
+    extra = [
+        {
+            "timestamp": f"2024-10-01T{idx:02d}:00:00Z",
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }
+        for idx, (open_, high, low, close, volume) in enumerate(bars, start=1)
+    ]
     return [*candles, *extra]
 
 
@@ -65,3 +74,64 @@ def test_trade_ranker_labels_a_plus(candles, breakout_series):
 
     setup = TradeRanker().rank(trendlines, breakouts, sd_levels)[0]
     assert setup.a_plus is True
+
+
+def test_trade_ranker_reads_volume_spike_from_series_stats(candles, breakout_series):
+    trendlines = TrendlineDetector().detect("ETHUSDT", "4h", candles)
+    breakouts = BreakoutDetector().detect(trendlines[0], breakout_series)
+    sd_levels = SupplyDemandDetector().detect("ETHUSDT", "4h", candles)
+    quiet = [{**candle, "volume": 1500.0} for candle in breakout_series]
+
+    spiked = TradeRanker().rank(trendlines, breakouts, sd_levels, breakout_series)[0]
+    flat = TradeRanker().rank(trendlines, breakouts, sd_levels, quiet)[0]
+    assert "Volume spike" in spiked.confirmation_factors
+    assert "Volume spike" not in flat.confirmation_factors
+    assert flat.confidence_score < spiked.confidence_score
+
+
+def test_trade_ranker_alignment_matches_pairwise_distances():
+    rng = np.random.default_rng(9)
+    levels = [
+        SupplyDemandLevel(
+            id=f"zone-{idx}",
+            pair_symbol="ETHUSDT",
+            timeframe="4h",
+            price_high=float(low) * 1.01,
+            price_low=float(low),
+            strength_score=None,
+            touch_count=3,
+            formation_type="demand" if idx % 2 else "supply",
+            detected_at="2024-09-01T00:00:00Z",
+        )
+        for idx, low in enumerate(rng.uniform(100, 200, size=300))
+    ]
+    breakouts = [
+        SimpleNamespace(id=f"breakout-{idx}", price=float(price))
+        for idx, price in enumerate(rng.uniform(90, 210, size=200))
+    ]
+    ranker = TradeRanker(alignment_threshold_pct=1.5)
+    mapping = ranker._map_alignment(breakouts, levels)
+    for breakout in breakouts:
+        expected = [
+            f"SD {level.formation_type}"
+            for level in levels
+            if level.distance_to_price(breakout.price) <= 1.5
+        ]
+        assert mapping[breakout.id] == (bool(expected), expected)
+
+
+def test_trade_ranker_checks_htf_trend_from_cache(candles, breakout_series):
+    trendlines = TrendlineDetector().detect("ETHUSDT", "4h", candles)
+    breakouts = BreakoutDetector().detect(trendlines[0], breakout_series)
+    sd_levels = SupplyDemandDetector().detect("ETHUSDT", "4h", candles)
+    falling = [SimpleNamespace(is_valid=True, quality_score=90.0, slope=-3.0)]
+    rising = [SimpleNamespace(is_valid=True, quality_score=90.0, slope=3.0)]
+
+    cache = HTFTrendCache()
+    cache.put("ETHUSDT", "daily", falling)
+    cache.put("ETHUSDT", "weekly", falling)
+    aligned = TradeRanker(htf_cache=cache).rank(trendlines, breakouts, sd_levels)[0]
+    cache.put("ETHUSDT", "weekly", rising)
+    opposed = TradeRanker(htf_cache=cache).rank(trendlines, breakouts, sd_levels)[0]
+    assert "HTF aligned" in aligned.confirmation_factors
+    assert "HTF aligned" not in opposed.confirmation_factors
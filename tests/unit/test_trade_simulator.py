@@ -0,0 +1,77 @@
+import numpy as np
+
+from src.lib.candle_frame import CandleFrame
+from src.lib.trade_simulator import EXIT_HORIZON, EXIT_STOP, EXIT_TARGET, simulate_exits
+
+
+def _frame(count, seed=4):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.002, count))
+    return CandleFrame.from_columns(
+        {
+            "timestamp": np.arange(count, dtype=np.int64) * 3_600_000,
+            "open": open_,
+            "high": np.maximum(open_, close) * (1 + rng.uniform(0, 0.006, count)),
+            "low": np.minimum(open_, close) * (1 - rng.uniform(0, 0.006, count)),
+            "close": close,
+            "volume": np.ones(count),
+        }
+    )
+
+
+def _walk_bars(frame, entry, side, stop, target, horizon):
+    last = min(entry + horizon, len(frame) - 1)
+    for bar in range(entry + 1, last + 1):
+        adverse, favourable = (
+            (frame.low[bar], frame.high[bar]) if side > 0 else (frame.high[bar], frame.low[bar])
+        )
+        open_ = frame.open[bar]
+        if side * (adverse - stop) <= 0:
+            return bar, (open_ if side * (open_ - stop) <= 0 else stop), EXIT_STOP
+        if side * (favourable - target) >= 0:
+            return bar, (open_ if side * (open_ - target) >= 0 else target), EXIT_TARGET
+    return last, frame.close[last], EXIT_HORIZON
+
+
+def test_simulate_exits_matches_bar_by_bar_walk():
+    frame = _frame(3000)
+    rng = np.random.default_rng(7)
+    entries = np.sort(rng.integers(0, 3000, 500))
+    side = np.where(rng.random(500) < 0.5, 1.0, -1.0)
+    price = frame.close[entries]
+    stop = price * (1 - side * rng.uniform(0.005, 0.05, 500))
+    target = price * (1 + side * rng.uniform(0.005, 0.1, 500))
+
+    exits = simulate_exits(frame, entries, side, stop, target, horizon=240)
+    for position in range(500):
+        expected = _walk_bars(
+            frame, entries[position], side[position], stop[position], target[position], 240
+        )
+        assert exits.exit_index[position] == expected[0]
+        assert exits.exit_price[position] == expected[1]
+        assert exits.reason[position] == expected[2]
+
+
+def test_simulate_exits_fills_gaps_at_the_open():
+    frame = CandleFrame.from_columns(
+        {
+            "timestamp": np.arange(4, dtype=np.int64),
+            "open": np.array([100.0, 100.0, 94.0, 96.0]),
+            "high": np.array([101.0, 101.0, 95.0, 97.0]),
+            "low": np.array([99.0, 99.0, 93.0, 95.0]),
+            "close": np.array([100.0, 100.0, 94.0, 96.0]),
+            "volume": np.ones(4),
+        }
+    )
+    exits = simulate_exits(
+        frame,
+        entry_index=np.array([0, 0, 3]),
+        side=np.array([1.0, -1.0, 1.0]),
+        stop=np.array([97.0, 103.0, 90.0]),
+        target=np.array([110.0, 95.0, 110.0]),
+        horizon=10,
+    )
+    assert exits.exit_index.tolist() == [2, 2, 3]
+    assert exits.exit_price.tolist() == [94.0, 94.0, 96.0]
+    assert exits.reason.tolist() == [EXIT_STOP, EXIT_TARGET, EXIT_HORIZON]
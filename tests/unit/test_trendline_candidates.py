@@ -0,0 +1,28 @@
+import numpy as np
+
+from src.lib.trendline_candidates import fit_line_candidates
+
+
+def test_fit_line_candidates_recovers_planted_support_line():
+    indices = np.array([5, 15, 25, 35, 45, 55])
+    prices = np.array([100.0, 110.0, 140.0, 130.0, 150.0, 155.0])
+    prices[[0, 1, 3, 5]] = 100.0 + 1.0 * indices[[0, 1, 3, 5]] - 5
+    candidates = fit_line_candidates(indices, prices, kind="low", tolerance_pct=0.5)
+
+    best = candidates[0]
+    assert best.touch_indices.tolist() == [5, 15, 35, 55]
+    assert best.slope == np.float64(1.0)
+    assert best.intercept == 100.0
+    assert best.r_squared == 1.0
+
+
+def test_fit_line_candidates_stops_counting_touches_after_a_break():
+    indices = np.arange(0, 70, 10)
+    prices = 200.0 - 0.5 * indices
+    prices[3] -= 20.0
+    highs = fit_line_candidates(indices, prices, kind="high", tolerance_pct=0.5)
+    lows = fit_line_candidates(indices, prices, kind="low", tolerance_pct=0.5)
+
+    assert highs and highs[0].slope == -0.5
+    assert 30 not in highs[0].touch_indices.tolist()
+    assert all(30 not in c.touch_indices.tolist() or c.touch_indices[0] >= 30 for c in lows)
@@ -1,7 +1,9 @@
+import numpy as np
 import pytest
 
+from src.lib.candle_frame import CandleFrame
 from src.models.trendline import Trendline
-from src.services.trendline_detector import TrendlineDetector
+from src.services.trendline_detector import IncrementalTrendlineDetector, TrendlineDetector
 
 
 @pytest.fixture
@@ -33,3 +35,79 @@ def test_trendline_detector_respects_touch_distribution(candles):
     trendlines = detector.detect("ETHUSDT", "4h", candles)
     first = trendlines[0]
     assert first.touch_point_count >= 3
+
+
+def test_trendline_detector_ranks_multiple_distinct_lines():
+    rng = np.random.default_rng(11)
+    close = 1000 + rng.normal(size=500).cumsum() * 5
+    candles = CandleFrame(
+        timestamp=np.arange(500, dtype=np.int64) * 3_600_000,
+        open=close,
+        high=close + 3,
+        low=close - rng.random(500) * 5,
+        close=close,
+        volume=np.full(500, 1000.0),
+    )
+    trendlines = TrendlineDetector().detect("ETHUSDT", "1h", candles)
+    assert len(trendlines) > 5
+    assert len({t.id for t in trendlines}) == len(trendlines)
+    scores = [t.quality_score for t in trendlines]
+    assert scores == sorted(scores, reverse=True)
+    assert all(abs(tp.distance_from_line) <= 1.0 for t in trendlines for tp in t.touch_points)
+
+
+def test_trendline_detector_finds_support_and_resistance_in_one_pass():
+    bars = np.arange(60)
+    phase = bars % 10
+    # A rising channel: price zigzags between a floor and a ceiling 40 above it.
+    close = 1000 + 2 * bars + np.where(phase < 5, phase, 10 - phase) * 8
+    candles = CandleFrame(
+        timestamp=bars.astype(np.int64) * 3_600_000,
+        open=close,
+        high=close + 2,
+        low=close - 2,
+        close=close,
+        volume=np.full(60, 1000.0),
+    )
+    trendlines = TrendlineDetector().detect("ETHUSDT", "1h", candles)
+    by_direction = {t.direction: t for t in trendlines}
+    assert set(by_direction) == {"support", "resistance"}
+    assert by_direction["support"].slope == pytest.approx(2.0)
+    assert by_direction["resistance"].slope == pytest.approx(2.0)
+    assert by_direction["resistance"].intercept > by_direction["support"].intercept
+
+
+def _next_candle(index, low, close):
+    return {
+        "timestamp": f"2024-10-{index - 29:02d}T00:00:00Z",
+        "open": close,
+        "high": close + 10,
+        "low": low,
+        "close": close,
+        "volume": 2000.0,
+    }
+
+
+def test_incremental_detector_matches_batch_and_extends_lines(candles):
+    incremental = IncrementalTrendlineDetector("ETHUSDT", "4h")
+    created = [line for candle in candles for line in incremental.update(candle)]
+    batch = TrendlineDetector().detect("ETHUSDT", "4h", candles)
+    assert [t.id for t in created] == [batch[0].id]
+
+    line = created[0]
+    for index in range(30, 36):
+        on_line = 1810 + 5 * (index - 4)
+        incremental.update(
+            _next_candle(index, on_line if index == 34 else on_line + 6, on_line + 15)
+        )
+    assert line.touch_point_count == 4
+    assert line.last_updated.startswith("2024-10-05")
+
+
+def test_incremental_detector_marks_lines_broken_on_close_through(candles):
+    incremental = IncrementalTrendlineDetector("ETHUSDT", "4h")
+    line = incremental.seed(candles)[0]
+    changed = incremental.update(_next_candle(30, 1900.0, 1905.0))
+    assert changed == [line]
+    assert line.is_valid is False
+    assert incremental.active_trendlines == []
@@ -0,0 +1,38 @@
+from src.lib.metrics import summarize
+from src.services.walk_forward import Fold, WalkForward, make_folds
+
+
+def test_make_folds_rolls_or_anchors_training_windows():
+    assert make_folds(1000, 400, 200) == [
+        Fold(index=0, train_start=0, test_start=400, test_end=600),
+        Fold(index=1, train_start=200, test_start=600, test_end=800),
+        Fold(index=2, train_start=400, test_start=800, test_end=1000),
+    ]
+    assert [fold.train_start for fold in make_folds(1000, 400, 200, anchored=True)] == [0, 0, 0]
+    assert make_folds(500, 400, 200) == []
+
+
+def test_walk_forward_stitches_out_of_sample_trades(random_walk):
+    frame = random_walk(900, seed=8)
+    grid = {"retest_window": [3, 5], "min_touch_spacing": [4, 6]}
+    report = WalkForward(train_bars=300, test_bars=200, processes=2).run(
+        "ETHUSDT", "1h", frame, grid, 10_000.0
+    )
+
+    assert len(report.folds) == 3
+    assert report.trades
+    for result in report.folds:
+        # Entries are stamped at the close of their bar.
+        test_start = frame.timestamp[result.fold.test_start]
+        test_end = frame.timestamp[result.fold.test_end - 1]
+        assert all(
+            test_start < trade["entry_timestamp"] <= test_end + 3_600_000
+            for trade in result.test_trades
+        )
+        assert result.parameters in [
+            {"min_touch_spacing": spacing, "retest_window": window}
+            for spacing in (4, 6)
+            for window in (3, 5)
+        ]
+    assert report.trades == [trade for result in report.folds for trade in result.test_trades]
+    assert report.metrics == summarize(report.trades, 10_000.0)
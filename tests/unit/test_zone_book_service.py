@@ -0,0 +1,56 @@
+import pytest
+
+from src.models.supply_demand import SupplyDemandLevel
+from src.services.zone_book import ZoneBook
+
+
+def _level(
+    price_low, price_high, touches=3, formation_type="demand", detected_at="2024-09-01T00:00:00Z"
+):
+    return SupplyDemandLevel(
+        id=f"zone-{formation_type}-{price_low}",
+        pair_symbol="ETHUSDT",
+        timeframe="4h",
+        price_high=price_high,
+        price_low=price_low,
+        strength_score=None,
+        touch_count=touches,
+        formation_type=formation_type,
+        detected_at=detected_at,
+        last_touched_at=detected_at,
+    )
+
+
+def _candle(hour, low, high):
+    return {"timestamp": f"2024-09-02T{hour:02d}:00:00Z", "low": low, "high": high}
+
+
+def test_zone_book_counts_one_touch_per_visit():
+    book = ZoneBook("ETHUSDT", "4h")
+    book.extend([_level(100, 102), _level(110, 112), _level(130, 133, formation_type="supply")])
+    assert [z.id for z in book.update(_candle(0, 101, 111))] == [
+        "zone-demand-100",
+        "zone-demand-110",
+    ]
+    assert book.update(_candle(1, 101.5, 103)) == []
+    book.update(_candle(2, 104, 108))
+    touched = book.update(_candle(3, 99, 101))
+    assert [z.touch_count for z in touched] == [5]
+    assert touched[0].last_touched_at == "2024-09-02T03:00:00Z"
+    assert [z.touch_count for z in book.update(_candle(4, 129, 140))] == [4]
+
+
+def test_zone_book_merges_overlapping_zones():
+    book = ZoneBook("ETHUSDT", "4h")
+    book.extend(
+        [
+            _level(100, 102, touches=3),
+            _level(104, 106, touches=4, detected_at="2024-09-03T00:00:00Z"),
+        ]
+    )
+    kept = book.add(_level(101, 105, touches=5, detected_at="2024-09-05T00:00:00Z"))
+    assert kept.id == "zone-demand-100"
+    assert (kept.price_low, kept.price_high, kept.touch_count) == (100, 106, 7)
+    assert book.levels == [kept]
+    with pytest.raises(ValueError):
+        book.add(SupplyDemandLevel(**{**vars(_level(1, 2)), "pair_symbol": "BTCUSDT"}))
@@ -0,0 +1,19 @@
+import numpy as np
+
+from src.lib.zones import cluster_price_zones, extreme_indices
+
+
+def test_extreme_indices_match_full_sort():
+    rng = np.random.default_rng(4)
+    values = rng.normal(size=1_000)
+    assert extreme_indices(values, 5, "low").tolist() == sorted(np.argsort(values)[:5].tolist())
+    assert extreme_indices(values, 5, "high").tolist() == sorted(np.argsort(-values)[:5].tolist())
+
+
+def test_cluster_price_zones_separates_planted_bands():
+    prices = np.array([100.0, 100.2, 99.9, 150.0, 120.0, 120.3, 119.8, 120.1, 180.0])
+    zones = cluster_price_zones(np.arange(len(prices)) * 10, prices, width_pct=1.0, min_touches=3)
+    assert [zone.touch_indices.tolist() for zone in zones] == [[40, 50, 60, 70], [0, 10, 20]]
+    for zone, (low, high) in zip(zones, [(119.8, 120.3), (99.9, 100.2)], strict=True):
+        assert zone.price_low <= low and high <= zone.price_high
+        assert zone.price_high / zone.price_low - 1 < 0.011